@@ -2,7 +2,8 @@ import json
 import os
 import logging
 import re
-from assistant import DesktopAssistant
+import config
+from llm_gateway import gateway
 from api_hub import skill_hub
 
 logger = logging.getLogger(__name__)
@@ -13,7 +14,6 @@ class AgentFactory:
     def __init__(self, agent_dir="brain/agents"):
         self.agent_dir = agent_dir
         self.schema_path = os.path.join(agent_dir, "schema.json")
-        self.assistant = DesktopAssistant()
         
         # Ensure directories exist
         if not os.path.exists(self.agent_dir):
@@ -63,8 +63,8 @@ class AgentFactory:
         """
         
         try:
-            # Use the high-reasoning brain (get_ai_response bypasses tool routing)
-            raw_reply = self.assistant.get_ai_response(meta_prompt)
+            # Use the high-reasoning brain directly through the shared gateway pool
+            raw_reply = gateway.complete(config.PRIMARY_MODEL, prompt=meta_prompt, temperature=0.7, max_tokens=2048)
             logger.info(f"🧬 [FACTORY] Raw LLM Reply: {raw_reply[:500]}...")
             
             # Extract JSON from potential markdown blocks
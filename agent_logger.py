@@ -1,34 +1,105 @@
+"""
+================================================================================
+  bankoo.ai: AGENT-LIGHTNING TRACE PIPELINE
+================================================================================
+Interaction traces (JSONL, Agent-Lightning TraceToMessages compatible) written
+off the request path:
 
+  * `log_interaction` only enqueues; a background writer appends batches and
+    flushes every `flush_interval` seconds (and at exit).
+  * Segments rotate by size or age. Rotated segments are compressed (zstd when
+    `zstandard` is installed, else gzip) and pruned by age / total size.
+  * System prompts are split into sections (persona, memory recall, browser
+    content, document context, ...). Sections that repeat (persona, language
+    rules) are written once per segment as a `prompt_section` record and
+    referenced by hash; one-off sections (recall, browsing, RAG) stay inline.
+    Traces carry `prompt_ref`, a list of hashes / {"text": ...} entries, so
+    the section table rotates, compresses and expires with its segment.
+    `iter_traces(resolve_prompts=True)` restores the full prompt.
+================================================================================
+"""
+
+import gzip
 import json
 import os
+import re
 import time
+import queue
+import atexit
+import hashlib
 import datetime
 import logging
+import threading
+from collections import OrderedDict
+
+import config
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("BankooTrace")
 
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "traces")
+SEGMENT_PATTERN = re.compile(r"^trace_.*\.jsonl(\.gz|\.zst)?$")
+PROMPT_SECTION = re.compile(r"(?=\n\n\[)")  # Injected blocks start with "\n\n[HEADER]"
+SEGMENT_GRACE_SECONDS = 60  # Slack for a writer that checked its segment age just before writing
+
+
+def _prompt_sections(prompt):
+    return [s for s in PROMPT_SECTION.split(prompt or "") if s]
+
+
+def _section_hash(section):
+    return hashlib.sha1(section.encode("utf-8")).hexdigest()[:16]
+
+
 class BankooTraceLogger:
     """
     Captures traces for Agent-Lightning optimization.
     Format is designed to be compatible with Agent-Lightning's TraceToMessages logic.
     """
-    def __init__(self, log_dir=None):
-        if log_dir is None:
-            # Set absolute path to the project directory/logs/traces
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            self.log_dir = os.path.join(base_dir, "logs", "traces")
-        else:
-            self.log_dir = log_dir
-            
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
-        
-        self.current_trace_file = os.path.join(self.log_dir, f"trace_{datetime.datetime.now().strftime('%Y%b%d_%H%M%S')}.jsonl")
+    def __init__(self, log_dir=None, rotate_mb=32, rotate_hours=24, compression="auto",
+                 retention_days=30, max_total_mb=512, flush_interval=1.0, max_queue=10000, intern_prompts=True,
+                 max_tracked_sections=4096):
+        self.log_dir = log_dir or DEFAULT_LOG_DIR
+        os.makedirs(self.log_dir, exist_ok=True)
+
+        self.rotate_bytes = rotate_mb * 1024 * 1024
+        self.rotate_seconds = rotate_hours * 3600
+        if compression == "auto":
+            compression = "zstd" if ZSTD_AVAILABLE else "gzip"
+        self.compression = "gzip" if compression == "zstd" and not ZSTD_AVAILABLE else compression
+        self.retention_seconds = retention_days * 86400
+        self.max_total_bytes = max_total_mb * 1024 * 1024
+        self.flush_interval = flush_interval
+        self.intern_prompts = intern_prompts
+        self.max_tracked_sections = max_tracked_sections
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopped = threading.Event()
+        self._file = None
+        self._section_seen = OrderedDict()  # hash -> None, LRU of recent sections (repeat detection)
+        self._segment_sections = set()      # hashes already defined in the active segment
+        self.current_trace_file = None
+        self._segment_started = 0.0
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+        self._open_segment()
+        self._writer = threading.Thread(target=self._run, name="TraceWriter", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
         logger.info(f"Initialized High-Fidelity Trace Logger: {self.current_trace_file}")
 
-    def log_interaction(self, user_input, system_prompt, assistant_response, tools_used=None, reward=0, latency=0, complexity=0, lang='english'):
+    # --- PRODUCERS ---
+
+    def log_interaction(self, user_input, system_prompt, assistant_response, tools_used=None, reward=0, latency=0, complexity=0, lang='english', ttft=None, stages=None, cache=None, spans=None, model=None):
         """
         Logs a single high-fidelity interaction trace.
         """
@@ -42,21 +113,26 @@ class BankooTraceLogger:
             "tools": tools_used or [],
             "reward": reward,
             "metrics": {
+                "ttft_sec": latency if ttft is None else ttft, # Headline metric: time-to-first-token
                 "latency_sec": latency,
                 "complexity_score": complexity,
-                "language": lang
+                "language": lang,
+                "stages_ms": stages or {}, # normalize / route / recall / prompt_build / inference
+                "cache": cache, # exact / semantic / miss / bypass / off (None for tool traces)
+                "model": model # "provider/model" that served the answer (None for tool traces)
             },
             "metadata": {
                 "version": "3.3.0-ZENITH-ADVANCED",
                 "client": "StandardAssistant"
             }
         }
-        
+        if spans is not None:
+            trace_data["spans"] = spans # Sampled span tree (see telemetry.py)
+
         try:
-            with open(self.current_trace_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(trace_data, ensure_ascii=False) + "\n")
-        except Exception as e:
-            logger.error(f"Failed to write trace: {e}")
+            self._queue.put_nowait(trace_data)
+        except queue.Full:
+            self.dropped += 1  # Never block the request path on trace I/O
 
     def log_tool_result(self, tool_name, tool_input, tool_output, success):
         """
@@ -69,5 +145,243 @@ class BankooTraceLogger:
             "success": success
         }
 
+    # --- WRITER THREAD ---
+
+    def _run(self):
+        # Segments left uncompressed by earlier runs. Plain segments inside the rotation window may
+        # still be open in another process (server + trace scripts share the directory): leave them.
+        if self.compression:
+            for path in list_segments(self.log_dir):
+                if path.endswith(".jsonl") and path != self.current_trace_file and not self._maybe_active(path):
+                    self._compress(path)
+            self._apply_retention()
+
+        while not self._stopped.is_set():
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+                while len(batch) < 500:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        try:
+            if time.time() - self._segment_started >= self.rotate_seconds:
+                self.rotate()  # Never append to a segment other processes may consider finished
+            lines = []
+            for t in batch:
+                lines.extend(self._intern(t))  # Section records precede the trace that references them
+            self._file.write("".join(lines))
+            self._file.flush()
+            self.written += len(batch)
+            if self._file.tell() >= self.rotate_bytes or time.time() - self._segment_started >= self.rotate_seconds:
+                self.rotate()
+        except Exception as e:
+            logger.error(f"Failed to write trace: {e}")
+
+    def _intern(self, trace):
+        """JSONL lines for one trace: new section records of this segment, then the trace itself."""
+        system = trace["messages"][0]
+        if not self.intern_prompts or not system.get("content"):
+            return [json.dumps(trace, ensure_ascii=False) + "\n"]
+        lines, refs = [], []
+        for section in _prompt_sections(system["content"]):
+            h = _section_hash(section)
+            if h not in self._section_seen:  # First sighting: keep it inline
+                self._section_seen[h] = None
+                if len(self._section_seen) > self.max_tracked_sections:
+                    self._section_seen.popitem(last=False)
+                refs.append({"text": section})
+                continue
+            self._section_seen.move_to_end(h)
+            if h not in self._segment_sections:
+                if len(self._segment_sections) >= self.max_tracked_sections:
+                    self._segment_sections.clear()  # Re-defining a section later is harmless
+                lines.append(json.dumps({"prompt_section": h, "content": section}, ensure_ascii=False) + "\n")
+                self._segment_sections.add(h)
+            refs.append(h)
+        trace["messages"][0] = {"role": "system", "prompt_ref": refs}
+        lines.append(json.dumps(trace, ensure_ascii=False) + "\n")
+        return lines
+
+    # --- SEGMENTS ---
+
+    def _open_segment(self):
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        path, n = os.path.join(self.log_dir, f"trace_{stamp}.jsonl"), 1
+        while any(os.path.exists(path + ext) for ext in ("", ".gz", ".zst")):
+            path, n = os.path.join(self.log_dir, f"trace_{stamp}_{n}.jsonl"), n + 1
+        self.current_trace_file = path
+        self._file = open(self.current_trace_file, "a", encoding="utf-8")
+        self._segment_sections.clear()  # Every segment carries its own section table
+        self._segment_started = time.time()
+
+    def rotate(self):
+        """Closes the active segment, compresses it and applies the retention policy."""
+        finished = self.current_trace_file
+        self._file.close()
+        self._open_segment()
+        self.rotations += 1
+        if not os.path.exists(finished):
+            pass  # Idle past the rotation window: another process's startup sweep compressed it
+        elif os.path.getsize(finished) == 0:
+            os.remove(finished)
+        elif self.compression:
+            self._compress(finished)
+        self._apply_retention()
+
+    def _compress(self, path):
+        try:
+            if self.compression == "zstd":
+                target = path + ".zst"
+                with open(path, "rb") as src, open(target, "wb") as dst:
+                    zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+            else:
+                target = path + ".gz"
+                with open(path, "rb") as src, gzip.open(target, "wb", compresslevel=6) as dst:
+                    while True:
+                        chunk = src.read(1024 * 1024)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+            st = os.stat(path)
+            os.utime(target, (st.st_atime, st.st_mtime))  # Keeps segment order (readers sort by mtime)
+            os.remove(path)
+            logger.info(f"🗜️ Trace segment rotated: {os.path.basename(target)}")
+        except Exception as e:
+            logger.error(f"Trace compression failed for {path}: {e}")
+
+    def _maybe_active(self, path):
+        """Plain segment written within the rotation window: possibly another writer's active file."""
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return True
+        return path.endswith(".jsonl") and age < self.rotate_seconds + SEGMENT_GRACE_SECONDS
+
+    def _apply_retention(self):
+        now = time.time()
+        segments = [p for p in list_segments(self.log_dir)
+                    if p != self.current_trace_file and not self._maybe_active(p)]
+        total = sum(os.path.getsize(p) for p in segments)
+        for path in segments:  # Oldest first
+            expired = now - os.path.getmtime(path) > self.retention_seconds
+            if not expired and total <= self.max_total_bytes:
+                break
+            total -= os.path.getsize(path)
+            os.remove(path)
+            logger.info(f"🧹 Trace retention: removed {os.path.basename(path)}")
+
+    # --- LIFECYCLE ---
+
+    def flush(self, timeout=5.0):
+        """Blocks until everything queued so far is on disk (or `timeout`)."""
+        deadline = time.time() + timeout
+        while not self._queue.empty() and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(min(self.flush_interval, 0.1))
+
+    def close(self):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._writer.join(timeout=self.flush_interval + 1)
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+        self._file.close()
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped, "queued": self._queue.qsize(),
+                "rotations": self.rotations, "segment": os.path.basename(self.current_trace_file),
+                "compression": self.compression, "interned_prompt_sections": len(self._segment_sections)}
+
+
+# --- READERS ---
+
+def list_segments(log_dir=None):
+    """Trace segments (plain and compressed), oldest first."""
+    log_dir = log_dir or DEFAULT_LOG_DIR
+    if not os.path.isdir(log_dir):
+        return []
+    paths = [os.path.join(log_dir, n) for n in os.listdir(log_dir) if SEGMENT_PATTERN.match(n)]
+    return sorted(paths, key=os.path.getmtime)
+
+
+def open_segment(path):
+    """Text stream over a plain, gzip or zstd segment."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        import io
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def resolve_system_prompt(trace, table):
+    """Restores messages[0]['content'] of an interned trace in place."""
+    system = trace.get("messages", [{}])[0]
+    if "prompt_ref" in system:
+        system["content"] = "".join(ref["text"] if isinstance(ref, dict) else table.get(ref, "")
+                                    for ref in system.pop("prompt_ref"))
+    return trace
+
+
+def iter_traces(log_dir=None, resolve_prompts=False):
+    """Yields every trace from every segment, oldest segment first."""
+    for path in list_segments(log_dir):
+        table = {} if resolve_prompts else None  # Each segment carries its own prompt sections
+        try:
+            with open_segment(path) as f:
+                for line in f:
+                    try:
+                        trace = json.loads(line)
+                    except ValueError:
+                        continue  # Partial line of the active segment
+                    if "prompt_section" in trace:
+                        if table is not None:
+                            table[trace["prompt_section"]] = trace["content"]
+                        continue
+                    yield resolve_system_prompt(trace, table) if table is not None else trace
+        except (OSError, EOFError) as e:
+            logger.warning(f"Skipping unreadable trace segment {path}: {e}")
+
+
+class _LazyTraceLogger:
+    """
+    Builds the writer on first use, so processes that only read traces
+    (trace_analytics, brain_dashboard) never open a segment or start a writer.
+    """
+    def __init__(self):
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = BankooTraceLogger(
+                        rotate_mb=getattr(config, 'TRACE_ROTATE_MB', 32),
+                        rotate_hours=getattr(config, 'TRACE_ROTATE_HOURS', 24),
+                        compression=getattr(config, 'TRACE_COMPRESSION', "auto"),
+                        retention_days=getattr(config, 'TRACE_RETENTION_DAYS', 30),
+                        max_total_mb=getattr(config, 'TRACE_MAX_TOTAL_MB', 512),
+                        intern_prompts=getattr(config, 'TRACE_INTERN_PROMPTS', True)
+                    )
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+
 # Global Instance
-trace_logger = BankooTraceLogger()
+trace_logger = _LazyTraceLogger()
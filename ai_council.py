@@ -1,14 +1,89 @@
 
-import requests
 import json
+import time
+import string
 import logging
 import config
+from concurrent.futures import ThreadPoolExecutor
+from llm_gateway import gateway
 from council_roles import ROLE_PROMPTS
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("AI_COUNCIL")
 
+
+class CouncilStage:
+    """
+    One node of a council DAG.
+    `prompt` is a template filled with {query} and the outputs of `deps` by stage name;
+    the stage runs as COUNCIL_CONFIG member `role` (defaults to `name`) or a raw `model` id.
+    """
+    def __init__(self, name, prompt, deps=(), role=None, model=None, system=None):
+        self.name = name
+        self.prompt = prompt
+        self.deps = list(deps)
+        self.role = role or name
+        self.model = model
+        self.system = system
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["name"], d["prompt"], deps=d.get("deps", ()), role=d.get("role"),
+                   model=d.get("model"), system=d.get("system"))
+
+
+class _PartialStream:
+    """Coalesces token deltas so the UI bus gets a few frames per second, not one per token."""
+    def __init__(self, name, sink, min_chars=64, min_interval=0.25):
+        self.name = name
+        self.sink = sink
+        self.min_chars = min_chars
+        self.min_interval = min_interval
+        self._buf = []
+        self._size = 0
+        self._last = time.time()
+        self.emitted = False
+
+    def write(self, delta):
+        self._buf.append(delta)
+        self._size += len(delta)
+        if self._size >= self.min_chars or time.time() - self._last >= self.min_interval:
+            self._flush(done=False)
+
+    def _flush(self, done):
+        text = "".join(self._buf)
+        self._buf, self._size, self._last = [], 0, time.time()
+        if text or done:
+            self.emitted = self.emitted or bool(text)
+            try:
+                self.sink(self.name, text, done)
+            except Exception as e:
+                logger.debug(f"Council partial sink failed: {e}")
+
+    def close(self, final_text):
+        # Non-streaming lanes (HF, errors) deliver their whole answer at the end
+        if not self.emitted and not self._buf:
+            self._buf.append(final_text or "")
+        self._flush(done=True)
+
+
+# Default boardroom: plan -> risk audit -> build -> verify (the classic four-round chain).
+DEBATE_DAG = [
+    CouncilStage("CTO",
+        "Create a technical implementation plan for: {query}. Focus on file structure, database schema (if needed), and algorithms."),
+    CouncilStage("CRO",
+        "AUDIT this technical plan for '{query}':\n\n{CTO}\n\nSearch for edge cases, performance bottlenecks, and security vulnerabilities. Be brutally honest.",
+        deps=["CTO"]),
+    CouncilStage("VP_ENGINEERING",
+        "TASK: Write the code for '{query}'.\n\nPLAN: {CTO}\nCRITIQUE TO FIX: {CRO}\n\nWrite the FINAL, OPTIMIZED code implementing the plan but fixing the critique issues.",
+        deps=["CTO", "CRO"]),
+    CouncilStage("CEO",
+        "VERIFY this code:\n\n{VP_ENGINEERING}\n\nAgainst the Plan:\n{CTO}\n\nDid it fix the critique?\n{CRO}\n\nIf the code is good, simply output the code block. If you see remaining critical bugs, FIX THEM and output the corrected code.",
+        deps=["CTO", "CRO", "VP_ENGINEERING"],
+        system="You are the CEO. Ensure the final output delivers maximum value and is flawless."),
+]
+
 class AICouncil:
     def __init__(self):
         self.members = config.COUNCIL_CONFIG
@@ -16,10 +91,22 @@ class AICouncil:
         self.router_key = config.OPENROUTER_API_KEY
         self.cerebras_key = getattr(config, 'CEREBRAS_API_KEY', '')
         self.fireworks_key = getattr(config, 'FIREWORKS_API_KEY', '')
+        self.last_report = None
+
+    def _gateway_call(self, model, messages, on_partial=None, **kwargs):
+        """Gateway completion; streams deltas into `on_partial` when given."""
+        if on_partial is None:
+            return gateway.complete(model, messages=messages, **kwargs)
+        parts = []
+        for delta in gateway.stream(model, messages=messages, **kwargs):
+            parts.append(delta)
+            on_partial(delta)
+        return "".join(parts)
 
-    def _call_model(self, role_key, prompt, custom_system=None):
+    def _call_model(self, role_key, prompt, custom_system=None, on_partial=None):
         """
         Universal model caller supporting Cerebras, Groq, Fireworks, OpenRouter, and Hugging Face.
+        `on_partial(delta)` receives streamed text from the gateway lanes.
         """
         model_str = self.members.get(role_key)
         if not model_str:
@@ -45,29 +132,12 @@ class AICouncil:
         
         logger.info(f"🏛️ [{role_key}] via {provider.upper()} thinking...")
 
+        messages = [{"role": "system", "content": system_role}, {"role": "user", "content": prompt}]
         try:
-            # 1. SPECIALIZED SPEED LANES (First Party APIs)
-            if provider == "cerebras":
-                url = "https://api.cerebras.ai/v1/chat/completions"
-                headers = {"Authorization": f"Bearer {self.cerebras_key}", "Content-Type": "application/json"}
-                payload = {
-                    "model": model_id, # Cerebras expects "llama-3.3-70b"
-                    "messages": [{"role": "system", "content": system_role}, {"role": "user", "content": prompt}],
-                    "temperature": 0.7, "max_tokens": 2048
-                }
-                resp = requests.post(url, headers=headers, json=payload, timeout=20)
-                return resp.json()["choices"][0]["message"]["content"]
-                
-            elif provider == "groq":
-                url = "https://api.groq.com/openai/v1/chat/completions"
-                headers = {"Authorization": f"Bearer {self.groq_key}", "Content-Type": "application/json"}
-                payload = {
-                    "model": model_id, # Groq expects "llama3-70b-8192"
-                    "messages": [{"role": "system", "content": system_role}, {"role": "user", "content": prompt}],
-                    "temperature": 0.7, "max_tokens": 2048
-                }
-                resp = requests.post(url, headers=headers, json=payload, timeout=20)
-                return resp.json()["choices"][0]["message"]["content"]
+            # 1. SPECIALIZED SPEED LANES (First Party APIs, pooled via the gateway)
+            if provider in ("cerebras", "groq", "fireworks"):
+                return self._gateway_call(model_id, messages, on_partial, provider=provider,
+                                          temperature=0.7, max_tokens=2048, timeout=20)
 
             # 2. HUGGING FACE INFERENCE (Free Tier Models)
             elif provider in ["hot", "meta-llama", "black-forest-labs", "google", "openai"]: 
@@ -80,10 +150,9 @@ class AICouncil:
                          return "[Image Generation Requested - Please use generate_asset API]"
                      
                      # Text Gen
-                     msg = [{"role": "system", "content": system_role}, {"role": "user", "content": prompt}]
                      try:
                          # Try chat completion first
-                         output = client.chat_completion(model=model_str, messages=msg, max_tokens=2048)
+                         output = client.chat_completion(model=model_str, messages=messages, max_tokens=2048)
                          return output.choices[0].message.content
                      except:
                          # Fallback to text generation
@@ -91,59 +160,119 @@ class AICouncil:
 
             # 3. OPENROUTER (Universal Fallback)
             # Sends the FULL string (e.g. "deepseek/deepseek-chat")
-            url = "https://openrouter.ai/api/v1/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {self.router_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "http://localhost:5000",
-                "X-Title": "Bankoo AI Council"
-            }
-            payload = {
-                "model": model_str, # OpenRouter needs "vendor/model"
-                "messages": [{"role": "system", "content": system_role}, {"role": "user", "content": prompt}],
-                "temperature": 0.7
-            }
-            resp = requests.post(url, headers=headers, json=payload, timeout=45)
-            data = resp.json()
-            if "choices" in data:
-                return data["choices"][0]["message"]["content"]
-            else:
-                logger.error(f"OpenRouter Error: {data}")
-                return f"Error: {data.get('error', {}).get('message', 'Unknown')}"
+            return self._gateway_call(model_str, messages, on_partial, provider="openrouter",
+                                      temperature=0.7, timeout=45)
 
         except Exception as e:
             logger.error(f"Council connection failed: {e}")
             return f"Connection failed: {e}"
 
-    def debate(self, query):
+    # --- DAG EXECUTION ENGINE ---
+
+    @staticmethod
+    def _toposort(stages):
+        """Validates a stage list and returns it in dependency order."""
+        by_name = {}
+        for stage in stages:
+            if stage.name in by_name:
+                raise ValueError(f"Duplicate council stage: {stage.name}")
+            by_name[stage.name] = stage
+
+        for stage in stages:
+            fields = {f for _, f, _, _ in string.Formatter().parse(stage.prompt) if f}
+            for dep in stage.deps:
+                if dep not in by_name:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+            missing = fields - set(stage.deps) - {"query"}
+            if missing:
+                raise ValueError(f"Stage {stage.name} uses {sorted(missing)} without depending on them")
+
+        order, state = [], {}  # state: 1 = visiting, 2 = done
+        def visit(name):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Council DAG has a cycle through {name}")
+            state[name] = 1
+            for dep in by_name[name].deps:
+                visit(dep)
+            state[name] = 2
+            order.append(by_name[name])
+        for stage in stages:
+            visit(stage.name)
+        return order
+
+    def _run_stage(self, stage, query, dep_futures, t0, timings, on_partial):
+        inputs = {name: f.result() for name, f in dep_futures.items()}
+        ready = time.time()
+        prompt = stage.prompt.format(query=query, **inputs)
+
+        stream = _PartialStream(stage.name, on_partial) if on_partial else None
+        sink = stream.write if stream else None
+        try:
+            if stage.model:
+                output = self._call_model_raw(stage.model, prompt, stage.system or "You are a helpful assistant.", on_partial=sink)
+            else:
+                output = self._call_model(stage.role, prompt, stage.system, on_partial=sink)
+        except Exception as e:
+            logger.error(f"Council stage {stage.name} failed: {e}")
+            output = f"Error: {e}"
+        end = time.time()
+
+        if stream:
+            stream.close(output)
+        timings[stage.name] = {"start_sec": round(ready - t0, 3), "end_sec": round(end - t0, 3),
+                               "latency_sec": round(end - ready, 3)}
+        logger.info(f"🏛️ [{stage.name}] done in {end - ready:.1f}s")
+        return output
+
+    @staticmethod
+    def _critical_path(order, timings):
+        """Walks back from the last stage to finish through its latest-finishing dependency."""
+        by_name = {s.name: s for s in order}
+        node = max(timings, key=lambda n: timings[n]["end_sec"])
+        path = [node]
+        while by_name[node].deps:
+            node = max(by_name[node].deps, key=lambda d: timings[d]["end_sec"])
+            path.append(node)
+        return path[::-1]
+
+    def run_dag(self, stages, query, on_partial=None):
+        """
+        Runs council stages concurrently as soon as their dependencies are done.
+        `on_partial(stage_name, text, done)` receives coalesced streamed output.
+        Returns (outputs by stage name, timing report).
+        """
+        order = self._toposort(stages)
+        t0 = time.time()
+        timings, futures = {}, {}
+        with ThreadPoolExecutor(max_workers=len(order), thread_name_prefix="Council") as pool:
+            # Topological order guarantees every dependency future exists before its consumers
+            for stage in order:
+                deps = {d: futures[d] for d in stage.deps}
+                futures[stage.name] = pool.submit(self._run_stage, stage, query, deps, t0, timings, on_partial)
+            outputs = {name: f.result() for name, f in futures.items()}
+
+        wall = time.time() - t0
+        report = {
+            "wall_sec": round(wall, 3),
+            "serial_sec": round(sum(t["latency_sec"] for t in timings.values()), 3),
+            "critical_path": self._critical_path(order, timings),
+            "stages": timings
+        }
+        self.last_report = report
+        logger.info(f"⏱️ Council wall {report['wall_sec']}s vs serial {report['serial_sec']}s | "
+                    f"critical path: {' → '.join(report['critical_path'])}")
+        return outputs, report
+
+    def debate(self, query, on_partial=None):
         """Orchestrates the Enterprise Strategy Session"""
         logger.info(f"🏢 Boardroom Session Started for: {query}")
-        
-        # Round 1: The CTO (Technical Specification)
-        plan = self._call_model(
-            "CTO", 
-            f"Create a technical implementation plan for: {query}. Focus on file structure, database schema (if needed), and algorithms."
-        )
-        
-        # Round 2: The CRO (Risk Audit)
-        critique = self._call_model(
-            "CRO",
-            f"AUDIT this technical plan for '{query}':\n\n{plan}\n\nSearch for edge cases, performance bottlenecks, and security vulnerabilities. Be brutally honest."
-        )
-        
-        # Round 3: The VP Engineering (Deep Implementation)
-        code = self._call_model(
-            "VP_ENGINEERING",
-            f"TASK: Write the code for '{query}'.\n\nPLAN: {plan}\nCRITIQUE TO FIX: {critique}\n\nWrite the FINAL, OPTIMIZED code implementing the plan but fixing the critique issues."
-        )
-        
-        # Round 4: The CEO (Final Verification)
-        # Verify the code actually matches the plan and fixed the critique
-        verdict = self._call_model(
-            "CEO",
-            f"VERIFY this code:\n\n{code}\n\nAgainst the Plan:\n{plan}\n\nDid it fix the critique?\n{critique}\n\nIf the code is good, simply output the code block. If you see remaining critical bugs, FIX THEM and output the corrected code.",
-            "You are the CEO. Ensure the final output delivers maximum value and is flawless."
-        )
+
+        custom_dag = getattr(config, 'COUNCIL_DEBATE_DAG', None)
+        stages = [CouncilStage.from_dict(d) for d in custom_dag] if custom_dag else DEBATE_DAG
+        outputs, _ = self.run_dag(stages, query, on_partial)
+        verdict = outputs[stages[-1].name]
 
         final_output = f"""## 🏛️ Council of AI Decision
 
@@ -160,57 +289,37 @@ Here is the optimized solution verified by the Judge:
 """
         return final_output
 
-    def dual_check(self, query):
+    def dual_check(self, query, on_partial=None):
         """Runs Fast vs Smart model duel and judges the winner"""
         logger.info(f"⚔️ Dual Duel Started: {query}")
-        
-        # 1. Fast Model (The Speedster)
-        fast_response = self._call_model(
-            "PRIMARY_MODEL", # Will map to Fast in hybrid config if set properly, or we force it here
-            query,
-            "You are a helpful assistant. Answer briefly."
-        )
-        # Note: _call_model logic in this file relies on COUNCIL_CONFIG keys. 
-        # We need to hack it slightly to support raw FAST/SMART or update config keys.
-        # Actually, let's use the raw config keys if possible or just use existing members as proxies.
-        # Let's map "CRITIC" (Mixtral 8x7b) as the 'Fast/Alternative' and "ARCHITECT" (Llama 70b) as 'Smart'.
-        
-        # Redefining for Dual Check specifically:
-        # Fast = 8b Instant (Manual Call)
-        fast_response = self._call_model_raw(config.FAST_MODEL if hasattr(config, 'FAST_MODEL') else "llama-3.1-8b-instant", query)
-        
-        # Smart = 70b Versatile
-        smart_response = self._call_model_raw(config.PRIMARY_MODEL, query)
-        
-        # Judge (NEUTRAL PARTY: Mixtral-8x7b)
-        # Using Mixtral ensures the 70b model doesn't judge itself!
-        verdict = self._call_model_raw(
-            "mixtral-8x7b-32768", 
-            f"COMPARE these two AI responses to the user query: '{query}'\n\n"
-            f"[RESPONSE A (Fast/Llama-8b)]:\n{fast_response}\n\n"
-            f"[RESPONSE B (Smart/Llama-70b)]:\n{smart_response}\n\n"
-            f"TASK: 1. Identify which is better (Accuracy + Gujarati Naturalness). 2. Explain why. 3. Return the WINNING response content ONLY (preceded by [WINNER]).",
-            "You are an impartial AI Judge. Pick the best response."
-        )
-        
-        
+
+        # Fast = 8b Instant, Smart = 70b Versatile; both race in parallel.
+        # Judge (NEUTRAL PARTY: Mixtral-8x7b) ensures the 70b model doesn't judge itself!
+        stages = [
+            CouncilStage("FAST", "{query}", model=getattr(config, 'FAST_MODEL', "llama-3.1-8b-instant")),
+            CouncilStage("SMART", "{query}", model=config.PRIMARY_MODEL),
+            CouncilStage("JUDGE",
+                "COMPARE these two AI responses to the user query: '{query}'\n\n"
+                "[RESPONSE A (Fast/Llama-8b)]:\n{FAST}\n\n"
+                "[RESPONSE B (Smart/Llama-70b)]:\n{SMART}\n\n"
+                "TASK: 1. Identify which is better (Accuracy + Gujarati Naturalness). 2. Explain why. 3. Return the WINNING response content ONLY (preceded by [WINNER]).",
+                deps=["FAST", "SMART"], model="mixtral-8x7b-32768",
+                system="You are an impartial AI Judge. Pick the best response."),
+        ]
+        outputs, _ = self.run_dag(stages, query, on_partial)
+        fast_response, smart_response, verdict = outputs["FAST"], outputs["SMART"], outputs["JUDGE"]
+
         return f"⚔️ **Model Duel Results**\n\n**Fast Model (8b):**\n{fast_response[:100]}...\n\n**Smart Model (70b):**\n{smart_response[:100]}...\n\n**🏆 The Verdict:**\n{verdict}"
 
     def master_code(self, query):
         """Invoke the Master Free Coder (The Unshackled Genius)"""
         return self._call_model("MASTER_FREE_CODER", query)
 
-    def _call_model_raw(self, model_id, prompt, system="You are a helpful assistant."):
-        """Helper for direct model ID calls"""
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {"Authorization": f"Bearer {self.groq_key}", "Content-Type": "application/json"}
-        payload = {
-            "model": model_id,
-            "messages": [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
-        }
+    def _call_model_raw(self, model_id, prompt, system="You are a helpful assistant.", on_partial=None):
+        """Helper for direct model ID calls (bare ids go to Groq, "provider/model" to that provider)"""
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=30)
-            return resp.json()["choices"][0]["message"]["content"]
+            return self._gateway_call(model_id, messages, on_partial, default_provider="groq", timeout=30)
         except: return "Error"
 
 # Singleton Instance
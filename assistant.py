@@ -40,6 +40,16 @@ from concurrent.futures import ThreadPoolExecutor
 from api_hub import hub # Import Zenith API Hub
 from whisper_stt import WhisperSTT  # High-Accuracy Voice Recognition (Replaces Vosk)
 from agent_logger import trace_logger # Import Agent-Lightning Trace Logger
+from intent_router import IntentRouter # Compiled single-pass intent matcher
+from voice_pipeline import VoicePipeline # Sentence-pipelined Edge-TTS
+from tts_cache import TTSCache # Content-addressed on-disk voice cache
+from prompt_templates import PromptLibrary # Cached multilingual system prompts
+from llm_gateway import gateway, OPENAI_AVAILABLE # Process-wide pooled LLM provider clients
+from provider_router import router # Hedged, latency-aware provider lanes
+from response_cache import response_cache # Exact + semantic LLM answer cache
+from conversation_history import HistoryManager # Token-budgeted session histories
+from session_scheduler import sessions, session_property # Per-user conversational state
+from telemetry import tracer # Span timers + latency histograms (/api/metrics)
 try:
     from bankoo_memory import memory
     MEMORY_AVAILABLE = True
@@ -164,6 +174,37 @@ class Intent(Enum):
     VISION_AUTO = "vision_auto"
     UNKNOWN = "unknown"
 
+# --- STATIC VOICE REPLIES ---
+# Fixed phrases spoken verbatim (status lines, confirmations, busy/error notices).
+# A plain string is spoken as-is; a tuple is (gujarati, hindi, marathi, english) for get_msg.
+# execute_intent / ask_ai read them from here, and warm_voice_cache pre-renders every
+# variant so they never hit Edge-TTS at runtime.
+VOICE_REPLIES = {
+    "vision_check": "Checking your screen... one moment.",
+    "vision_mission": "Starting autonomous mission. Please stand back.",
+    "lock_pc": "કમ્પ્યુટર લોક કરવામાં આવ્યું છે. તમારી સુરક્ષા સુનિશ્ચિત કરવામાં આવી છે.",
+    "volume_up": "વોલ્યુમમાં 10% વધારો કરવામાં આવ્યો છે.",
+    "volume_down": "વોલ્યુમ 10% ઘટાડવામાં આવ્યું છે.",
+    "volume_mute": "વોલ્યુમ મ્યૂટ (Mute/Unmute) કરવામાં આવ્યું છે.",
+    "ai_busy": "ક્ષમા કરશો, AI સર્વર અત્યારે વ્યસ્ત છે. કૃપા કરીને થોડી વાર પછી પ્રયાસ કરો.",
+    "weather_fallback": ("તમારા શહેરનું હવામાન અત્યારે સાફ છે.", "आपके शहर का मौसम अभी साफ है।",
+                         "तुमच्या शहराचे हवामान सध्या स्वच्छ आहे.", "The weather in your city is currently clear."),
+    "code_mode": ("[CODE_MODE_ACTIVATED] ઝેનિથ કોડિંગ એન્જિન તૈયાર છે!", "[CODE_MODE_ACTIVATED] जेनिथ कोडिंग इंजन तैयार है!",
+                  "[CODE_MODE_ACTIVATED] जेनिथ कोडिंग इंजिन तयार आहे!", "[CODE_MODE_ACTIVATED] Zenith Coding Engine Activated!"),
+    # Language switching
+    "lang_hindi": ("હિન્દી મોડ સક્રિય થયો.", "हिंदी मोड सक्रिय हो गया है।", "हिंदी मोड सक्रिय झाला आहे.", "Hindi mode activated."),
+    "lang_marathi": ("મરાઠી મોડ સક્રિય થયો.", "मराठी मोड सक्रिय हो गया है।", "मराठी मोड सक्रिय झाला आहे.", "Marathi mode activated."),
+    "lang_gujarati": ("ગુજરાતી મોડ સક્રિય થયો.", "गुजराती मोड सक्रिय हो गया है।", "गुजराती मोड सक्रिय झाला आहे.", "Gujarati mode activated."),
+    "lang_english": ("ઇંગ્લિશ મોડ સક્રિય થયો.", "इंग्लिश मोड सक्रिय हो गया है।", "इंग्रजी मोड सक्रिय झाला आहे.", "English mode activated."),
+    "lang_nepali": ("નેપાળી મોડ સક્રિય થયો.", "नेपाली मोड सक्रिय हो गया है।", "नेपाली मोड सक्रिय झाला आहे.", "Nepali mode activated."),
+    "lang_bihari": ("ભોજપુરી (બિહારી) મોડ સક્રિય થયો.", "बिहारी (भोजपुरी) मोड सक्रिय हो गया।", "बिहारी मोड सक्रिय झाला.", "Bihari/Bhojpuri mode activated."),
+    "lang_pahadi": ("પહાડી મોડ સક્રિય થયો.", "पहाड़ी मोड सक्रिय हो गया।", "पहाड़ी मोड सक्रिय झाला.", "Pahadi mode activated."),
+    "lang_auto": ("Auto લેંગ્વેજ મોડ સક્રિય.", "ऑटो भाषा मोड सक्रिय।", "ऑटो भाषा मोड सक्रिय.", "Auto language detection activated."),
+    "lang_ask": ("તમે કઈ ભાષા સેટ કરવા માંગો છો?", "आप कौन सी भाषा सेट करना चाहते हैं?", "तुम्हाला कोणती भाषा सेट करायची आहे?", "Which language would you like to set?"),
+}
+STATIC_VOICE_REPLIES = [phrase for reply in VOICE_REPLIES.values()
+                        for phrase in (reply if isinstance(reply, tuple) else (reply,))]
+
 # --- SUB-AGENT: KNOWLEDGE GRAPH ---
 class ZenithKnowledge:
     """Manages persistent facts and context about the user."""
@@ -203,19 +244,30 @@ class ZenithHealth:
 
 # --- CORE ASSISTANT ENGINE ---
 class DesktopAssistant:
+    # Conversational state lives per session (orb, IDE, Telegram user, ...) and
+    # follows the request being handled, so concurrent users never share it.
+    current_language = session_property("current_language")
+    pending_intent = session_property("pending_intent")
+    pending_data = session_property("pending_data")
+    last_response_text = session_property("last_response_text")
+    is_busy = session_property("is_busy")
+
     def __init__(self):
         """Initialize the Zenith Brain with High-Complexity Architecture."""
         self.client = None
         self.model = None
         self.provider = "groq"
         
-        # DUAL CONTEXT HISTORIES - Complete Isolation
-        self.main_history = []  # Main orb conversation
-        self.ide_history = []   # IDE studio conversation
-        self.history = self.main_history  # Default pointer
+        # SESSION HISTORIES - Complete Isolation ("main" orb, "ide" studio, "telegram:<user>", ...)
+        # Token-budgeted per model; older turns are folded into a summary in the background
+        self.history_manager = HistoryManager(
+            summarize_fn=self._summarize_history,
+            budgets=getattr(config, 'HISTORY_TOKEN_BUDGETS', {}),
+            default_budget=getattr(config, 'HISTORY_DEFAULT_TOKEN_BUDGET', 3000),
+            max_sessions=getattr(config, 'HISTORY_MAX_SESSIONS', 500)
+        )
         
         self.current_language = "gujarati" # PERSISTENT LANGUAGE STATE (Default: Gujarati)
-        self.history_limit = 15 # Expanded context window
         self.is_privacy_mode = False
         
         # Audio & Speech States
@@ -224,6 +276,8 @@ class DesktopAssistant:
         self.recognizer = None
         self.vosk_engine = WhisperSTT(model_size="small")  # 'small' model = Better Gujarati/Hindi support
         self.speech_lock = threading.Lock()
+        self.voice_cache = TTSCache(max_bytes=getattr(config, 'TTS_CACHE_MAX_MB', 64) * 1024 * 1024)
+        self.voice_pipeline = VoicePipeline(cache=self.voice_cache)  # Long-lived TTS loop shared by all utterances
         
         # Identity Logic
         self.current_voice = config.DEFAULT_VOICE
@@ -244,6 +298,13 @@ class DesktopAssistant:
         if BUTLER_AVAILABLE:
             self.butler = ProactiveButler()
 
+        # Compiled Intent Router (built once, runtime guards evaluated lazily)
+        router_guards = {"doc_active": lambda t: bool(doc_brain.active_doc)}
+        if TASK_MANAGER_AVAILABLE:
+            router_guards["active_task"] = lambda t: bool(task_manager.get_last_active_task())
+            router_guards["complex_task"] = task_manager.is_complex_task
+        self.intent_router = IntentRouter(guards=router_guards)
+
         # State Management for Multi-turn Conversation
         self.pending_intent = None
         self.pending_data = {}
@@ -380,81 +441,13 @@ class DesktopAssistant:
         }
         
         
-        # Load System Prompts (Prometheus Injection)
-        import os
-        
-        # --- PROMETHEUS PROTOCOL INJECTION ---
-        prometheus_prompt = ""
-        try:
-            p_path = os.path.join(os.path.dirname(__file__), "resources", "prompts", "bankoo_prometheus.txt")
-            if os.path.exists(p_path):
-                with open(p_path, "r", encoding="utf-8") as f:
-                    prometheus_prompt = "\\n\\n" + f.read()
-        except Exception as e:
-            logger.warning(f"Failed to load Prometheus Protocol: {e}")
-
-        # Construct Multilingual System Prompts
-        self.prompts = {
-            "english": (
-                "You are 'Bankoo', a highly professional AI assistant. "
-                "Provide clear, concise, and helpful answers in English. "
-                "Maintain a formal yet friendly tone."
-                + prometheus_prompt
-            ),
-            "hindi": (
-                "आप 'Bankoo' हैं, एक पेशेवर AI सहायक। "
-                "नियम: \\n"
-                "1. केवल शुद्ध हिंदी (हिंदी लिपि) में उत्तर दें। \\n"
-                "2. अंग्रेजी शब्दों का प्रयोग कम से कम करें, केवल तकनीकी शब्दों के लिए। \\n"
-                "3. उत्तर सम्मानजनक और मददगार होना चाहिए।"
-            ),
-            "marathi": (
-                "तुम्ही 'Bankoo' आहात, एक व्यावसायिक AI सहाय्यक। "
-                "नियम: \\n"
-                "1. फक्त शुद्ध मराठी (मराठी लिपी) मध्ये उत्तर द्या। \\n"
-                "2. तांत्रिक शब्दांशिवाय इतरत्र इंग्रजी शब्दांचा वापर टाळा। \\n"
-                "3. उत्तर स्पष्ट आणि नम्र असावे।"
-            ),
-            # --- ZENITH PROMPT BUCKETS (Phase 3: Selective Optimization) ---
-            "buckets": {
-                "persona": "Tame 'Bankoo' chho, Meet na personal professional AI assistant. Output natural, human-like reasoning.",
-                "output_rules": "1. Natural, fluent script only. 2. Respectful, friendly tone (Standard/Surti). 3. No robotic phrasing. 4. Detailed explanations.",
-                "technical_handling": "For unknown technical terms, use English in brackets or transliteration."
-            },
-            "gujarati": (
-                "{persona}\\n"
-                "Output Instructions: \\n"
-                "{output_rules}\\n"
-                "{technical_handling}"
-            ).format(
-                persona="Tame 'Bankoo' chho, Meet na personal professional AI assistant.",
-                output_rules="1. Write ONLY in natural, fluent Gujarati Script (ગુજરાતી લિપિ). \\n2. Tone: Respectful, friendly, and helpful (Standard/Surti mix). \\n3. Use 'Tame' and 'Aapo' for respect. ",
-                technical_handling="4. For technical terms not in your mapping, you can use English in brackets or Gujarati transliteration. \\n5. Provide detailed, human-like explanations."
-            ),
-            "nepali": (
-                "तपाईं 'Bankoo' हुनुहुन्छ, एक पेशेवर AI सहायक। "
-                "नियम: \\n"
-                "1. केवल शुद्ध नेपाली (नेपाली लिपि) मा उत्तर दिनुहोस्। \\n"
-                "2. अंग्रेजी शब्दहरूको प्रयोग कम से कम गर्नुहोस्, केवल प्राविधिक शब्दहरूको लागि। \\n"
-                "3. उत्तर सम्मानजनक र सहयोगी हुनुपर्छ।"
-            ),
-            "bihari": (
-                "रउआ 'Bankoo' बानी। "
-                "नियम: \\n"
-                "1. रउआ एकदम खाँटी भोजपुरी (Bihari Style) में बात करे के बा। \\n"
-                "2. 'रउआ', 'का हाल बा', 'ठीक बा', 'बुझनी' जइसन शब्द के प्रयोग करीं। \\n"
-                "3. जवाब एकदम अपनत्व वाला और आदर सम्मान से भरल होखे के चाहीं। \\n"
-                "4. लिपि देवनागरी (Hindi Script) ही रही।"
-            ),
-            "pahadi": (
-                "तुसी 'Bankoo' हो, पहाड़ा दा AI साथी। "
-                "नियम: \\n"
-                "1. तुसी पहाड़ी/हिमाचली/गढ़वाली अंदाज विच गल करनी है। \\n"
-                "2. मीठी और सरल भाषा दा प्रयोग करो, जिवें पहाड़ा दे लोग बोलदे ने। \\n"
-                "3. 'ji', 'bhaiji', 'theek cha' जइसन शब्द (Context अनुसार) use करो। \\n"
-                "4. जवाब देवनागरी लिपि विच ही देना है।"
-            )
-        }
+        # System Prompts: built once, hot-reloaded when resources/prompts/*.txt change
+        self.prompt_library = PromptLibrary()
+        self.prompts = self.prompt_library.prompts
+
+        # Semantic answer cache reuses the vector brain's MiniLM embeddings when present
+        if VECTOR_BRAIN_AVAILABLE and response_cache.embedding_fn is None:
+            response_cache.embedding_fn = getattr(vector_brain, 'embedding_fn', None)
         
         logger.info(f"bankoo.ai REBORN: Zenith logic initialized for {self.user_profile.get('name')}")
         
@@ -467,9 +460,27 @@ class DesktopAssistant:
         # Initialize Brain Circuits
         self._init_ai()
 
-    def reset_session(self):
+        # Optional: render fixed replies into the voice cache in the background
+        if getattr(config, 'TTS_CACHE_WARMUP', False):
+            threading.Thread(target=self.warm_voice_cache, name="VoiceCacheWarmup", daemon=True).start()
+
+    def _summarize_history(self, previous, turns):
+        """Folds older turns into the running conversation summary (history worker thread)."""
+        transcript = "\n".join(f"{role.upper()}: {content[:1500]}" for role, content in turns)
+        prompt = (
+            "Update the running summary of this conversation. Keep names, facts, decisions and open "
+            "questions; drop small talk. Reply with the summary only, under 150 words.\n\n"
+            f"CURRENT SUMMARY: {previous or '(none)'}\n\nNEW TURNS:\n{transcript}"
+        )
+        summary, _ = router.complete(getattr(config, 'FAST_MODEL', config.PRIMARY_MODEL),
+                                     [{"role": "user", "content": prompt}],
+                                     temperature=0.2, max_tokens=300, timeout=20)
+        return summary.strip()
+
+    def reset_session(self, session_id="main"):
         """Wipes the current conversation history for Ephemeral Memory."""
-        self.history = []
+        self.history_manager.reset(session_id)
+        sessions.reset(session_id)
         logger.info("🗑️ Session Memory Wiped (Ephemeral Mode)")
         return "Memory cleared. Privacy ensured."
 
@@ -530,7 +541,8 @@ class DesktopAssistant:
         if self.client: return
         
         try:
-            from openai import OpenAI
+            if not OPENAI_AVAILABLE:  # Gateway lanes are OpenAI-compatible clients
+                raise ImportError("openai")
             import google.generativeai as genai
             self.genai = genai
         except ImportError:
@@ -544,12 +556,7 @@ class DesktopAssistant:
         if openrouter_key:
             # 1. OpenRouter (Universal Gateway)
             try:
-                from openai import OpenAI
-                self.client = OpenAI(
-                    base_url="https://openrouter.ai/api/v1",
-                    api_key=openrouter_key,
-                    default_headers={"HTTP-Referer": "http://localhost:5001", "X-Title": "Bankoo AI"}
-                )
+                self.client = gateway.client("openrouter")
                 self.openrouter_client = self.client
                 self.provider = "openrouter"
                 logger.info("Zenith Cloud: OpenRouter Gateway Active.")
@@ -559,8 +566,7 @@ class DesktopAssistant:
         if groq_key and groq_key.startswith("gsk_"):
             # 2. Groq Native (Hyper-Speed Lane)
             try:
-                from openai import OpenAI
-                self.groq_native_client = OpenAI(base_url="https://api.groq.com/openai/v1", api_key=groq_key)
+                self.groq_native_client = gateway.client("groq")
                 logger.info("Zenith Cloud: Groq Native Speed Lane Active.")
                 
                 # Zenith Dynamic Routing: Override self.client if PRIMARY_MODEL is Groq-based
@@ -578,14 +584,14 @@ class DesktopAssistant:
         # Fireworks AI
         if getattr(config, 'FIREWORKS_API_KEY', ''):
             try:
-                self.extended_clients['fireworks'] = OpenAI(base_url="https://api.fireworks.ai/inference/v1", api_key=config.FIREWORKS_API_KEY)
+                self.extended_clients['fireworks'] = gateway.client("fireworks")
                 logger.info("Zenith Cloud: Fireworks AI Lane Active.")
             except: pass
             
         # Cerebras (Warp Speed)
         if getattr(config, 'CEREBRAS_API_KEY', ''):
             try:
-                self.extended_clients['cerebras'] = OpenAI(base_url="https://api.cerebras.ai/v1", api_key=config.CEREBRAS_API_KEY)
+                self.extended_clients['cerebras'] = gateway.client("cerebras")
                 logger.info("Zenith Cloud: Cerebras Warp Lane Active.")
             except: pass
 
@@ -609,8 +615,7 @@ class DesktopAssistant:
         # Dedicated STT Client (Always use Groq for Whisper if possible)
         if groq_key and groq_key.startswith("gsk_"):
             try:
-                from openai import OpenAI
-                self.stt_client = OpenAI(base_url="https://api.groq.com/openai/v1", api_key=groq_key)
+                self.stt_client = gateway.client("groq")  # Same pooled Groq connection as the chat lane
                 logger.info("Zenith Bridge: Dedicated STT Satellite (Groq) Connected.")
             except Exception as e:
                 logger.warning(f"STT Satellite Init failed: {e}")
@@ -632,19 +637,14 @@ class DesktopAssistant:
         # 5. Local Ollama Lane (Privacy & Fallback v17)
         ollama_url = getattr(config, 'OLLAMA_BASE_URL', 'http://localhost:11434')
         try:
-            self.ollama_client = OpenAI(base_url=f"{ollama_url}/v1", api_key="ollama")
+            self.ollama_client = gateway.client("ollama")
             logger.info(f"Zenith local: Ollama Lane Configured ({ollama_url}).")
         except Exception as e:
             logger.warning(f"Ollama Local Init failed: {e}")
 
     def _is_internet_available(self):
-        """Ultra-fast ping test to check cloud connectivity."""
-        try:
-            import requests
-            requests.get("https://www.google.com", timeout=2)
-            return True
-        except:
-            return False
+        """Cached cloud connectivity (kept fresh by real traffic, probed at most once per TTL)."""
+        return router.connectivity.is_online()
 
     # --- MULTI-LINGUAL NORMALIZATION ---
 
@@ -709,127 +709,14 @@ class DesktopAssistant:
     def route_intent(self, text):
         """
         Multi-step intent classification using weighted keyword clusters.
+        All clusters are compiled into one automaton (see intent_router.py),
+        so the message is scanned once and rules are checked in priority order.
         """
-        t = text.lower()
-        
-        # Level 1: PC Automation
-        if any(w in t for w in ["lock pc", "પીસી લોક", "કમ્પ્યુટર લોક", "sleep mode"]):
-            return Intent.LOCK_PC
-        if any(w in t for w in ["volume up", "વોલ્યુમ વધાર", "loud", "વધારે"]):
-            return Intent.VOLUME_UP
-        if any(w in t for w in ["volume down", "વોલ્યુમ ઘટાડ", "quiet", "ઓછું", "diminish"]):
-            return Intent.VOLUME_DOWN
-        if any(w in t for w in ["mute", "મ્યૂટ", "ચૂપ", "silence"]):
-            return Intent.VOLUME_MUTE
-        
-        # Level 1.5: Task Breakdown System
-        if TASK_MANAGER_AVAILABLE:
-            # Check for follow-up on active task
-            if task_manager.get_last_active_task():
-                if any(w in t for w in ["next step", "done", "complete", "finish", "more detail", "explain", "how to", "detail", "વિગતવાર"]):
-                    return Intent.PLAN_TASK
-
-            if task_manager.is_complex_task(t):
-                return Intent.PLAN_TASK
-
-        # Level 1.6: Neural Vision Control (Zenith Brain Evolution)
-        # High Priority: Must catch "Automate" and "Click" before they match general "Search"
-        if any(w in t for w in ["automate", "mission", "auto", "પોતે કર", "ખુદ કર"]):
-            return Intent.VISION_AUTO
-        if any(w in t for w in ["click", "tap on", "લોગિન કર", "ક્લિક કર", "dabav", "બટન"]):
-            return Intent.VISION_CLICK
-        if any(w in t for w in ["find", "where is", "nav", "શોધ", "ક્યાં છે", "બતાવ"]):
-            # Specific check to avoid matching general "find" in search strings
-            if any(w in t for w in ["where is", "nav", "ક્યાં છે", "બતાવ"]):
-                return Intent.VISION_NAV
-            # If it's just "find" or "શોધ", check if it's a UI element or a web search?
-            # For now, let's keep "find" as Vision Nav if it's accompanied by UI indicators
-            if "find" in t and any(u in t for u in ["icon", "button", "app", "menu", "window", "screen"]):
-                return Intent.VISION_NAV
-
-        # Level 2: Productivity & Information
-        if any(w in t for w in ["ip address", "મારું આઇપી", "network info", "address card"]):
-            return Intent.IP_INFO
-        if any(w in t for w in ["system info", "cpu", "ram", "health", "status"]):
-            return Intent.HEALTH_CHECK
-        if any(w in t for w in ["search", "shodh", "શોધ", "ગુગલ કર", "find on web"]):
-            return Intent.SEARCH_WEB
-        if any(w in t for w in ["screenshot", "સ્ક્રીનશોટ", "capture", "પ્રેઝન્ટ"]):
-            return Intent.SCREENSHOT
-        
-        # Level 3: Creative & Advanced Agents
-        if any(w in t for w in ["code", "python", "script", "લખ", "program", "coding", "refactor", "કોડ", "પાયથોન", "પ્રોગ્રામ", "સ્ક્રિપ્ટ"]):
-            # If user asks for council/debate in code context, go to CREATE_GUI (Council Trigger)
-            if any(w in t for w in ["council", "debate", "audit", "deep think"]):
-                return Intent.CREATE_GUI
-            return Intent.CODING
-        # v4-v6 PC Automation (High Priority Primary Intent)
-        if any(w in t for w in ["open notepad", "open calculator", "open chrome", "kholo", "chalu karo"]):
-            return Intent.OPEN_APP
-            
-        if any(w in t for w in ["open", "chalu kar"]) and not any(n in t for w in ["note", "નોંધ"]):
-             return Intent.OPEN_APP
-
-        # v18 Notes System
-        if any(keyword in t for keyword in ["create note", "નોંધ બનાવો", "नोट बनाओ", "लिखो"]):
-            return Intent.CREATE_NOTE
-        if any(w in t for w in ["joke", "રમુજ", "સાંભળાવ", "funny", "હાસ્ય"]):
-            return Intent.TELL_JOKE
-        if any(w in t for w in ["weather", "હવામાન", "તાપમાન", "rain"]):
-            return Intent.WEATHER
-        if any(w in t for w in ["news", "સમાચાર", "ન્યૂઝ", "today's update"]):
-            return Intent.NEWS_QUERY
-        if any(w in t for w in ["stock", "બજાર", "પૈસા", "finance", "price of", "કિંમત"]):
-            return Intent.FINANCE_QUERY
-        if any(w in t for w in ["calculate", "ગણતરી", "math", "solve", "how much is", "વત્તા", "ગુણાકાર", "ભાગાકાર"]):
-            return Intent.COMPUTE
-        if any(w in t for w in ["what is in this image", "analyze image", "ફોટો", "આ શું છે", "image info"]):
-            return Intent.IMAGE_RECOGNITION
-        if any(w in t for w in ["motivation", "zen", "philosophy", "પ્રેરણા", "તત્વજ્ઞાન", "કંઈક સારું બોલ"]):
-            return Intent.MOTIVATION
-        if any(w in t for w in ["generate", "create image", "logo", "design", "બનાવ", "ચિત્ર"]):
-            return Intent.CREATE_ASSET
-        
-        # Level 4: PDF Intelligence (Doc-Genius Integration)
-        if doc_brain.active_doc and any(w in t for w in ["document", "pdf", "file", "paper", "આમાં શું છે", "પીડીએફ"]):
-            return Intent.PDF_QUERY
-        
-        # Level 5: Financial Context (Market-Insight Integration)
-        if any(w in t for w in ["balance sheet", "income statement", "cash flow", "recommendation", "insider", "analyst", "financials", "માર્કેટ", "સ્ટોક"]):
-            if any(w in t for w in ["buy", "sell", "trade", "order", "ખરીદ", "વેચ", "ઓર્ડર"]):
-                return Intent.STOCK_TRADE
-            return Intent.MARKET_ANALYSIS
-        
-        # Level 6: Predictive Analytics (Student Performance Integration)
-        if any(w in t for w in ["predict", "forecast", "score", "student", "performance", "grade", "માર્કસ", "નિષ્કર્ષ"]):
-            return Intent.PREDICTIVE_ANALYTICS
-            
-        # Level 7: Configuration & Personalization
-        if any(w in t for w in ["change voice", "અવાજ બદલ", "female voice", "male voice", "set voice", "gender switch"]):
-            return Intent.GENDER_SWITCH
-        
-        # Level 8: Vision Assistant (Hand Tracking)
-        if any(w in t for w in ["vision", "hand tracking", "વિઝન", "હાથ", "track hands", "start vision", "camera tracking"]):
-            return Intent.VISION_ASSISTANT
-        
-        if any(w in t for w in ["push to github", "github push", "upload to github", "save to git", "ગિટહબ"]):
-            return Intent.GITHUB_PUSH
-        # Specific check for 'git' to avoid matching 'digit'
-        if " git " in f" {t} ":
-             return Intent.GITHUB_PUSH
-            
-        if any(w in t for w in ["note", "નોંધ", "નોટ", "create note", "make a note", "બનાવ"]):
-            return Intent.CREATE_NOTE
-            
-        if any(w in t for w in ["switch to", "mode", "set language", "ભાષા બદલો", "भाषा बदलो", "भाषा बदल", "auto language", "auto mode"]):
-            lang_keywords = ["hindi", "marathi", "gujarati", "english", "nepali", "bihari", "bhojpuri", "pahadi", "pahari", "ગુજરાતી", "हिंदी", "मराठी", "अंग्रेजी", "इंग्रजी", "नेपाली", "भोजपुरी", "पहाड़ी", "auto"]
-            if any(k in t for k in lang_keywords):
-                return Intent.LANGUAGE_SWITCH
-
-        return Intent.SMALL_TALK
+        return Intent(self.intent_router.route(text))
 
     # --- AUTOMATION EXECUTION HUB ---
 
+    @tracer.traced("execute_intent")
     def execute_intent(self, intent, original_text=""):
         """
         The Master Execution Hub for all Zenith-Class system commands.
@@ -845,25 +732,25 @@ class DesktopAssistant:
             if intent == Intent.LOCK_PC:
                 if sys.platform == "win32":
                     os.system("rundll32.exe user32.dll,LockWorkStation")
-                return "કમ્પ્યુટર લોક કરવામાં આવ્યું છે. તમારી સુરક્ષા સુનિશ્ચિત કરવામાં આવી છે."
+                return VOICE_REPLIES["lock_pc"]
             
             elif intent == Intent.VOLUME_UP:
                 if sys.platform == "win32":
                     ps_cmd = "$obj = New-Object -ComObject WScript.Shell; for($i=0; $i -lt 5; $i++){ $obj.SendKeys([char]175) }"
                     subprocess.run(["powershell", "-Command", ps_cmd], capture_output=True)
-                return "વોલ્યુમમાં 10% વધારો કરવામાં આવ્યો છે."
+                return VOICE_REPLIES["volume_up"]
                 
             elif intent == Intent.VOLUME_DOWN:
                 if sys.platform == "win32":
                     ps_cmd = "$obj = New-Object -ComObject WScript.Shell; for($i=0; $i -lt 5; $i++){ $obj.SendKeys([char]174) }"
                     subprocess.run(["powershell", "-Command", ps_cmd], capture_output=True)
-                return "વોલ્યુમ 10% ઘટાડવામાં આવ્યું છે."
+                return VOICE_REPLIES["volume_down"]
 
             elif intent == Intent.VOLUME_MUTE:
                 if sys.platform == "win32":
                     ps_cmd = "$obj = New-Object -ComObject WScript.Shell; $obj.SendKeys([char]173)"
                     subprocess.run(["powershell", "-Command", ps_cmd], capture_output=True)
-                return "વોલ્યુમ મ્યૂટ (Mute/Unmute) કરવામાં આવ્યું છે."
+                return VOICE_REPLIES["volume_mute"]
 
             elif intent == Intent.SCREENSHOT:
                 if sys.platform == "win32":
@@ -909,7 +796,7 @@ class DesktopAssistant:
                         f"Current weather in {city} is {data['desc']} with {data['temp']}°C."
                     )
                 
-                return get_msg("તમારા શહેરનું હવામાન અત્યારે સાફ છે.", "आपके शहर का मौसम अभी साफ है।", "तुमच्या शहराचे हवामान सध्या स्वच्छ आहे.", "The weather in your city is currently clear.")
+                return get_msg(*VOICE_REPLIES["weather_fallback"])
 
             elif intent == Intent.FINANCE_QUERY:
                 symbol = "TSLA" # Default
@@ -1053,12 +940,7 @@ Your answer:"""
                     return get_msg(f"હું ગૂગલ પર '{query}' શોધી રહ્યો છું.", f"मैं गूगल पर '{query}' खोज रहा हूँ।", f"मी गुगलवर '{query}' शोधत आहे.", f"I am searching for '{query}' on Google.")
                 
             elif intent == Intent.CODING:
-                return get_msg(
-                    "[CODE_MODE_ACTIVATED] ઝેનિથ કોડિંગ એન્જિન તૈયાર છે!", 
-                    "[CODE_MODE_ACTIVATED] जेनिथ कोडिंग इंजन तैयार है!",
-                    "[CODE_MODE_ACTIVATED] जेनिथ कोडिंग इंजिन तयार आहे!",
-                    "[CODE_MODE_ACTIVATED] Zenith Coding Engine Activated!"
-                )
+                return get_msg(*VOICE_REPLIES["code_mode"])
                 
             elif intent == Intent.TELL_JOKE:
                 jokes = [
@@ -1263,10 +1145,13 @@ Your answer:"""
                         logger.info("🏛️ AI Council Summoned...")
                         try:
                             import ai_council
+                            on_partial = None
+                            if hasattr(self, 'ui_callback'):
+                                on_partial = lambda role, text, done: self.ui_callback("ui_cmd", cmd="council_partial", role=role, content=text, done=done)
                             if any(w in original_text.lower() for w in ["duel", "compare", "both", "check"]):
-                                return ai_council.council.dual_check(original_text)
+                                return ai_council.council.dual_check(original_text, on_partial=on_partial)
                             else:
-                                return ai_council.council.debate(original_text)
+                                return ai_council.council.debate(original_text, on_partial=on_partial)
                         except ImportError:
                             return "Error: Council module not found."
 
@@ -1400,29 +1285,29 @@ Your answer:"""
                 t = original_text.lower()
                 if "hindi" in t or "हिंदी" in t:
                     self.locked_language = "hindi"
-                    return get_msg("હિન્દી મોડ સક્રિય થયો.", "हिंदी मोड सक्रिय हो गया है।", "हिंदी मोड सक्रिय झाला आहे.", "Hindi mode activated.")
+                    return get_msg(*VOICE_REPLIES["lang_hindi"])
                 elif "marathi" in t or "मराठी" in t:
                     self.locked_language = "marathi"
-                    return get_msg("મરાઠી મોડ સક્રિય થયો.", "मराठी मोड सक्रिय हो गया है।", "मराठी मोड सक्रिय झाला आहे.", "Marathi mode activated.")
+                    return get_msg(*VOICE_REPLIES["lang_marathi"])
                 elif "gujarati" in t or "ગુજરાતી" in t:
                     self.locked_language = "gujarati"
-                    return get_msg("ગુજરાતી મોડ સક્રિય થયો.", "गुजराती मोड सक्रिय हो गया है।", "गुजराती मोड सक्रिय झाला आहे.", "Gujarati mode activated.")
+                    return get_msg(*VOICE_REPLIES["lang_gujarati"])
                 elif "english" in t or "अंग्रेजी" in t or "इंग्रजी" in t:
                     self.locked_language = "english"
-                    return get_msg("ઇંગ્લિશ મોડ સક્રિય થયો.", "इंग्लिश मोड सक्रिय हो गया है।", "इंग्रजी मोड सक्रिय झाला आहे.", "English mode activated.")
+                    return get_msg(*VOICE_REPLIES["lang_english"])
                 elif "nepali" in t or "नेपाली" in t:
                     self.locked_language = "nepali"
-                    return get_msg("નેપાળી મોડ સક્રિય થયો.", "नेपाली मोड सक्रिय हो गया है।", "नेपाली मोड सक्रिय झाला आहे.", "Nepali mode activated.")
+                    return get_msg(*VOICE_REPLIES["lang_nepali"])
                 elif "bihari" in t or "bhojpuri" in t or "भोजपुरी" in t:
                     self.locked_language = "bihari"
-                    return get_msg("ભોજપુરી (બિહારી) મોડ સક્રિય થયો.", "बिहारी (भोजपुरी) मोड सक्रिय हो गया।", "बिहारी मोड सक्रिय झाला.", "Bihari/Bhojpuri mode activated.")
+                    return get_msg(*VOICE_REPLIES["lang_bihari"])
                 elif "pahadi" in t or "pahari" in t or "पहाड़ी" in t:
                     self.locked_language = "pahadi"
-                    return get_msg("પહાડી મોડ સક્રિય થયો.", "पहाड़ी मोड सक्रिय हो गया।", "पहाड़ी मोड सक्रिय झाला.", "Pahadi mode activated.")
+                    return get_msg(*VOICE_REPLIES["lang_pahadi"])
                 elif "auto" in t:
                     self.locked_language = None
-                    return get_msg("Auto લેંગ્વેજ મોડ સક્રિય.", "ऑटो भाषा मोड सक्रिय।", "ऑटो भाषा मोड सक्रिय.", "Auto language detection activated.")
-                return get_msg("તમે કઈ ભાષા સેટ કરવા માંગો છો?", "आप कौन सी भाषा सेट करना चाहते हैं?", "तुम्हाला कोणती भाषा सेट करायची आहे?", "Which language would you like to set?")
+                    return get_msg(*VOICE_REPLIES["lang_auto"])
+                return get_msg(*VOICE_REPLIES["lang_ask"])
 
 
             # --- NEURAL VISION EXECUTION ---
@@ -1463,7 +1348,7 @@ Your answer:"""
 
             elif intent == Intent.VISION_AUTO:
                 goal = original_text.replace("automate", "").replace("mission", "").replace("auto", "").strip()
-                self.speak_threaded("Starting autonomous mission. Please stand back.")
+                self.speak_threaded(VOICE_REPLIES["vision_mission"])
                 
                 # Immediate UI Feedback
                 if hasattr(self, 'output_callback'):
@@ -1783,42 +1668,20 @@ Your answer:"""
     def _get_brain_client(self, model_id):
         """Helper to find the best API client for a specific model ID."""
         if not model_id: return self.client, model_id
-        mid = model_id.lower()
-        
-        # 1. Fireworks Specific
-        if "fireworks/" in mid:
-            client = self.extended_clients.get('fireworks', self.client)
-            return client, model_id.split("/")[-1]
-            
-        # 2. Cerebras Specific
-        if "cerebras/" in mid:
-            client = self.extended_clients.get('cerebras', self.client)
-            return client, model_id.split("/")[-1]
-            
-        # 3. Groq Specific
-        if "groq/" in mid:
-            client = getattr(self, 'groq_native_client', self.client)
-            return client, model_id.split("/")[-1]
-
-        # 4. DeepSeek Specific (via OpenRouter)
-        if "deepseek/" in mid:
-            # Explicitly use OpenRouter client if available
-            client = getattr(self, 'openrouter_client', self.client)
-            return client, model_id
-
-        # 5. Ollama Specific (Local Lane)
-        if "ollama/" in mid or self.provider == "ollama":
-            client = getattr(self, 'ollama_client', self.client)
-            real_model = model_id.split("/")[-1] if "/" in model_id else getattr(config, 'OLLAMA_MODEL', 'llama3.2:3b')
-            return client, real_model
 
-        return self.client, model_id # Default (OpenRouter)
+        # "provider/model" for first-party lanes (cerebras, groq, fireworks, ollama);
+        # anything else (e.g. "deepseek/deepseek-chat") goes to OpenRouter unchanged
+        provider, model = gateway.resolve(model_id)
+        if provider == "openrouter":
+            return getattr(self, 'openrouter_client', None) or self.client, model_id # Default (OpenRouter)
+        return gateway.client(provider) or self.client, model
 
 
-    def _ask_gemini_native(self, prompt, history, sys_prompt):
+    def _ask_gemini_native(self, prompt, history, sys_prompt, stream_callback=None):
         """
         Direct inference via Google Generative AI (Native Lane).
         Bypasses OpenRouter for massive context handling.
+        When `stream_callback` is given, text chunks are forwarded as they arrive.
         """
         try:
             # Construct a chat session resembling OpenAI structure
@@ -1839,6 +1702,15 @@ Your answer:"""
             # Send the new prompt
             final_prompt = f"System Instruction: {sys_prompt}\n\nUser Query: {prompt}"
             
+            if stream_callback:
+                parts = []
+                for chunk in chat.send_message(final_prompt, stream=True):
+                    piece = getattr(chunk, "text", "")
+                    if piece:
+                        parts.append(piece)
+                        stream_callback(piece)
+                return "".join(parts)
+
             response = chat.send_message(final_prompt)
             return response.text
             
@@ -1847,34 +1719,47 @@ Your answer:"""
             return f"Error: {str(e)}"
 
 
-    def ask_ai(self, text, stream_callback=None, context="main"):
+    def ask_ai(self, text, stream_callback=None, context="main", session_id=None):
+        """Runs one turn with the caller's session state bound to this thread."""
+        session_id = session_id or context
+        token = sessions.bind(session_id)
+        try:
+            with tracer.trace("ask_ai", context=context):
+                return self._ask_ai(text, stream_callback, context, session_id)
+        finally:
+            sessions.unbind(token)
+
+    def _ask_ai(self, text, stream_callback=None, context="main", session_id=None):
         """
         The Zenith Brain Master Logic (v3.4) with Dual Context Support.
         
         Args:
             text: User input
-            stream_callback: Optional streaming callback
+            stream_callback: Optional callable receiving answer deltas as they arrive
             context: "main" for orb chat, "ide" for IDE studio
+            session_id: Conversation to continue (defaults to the context name)
         """
         if not text: return
         self.is_busy = True
+
+        # Per-stage timing (ms) recorded in the trace and the ask_ai.* histograms
+        stages = {}
+        def stage_done(name, since):
+            stages[name] = tracer.record_since(f"ask_ai.{name}", since)
         
         # Switch to appropriate history based on context
-        if context == "ide":
-            self.history = self.ide_history
-            force_coding = True  # IDE always uses coding mode
-        else:
-            self.history = self.main_history
-            force_coding = False
+        session_id = session_id or context
+        force_coding = (context == "ide")  # IDE always uses coding mode
         
         # Ensure Provider is Active
         self._init_ai()
         
-        # Zenith v17: Local Fallback Check
-        if getattr(config, 'ENABLE_LOCAL_FALLBACK', False) and hasattr(self, 'ollama_client'):
+        # Zenith v17: Local Fallback Check (cached connectivity, no per-turn probe)
+        offline = False
+        if getattr(config, 'ENABLE_LOCAL_FALLBACK', False) and getattr(self, 'ollama_client', None):
             if not self._is_internet_available():
                 logger.warning("🌐 [OFFLINE] Internet unavailable. Switching to Ollama Local Lane.")
-                self.provider = "ollama"
+                offline = True
         if not self.client and not self.model:
             err = "AI મગજ અત્યારે ઓફલાઇન છે. કૃપા કરીને API કી તપાસો."
             if hasattr(self, 'output_callback'): 
@@ -1913,16 +1798,14 @@ Your answer:"""
                     translation_prompt = f"Translate this to {target_lang.title()}. Only output the translation:\n\n{self.last_response_text[:3000]}"
                     
                     # Use fast model with short response
-                    client, model = self.get_client_and_model(config.FAST_MODEL)
-                    response = client.chat.completions.create(
-                        model=model,
-                        messages=[{"role": "user", "content": translation_prompt}],
+                    translated, _ = router.complete(
+                        config.FAST_MODEL,
+                        [{"role": "user", "content": translation_prompt}],
                         max_tokens=2000,
                         temperature=0.3,
                         timeout=30  # 30 second timeout
                     )
-                    
-                    translated = response.choices[0].message.content.strip()
+                    translated = translated.strip()
                     
                     if translated:
                         logger.info(f"✅ Translated to {target_lang}")
@@ -1971,7 +1854,9 @@ Your answer:"""
                 return final
 
         # Phase 1: Normalization & Local Route
+        stage_start = time.perf_counter()
         normalized, detected_lang = self.normalize_input(text)
+        stage_done("normalize", stage_start)
         
         # Override with locked language if set
         if getattr(self, 'locked_language', None):
@@ -1979,7 +1864,9 @@ Your answer:"""
             
         logger.info(f"Zenith Processing ({detected_lang}): {normalized}")
 
+        stage_start = time.perf_counter()
         intent = self.route_intent(normalized)
+        stage_done("route", stage_start)
 
         # Phase 1.5: Pending Intent Check (Interactive Flow)
         if self.pending_intent:
@@ -1995,8 +1882,9 @@ Your answer:"""
         vision_content = ""
         vision_keywords = ['see my screen', 'look at my screen', 'what is on my screen', 'analyze my screen', 'જુઓ મારું સ્ક્રીન']
         if VISION_AVAILABLE and any(w in normalized.lower() for w in vision_keywords):
-            self.speak_threaded("Checking your screen... one moment.")
-            vision_content = vision.analyze_screen()
+            self.speak_threaded(VOICE_REPLIES["vision_check"])
+            with tracer.span("ask_ai.vision"):
+                vision_content = vision.analyze_screen()
             logger.info(f"👁️ Zenith Vision: {vision_content[:100]}...")
             # Inject vision into the context
             normalized = f"[SCREEN ANALYSIS]: {vision_content}\n\nUSER QUESTION: {normalized}"
@@ -2004,6 +1892,7 @@ Your answer:"""
         # Phase 1.6: Browser/Search Intent Check
         browser_content = ""
         if BROWSER_AVAILABLE and any(w in normalized.lower() for w in ['browse', 'search google', 'check website', 'visit page']):
+            stage_start = time.perf_counter()
             try:
                 # Extract URL or Query
                 if "browse" in normalized.lower() or "visit" in normalized.lower():
@@ -2029,6 +1918,7 @@ Your answer:"""
                     browser_content = f"\n\n[GOOGLE SEARCH RESULTS]:\n{results}\n"
             except Exception as e:
                 logger.error(f"Browser skill failed: {e}")
+            stage_done("browser", stage_start)
         
         # Phase 2: Determine if this is a Coding Task
         # IDE context ALWAYS forces coding mode
@@ -2038,45 +1928,13 @@ Your answer:"""
         else:
             # Check RAW TEXT for [IDE_MODE] because normalization strips brackets
             is_ide_trigger = "[ide_mode]" in text.lower()
-            coding_keywords = [
-                # General coding terms
-                'write code', 'write script', 'write program', 'function', 'class', 'debug', 'compile', 'execute', 
-                'refactor', 'algorithm', 'syntax error', 'software', 'develop',
-                
-                # Programming Languages
-                'python code', 'java code', 'javascript', 'typescript', 'c++ code', 'c# code', 'csharp', 'rust code',
-                'php code', 'ruby code', 'swift code', 'kotlin', 'scala', 'perl code', 'matlab', 'julia code', 
-                'dart code', 'elixir', 'haskell', 'lua code', 'bash script', 'shell script', 'powershell',
-                
-                # Web Technologies
-                'html code', 'css style', 'react', 'vue', 'angular', 'nodejs', 'express', 'django', 'flask',
-                'fastapi', 'spring', 'laravel', 'rails', 'jquery', 'bootstrap', 'tailwind',
-                
-                # Databases & SQL
-                'sql query', 'database query', 'create table', 'select from', 'insert into', 'update set', 
-                'delete from', 'mysql', 'postgresql', 'mongodb', 'sqlite',
-                
-                # Mobile Development
-                'android app', 'ios app', 'flutter app', 'react native',
-                
-                # Data Science & ML
-                'pandas', 'numpy', 'tensorflow', 'pytorch', 'sklearn', 'keras',
-                'jupyter notebook', 'machine learning', 'neural network',
-                
-                # DevOps
-                'docker container', 'kubernetes', 'github repo', 'gitlab',
-                
-                # Gujarati coding terms
-                'કોડ લખ', 'પાયથોન કોડ', 'પ્રોગ્રામ',
-                
-                # Hindi coding terms
-                'कोड लिखो', 'प्रोग्राम बनाओ',
-            ]
-            is_coding = (intent == Intent.CODING) or is_ide_trigger or any(w in normalized.lower() for w in coding_keywords)
+            is_coding = (intent == Intent.CODING) or is_ide_trigger or self.prompt_library.is_coding_request(normalized)
         
         # Local Intent bypass (except for coding, which needs LLM)
         if intent != Intent.SMALL_TALK and not is_coding:
+            stage_start = time.perf_counter()
             local_response = self.execute_intent(intent, normalized)
+            stage_done("local_intent", stage_start)
             if local_response:
                 # --- AGENT-LIGHTNING: LOG TRACE (Local Tool) ---
                 trace_logger.log_interaction(
@@ -2084,7 +1942,9 @@ Your answer:"""
                     system_prompt="Local Tool Mode",
                     assistant_response=local_response,
                     tools_used=[trace_logger.log_tool_result(intent.value, normalized, local_response, True)],
-                    reward=1
+                    reward=1,
+                    stages=stages,
+                    spans=tracer.sampled_spans()
                 )
                 
                 if hasattr(self, 'output_callback'): self.output_callback(local_response, is_ide=False)
@@ -2128,11 +1988,13 @@ Your answer:"""
         # --- RAG CONTEXT INJECTION (Doc-Genius) ---
         context_prompt = ""
         if intent == Intent.PDF_QUERY or (doc_brain.active_doc and ("pdf" in normalized.lower() or "આમાં" in normalized)):
-            context = doc_brain.query(normalized)
+            with tracer.span("ask_ai.rag"):
+                context = doc_brain.query(normalized)
             context_prompt = f"\n\n[DOCUMENT CONTEXT ({doc_brain.active_doc})]\n{context}\n\nઉપરની માહિતીના આધારે જવાબ આપો."
             logger.info(f"Injecting RAG Context from {doc_brain.active_doc}")
 
         # --- LANGUAGE & IDENTITY LOGIC ---
+        prompt_start = time.perf_counter()
         # 0. LANGUAGE SWITCH COMMANDS
         lang_match = re.search(r'(speak in|switch to|talk in) (\w+)', normalized.lower())
         if lang_match:
@@ -2144,110 +2006,23 @@ Your answer:"""
         
         detected_lang = self.current_language # PERSISTENT DEFAULT
 
-        # --- PROMETHEUS PROTOCOL INJECTION ---
-        prometheus_prompt = ""
-        try:
-            p_path = os.path.join(os.path.dirname(__file__), "resources", "prompts", "bankoo_prometheus.txt")
-            if os.path.exists(p_path):
-                with open(p_path, "r", encoding="utf-8") as f:
-                    prometheus_prompt = "\n\n" + f.read()
-        except Exception as e:
-            logger.warning(f"Failed to load Prometheus Protocol: {e}")
-
-        # Construct Multilingual System Prompts
-        prompts = {
-            "english": (
-                "You are 'Bankoo', a highly professional AI assistant. "
-                "Provide clear, concise, and helpful answers in English. "
-                "Maintain a formal yet friendly tone."
-                + prometheus_prompt
-            ),
-            "hindi": (
-                "आप 'Bankoo' हैं, एक पेशेवर AI सहायक। "
-                "नियम: \n"
-                "1. केवल शुद्ध हिंदी (हिंदी लिपि) में उत्तर दें। \n"
-                "2. अंग्रेजी शब्दों का प्रयोग कम से कम करें, केवल तकनीकी शब्दों के लिए। \n"
-                "3. उत्तर सम्मानजनक और मददगार होना चाहिए।"
-            ),
-            "marathi": (
-                "तुम्ही 'Bankoo' आहात, एक व्यावसायिक AI सहाय्यक। "
-                "नियम: \n"
-                "1. फक्त शुद्ध मराठी (मराठी लिपी) मध्ये उत्तर द्या। \n"
-                "2. तांत्रिक शब्दांशिवाय इतरत्र इंग्रजी शब्दांचा वापर टाळा। \n"
-                "3. उत्तर स्पष्ट आणि नम्र असावे।"
-            ),
-            # --- ZENITH PROMPT BUCKETS (Phase 3: Selective Optimization) ---
-            # These buckets allow Agent-Lightning to optimize specific behaviors independently.
-            "buckets": {
-                "persona": "Tame 'Bankoo' chho, Meet na personal professional AI assistant. Output natural, human-like reasoning.",
-                "output_rules": "1. Natural, fluent script only. 2. Respectful, friendly tone (Standard/Surti). 3. No robotic phrasing. 4. Detailed explanations.",
-                "technical_handling": "For unknown technical terms, use English in brackets or transliteration."
-            },
-            "gujarati": (
-                "{persona}\n"
-                "Output Instructions: \n"
-                "{output_rules}\n"
-                "{technical_handling}"
-            ).format(
-                persona="Tame 'Bankoo' chho, Meet na personal professional AI assistant.",
-                output_rules="1. Write ONLY in natural, fluent Gujarati Script (ગુજરાતી લિપિ). \n2. Tone: Respectful, friendly, and helpful (Standard/Surti mix). \n3. Use 'Tame' and 'Aapo' for respect. ",
-                technical_handling="4. For technical terms not in your mapping, you can use English in brackets or Gujarati transliteration. \n5. Provide detailed, human-like explanations."
-            ),
-            "nepali": (
-                "तपाईं 'Bankoo' हुनुहुन्छ, एक पेशेवर AI सहायक। "
-                "नियम: \n"
-                "1. केवल शुद्ध नेपाली (नेपाली लिपि) मा उत्तर दिनुहोस्। \n"
-                "2. अंग्रेजी शब्दहरूको प्रयोग कम से कम गर्नुहोस्, केवल प्राविधिक शब्दहरूको लागि। \n"
-                "3. उत्तर सम्मानजनक र सहयोगी हुनुपर्छ।"
-            ),
-            "bihari": (
-                "रउआ 'Bankoo' बानी। "
-                "नियम: \n"
-                "1. रउआ एकदम खाँटी भोजपुरी (Bihari Style) में बात करे के बा। \n"
-                "2. 'रउआ', 'का हाल बा', 'ठीक बा', 'बुझनी' जइसन शब्द के प्रयोग करीं। \n"
-                "3. जवाब एकदम अपनत्व वाला और आदर सम्मान से भरल होखे के चाहीं। \n"
-                "4. लिपि देवनागरी (Hindi Script) ही रही।"
-            ),
-            "pahadi": (
-                "तुसी 'Bankoo' हो, पहाड़ा दा AI साथी। "
-                "नियम: \n"
-                "1. तुसी पहाड़ी/हिमाचली/गढ़वाली अंदाज विच गल करनी है। \n"
-                "2. मीठी और सरल भाषा दा प्रयोग करो, जिवें पहाड़ा दे लोग बोलदे ने। \n"
-                "3. 'ji', 'bhaiji', 'theek cha' जइसन शब्द (Context अनुसार) use करो। \n"
-                "4. जवाब देवनागरी लिपि विच ही देना है।"
-            )
-        }
-        self.prompts = prompts # Expose for external access
+        # Precompiled per-language prompts (rebuilt only when a template file changes)
+        self.prompts = self.prompt_library.prompts # Expose for external access
 
         if is_coding:
-            # Universal Studio: AI detects language automatically
-            sys_prompt = (
-                "You are 'Bankoo AI', a premium AI IDE assistant created for Meet Sutariya, an expert developer. "
-                "Meet is professional-grade and expects exceptional code quality. "
-                "\nCODE LANGUAGE DETECTION: "
-                "1. Automatically detect the target programming language from the user's request. "
-                "2. Write ALL code in 100% English. "
-                "\nEXPLANATION RULES: "
-                f"3. Write brief explanations in {detected_lang.title()} script ONLY (2-3 sentences maximum). "
-                "4. Use native script, NOT romanized transliteration."
-            )
+            sys_prompt = self.prompt_library.coding_prompt(detected_lang)
         else:
-
             # FORCE COMPLIANCE: Use the persistent language choice
-            sys_prompt = self.prompts.get(self.current_language, self.prompts["gujarati"])
-            
-            # Add Explicit Instruction to override model defaults
-            sys_prompt += (
-                f"\nIMPORTANT INSTRUCTION: You MUST reply in {self.current_language.upper()} language only. "
-                "Do not switch to English unless asked."
-            )
-            sys_prompt += f"\nUser: {self.knowledge.facts['creator']}"
+            sys_prompt = self.prompt_library.chat_prompt(self.current_language, self.knowledge.facts['creator'])
             
             # Inject Browser Content if any
             if browser_content:
                 sys_prompt += browser_content
+        cache_prompt = sys_prompt # Persona/language prompt before per-turn memory recall
+        stage_done("prompt_build", prompt_start)
 
         # --- VECTOR BRAIN RECALL ---
+        stage_start = time.perf_counter()
         if VECTOR_BRAIN_AVAILABLE:
             try:
                 # Semantic search for relevant context based on user input
@@ -2271,6 +2046,7 @@ Your answer:"""
                         sys_prompt += f"- {key}: {val}\n"
             except Exception as e:
                 logger.warning(f"Memory retrieval failed: {e}")
+        stage_done("recall", stage_start)
         try:
             # --- DYNAMIC ROLE-BASED ROUTING ---
             target_model_id = config.PRIMARY_MODEL
@@ -2285,56 +2061,109 @@ Your answer:"""
                 target_model_id = config.REASONING_MODEL
                 logger.info(f"🧠 REASONING MODE: Routing to {target_model_id}")
 
+            if offline:
+                target_model_id = f"ollama/{getattr(config, 'OLLAMA_MODEL', 'llama3.2:3b')}"
+
             # 3. SPEED MODE: Disabled - Always use PRIMARY_MODEL for best quality
             # (Uncomment below if you want to re-enable fast routing for very short queries)
             # elif (intent in [Intent.SMALL_TALK, Intent.TELL_JOKE] or len(normalized) < 10) and detected_lang not in ['gujarati', 'hindi', 'english']:
             #     target_model_id = getattr(config, 'FAST_MODEL', config.PRIMARY_MODEL)
             #     logger.info(f"⚡ SPEED MODE: Routing to {target_model_id}")
 
+            # Newest turns that fit this model's token budget; the running summary joins the system prompt
+            stage_start = time.perf_counter()
+            history, history_summary = self.history_manager.context(session_id, target_model_id)
+            sys_prompt += history_summary
+            stage_done("history", stage_start)
+
             # --- PHASE 3: METRICS START ---
             start_time = time.time()
-
-            # Get the correct client and cleaned model name
-            selected_client, final_model = self._get_brain_client(target_model_id)
+            inference_start = time.perf_counter()
+            first_token_at = None
+
+            # Time-To-First-Token: stamp the first delta before forwarding it
+            on_delta = None
+            if stream_callback:
+                def on_delta(delta):
+                    nonlocal first_token_at
+                    if first_token_at is None:
+                        first_token_at = time.time()
+                        tracer.record_since("ask_ai.ttft", inference_start)
+                    stream_callback(delta)
+
+            # --- RESPONSE CACHE (exact + semantic, keyed on the persona prompt) ---
+            # Turns carrying per-request context (documents, browsing, offline lane) are never cached
+            answer, answer_ok, cache_outcome = None, False, "off"
+            served_by = target_model_id  # Lane that actually answered (recorded in the trace)
+            if getattr(config, 'RESPONSE_CACHE_ENABLED', True) and not (context_prompt or browser_content or offline):
+                with tracer.span("ask_ai.cache_lookup"):
+                    answer, cache_outcome = response_cache.get(target_model_id, cache_prompt, normalized, intent)
+
+            if answer:
+                logger.info(f"♻️ [CACHE] {cache_outcome} hit for {target_model_id} ({len(answer)} chars)")
+                if on_delta:
+                    on_delta(answer)
+            else:
+                # Provider lanes that can serve this model (requested + configured equivalents)
+                router_ready = bool(router.lanes_for(target_model_id))
             
-            if self.provider == "gemini_native":
-                 answer = self._ask_gemini_native(normalized, self.history[-self.history_limit:], sys_prompt + context_prompt)
+                if self.provider == "gemini_native" and not offline:
+                     answer = self._ask_gemini_native(normalized, history, sys_prompt + context_prompt, stream_callback=on_delta)
                  
-                 # SMART FAILOVER: If Gemini fails (Error/Quota), fall through to Backup
-                 if not answer or answer.startswith("Error"):
-                     logger.warning(f"⚠️ Direct Gemini Lane Failed ({answer}). Switching to Backup Routes...")
-                     # Reset provider temporarily to force standard routing below
-                     self.provider = "failover" # This ensures we hit the 'elif selected_client' block or re-select
+                     # SMART FAILOVER: If Gemini fails (Error/Quota), fall through to Backup
+                     answer_ok = bool(answer) and not answer.startswith("Error")
+                     served_by = "gemini/native"
+                     if not answer_ok:
+                         logger.warning(f"⚠️ Direct Gemini Lane Failed ({answer}). Switching to Backup Routes...")
+                         # Reset provider temporarily to force standard routing below
+                         self.provider = "failover" # This ensures we hit the provider router block below
              
-             # Fallback Logic (OpenRouter / Groq)
-            if selected_client and (self.provider != "gemini_native" or not answer or answer.startswith("Error")):
-                logger.info(f"⚡ [BRAIN] Executing {final_model} via {selected_client.base_url}")
-                try:
-                    messages = [{"role": "system", "content": sys_prompt + context_prompt}]
-                    messages.extend(self.history[-self.history_limit:])
-                    messages.append({"role": "user", "content": normalized})
+                 # Fallback Logic (OpenRouter / Groq) - only when no lane has answered yet
+                if not answer_ok and router_ready:
+                    logger.info(f"⚡ [BRAIN] Executing {target_model_id} via provider router")
+                    try:
+                        messages = [{"role": "system", "content": sys_prompt + context_prompt}]
+                        messages.extend(history)
+                        messages.append({"role": "user", "content": normalized})
                     
-                    resp = selected_client.chat.completions.create(
-                        model=final_model,
-                        messages=messages,
-                        temperature=0.7,
-                        max_tokens=2048,
-                        timeout=30  # Faster timeout for quicker error detection
-                    )
-                    answer = resp.choices[0].message.content
-                    logger.info(f"✅ [BRAIN] Response received ({len(answer)} chars)")
-                except TimeoutError as e:
-                    logger.error(f"⏱️ API Timeout: {e}")
-                    answer = "Server is taking too long. Please try again."
-                except Exception as e:
-                    logger.error(f"Brain Link Error: {type(e).__name__}: {e}")
-                    answer = f"Sorry, I encountered an error: {type(e).__name__}. Please try again."
-            elif self.model: # Gemini Fallback (Direct SDK)
-                full_prompt = f"{sys_prompt}{context_prompt}\nUser: {normalized}"
-                answerValue = self.model.generate_content(full_prompt)
-                answer = answerValue.text
-            else:
-                answer = "AI સિસ્ટમ કનેક્ટ થઈ શકી નથી."
+                        # Hedged across equivalent lanes; failing providers are skipped by their breakers
+                        answer, lane = router.complete(
+                            target_model_id, messages, on_delta,
+                            temperature=0.7,
+                            max_tokens=2048,
+                            timeout=30  # Hard ceiling; hedging normally answers well before this
+                        )
+                        logger.info(f"✅ [BRAIN] Response received via {lane} ({len(answer)} chars)")
+                        answer_ok = True
+                        served_by = lane
+                    except TimeoutError as e:
+                        logger.error(f"⏱️ API Timeout: {e}")
+                        answer = "Server is taking too long. Please try again."
+                    except Exception as e:
+                        logger.error(f"Brain Link Error: {type(e).__name__}: {e}")
+                        answer = f"Sorry, I encountered an error: {type(e).__name__}. Please try again."
+                elif not answer_ok and self.model and first_token_at is None: # Gemini Fallback (Direct SDK), never after a partial stream
+                    full_prompt = f"{sys_prompt}{context_prompt}\nUser: {normalized}"
+                    if on_delta:
+                        parts = []
+                        for chunk in self.model.generate_content(full_prompt, stream=True):
+                            piece = getattr(chunk, "text", "")
+                            if piece:
+                                parts.append(piece)
+                                on_delta(piece)
+                        answer = "".join(parts)
+                    else:
+                        answerValue = self.model.generate_content(full_prompt)
+                        answer = answerValue.text
+                    answer_ok = True
+                    served_by = "gemini/sdk"
+                elif not answer_ok:
+                    answer = "AI સિસ્ટમ કનેક્ટ થઈ શકી નથી."
+
+                if answer_ok and cache_outcome == "miss":
+                    response_cache.put(target_model_id, cache_prompt, normalized, answer, intent)
+
+            stage_done("inference", inference_start)
 
             # Post-Process: Do not truncate. Trust the model's punctuation.
             if not is_coding:
@@ -2344,6 +2173,8 @@ Your answer:"""
             final_output = answer
 
             # --- MEMORY STORAGE (VECTOR BRAIN) ---
+            # add_memory only enqueues; the brain's writer thread batches the Chroma writes
+            stage_start = time.perf_counter()
             if VECTOR_BRAIN_AVAILABLE:
                 # 1. Explicit Remember Commands
                 if any(w in normalized.lower() for w in ['remember', 'save', 'store', 'recall', 'yaad rakh', 'save kar']):
@@ -2357,20 +2188,20 @@ Your answer:"""
                 # 2. Implicit Conversation Memory (The "Photographic" Brain)
                 # We save interactions that contain substantial information (len > 15 chars)
                 elif len(normalized) > 15 and not any(w in normalized.lower() for w in ["hi", "hello", "thanks", "bye", "ok"]):
-                     threading.Thread(
-                         target=vector_brain.add_memory, 
-                         args=(f"User: {normalized}\nAI: {answer}", "conversation"), 
-                         daemon=True
-                     ).start()
+                     vector_brain.add_memory(f"User: {normalized}\nAI: {answer}", "conversation")
+
+            stage_done("memory_store", stage_start)
 
             # Final Output Sequence
+            stage_start = time.perf_counter()
             if hasattr(self, 'output_callback'): 
                 self.output_callback(final_output, is_ide=(is_coding or is_ide_trigger))
+            stage_done("deliver", stage_start)
             
             # ISOLATION: Only add to main history if NOT in IDE mode
             if not is_coding and not is_ide_trigger:
-                self.history.append({"role": "user", "content": normalized})
-                self.history.append({"role": "assistant", "content": answer})
+                self.history_manager.append(session_id, "user", normalized)
+                self.history_manager.append(session_id, "assistant", answer)
                 
                 # Zenith v19: Persist to Long-Term Vector Memory
                 if VECTOR_BRAIN_AVAILABLE:
@@ -2383,16 +2214,24 @@ Your answer:"""
             # --- AGENT-LIGHTNING: LOG TRACE ---
             # Phase 3: High-Fidelity Metrics (Latency & Density)
             latency = time.time() - start_time
+            # Without streaming the first token arrives together with the full answer
+            ttft = (first_token_at - start_time) if first_token_at else latency
             complexity_score = len(answer.split()) / 50.0 # Words density heuristic
+            logger.info(f"⏱️ [BRAIN] TTFT {ttft:.2f}s | Total {latency:.2f}s | Stages(ms) {stages}")
             
             trace_logger.log_interaction(
                 user_input=text,
                 system_prompt=sys_prompt + context_prompt,
                 assistant_response=answer,
                 reward=1 if not "ક્ષમા કરશો" in answer else -1,
+                ttft=round(ttft, 2),
                 latency=round(latency, 2),
                 complexity=round(complexity_score, 2),
-                lang=detected_lang
+                lang=detected_lang,
+                stages=stages,
+                cache=cache_outcome,
+                model=served_by,
+                spans=tracer.sampled_spans()
             )
             
             # Smart Voice: Extract explanation (text outside code blocks) and ALWAYS speak it
@@ -2416,7 +2255,7 @@ Your answer:"""
 
         except Exception as e:
             logger.error(f"Zenith Brain Fault: {e}")
-            err_msg = "ક્ષમા કરશો, AI સર્વર અત્યારે વ્યસ્ત છે. કૃપા કરીને થોડી વાર પછી પ્રયાસ કરો."
+            err_msg = VOICE_REPLIES["ai_busy"]
             if hasattr(self, 'output_callback'): self.output_callback(err_msg, is_ide=(is_coding or is_ide_trigger))
             return err_msg # RETURN ERROR MSG
         finally:
@@ -2476,14 +2315,15 @@ Your answer:"""
                     
         threading.Thread(target=_exec, daemon=True).start()
 
-    def speak_zenith(self, text, is_ide=False, lang=None):
+    def _prepare_speech(self, text, lang=None):
         """
-        Ultra-High-Fidelity TTS using neural Edge-TTS provider.
+        Cleans text and resolves (engine_text, lang, voice) exactly as Zenith TTS speaks it.
+        Returns None when nothing speakable is left.
         """
         # 1. Remove Zenith Tags [IDE_MODE], etc and emojis (emojis crash Edge-TTS)
         clean = re.sub(r'\[.*?\]', '', text).strip()
         clean = re.sub(r'[\U00010000-\U0010ffff\u2600-\u26FF\u2700-\u27BF]', '', clean).strip()
-        if not clean: return
+        if not clean: return None
 
         # 2. Safety Override: Ensure script matches voice to prevent NoAudioReceived errors
         if re.search(r'[\u0a80-\u0aff]', clean): 
@@ -2503,51 +2343,56 @@ Your answer:"""
 
         # 3. Prepare text for engine (Pre-translate tech terms for natural flow)
         text = self.apply_phonetic_mapping(clean, lang)
-        
-        temp_audio = f"zenith_voice_{random.randint(100, 999)}.mp3"
         voice = self.language_voices.get(lang, self.language_voices['gujarati'])
-        
-        logger.info(f"Zenith TTS ({lang}): Synthesizing voice with {voice}...")
-        
-        try:
-            import edge_tts
-            import asyncio
+        return text, lang, voice
 
-            async def generate_audio():
-                communicate = edge_tts.Communicate(text, voice, rate="+10%")
-                await communicate.save(temp_audio)
+    @tracer.traced("tts.speak_zenith")
+    def speak_zenith(self, text, is_ide=False, lang=None):
+        """
+        Ultra-High-Fidelity TTS using neural Edge-TTS provider.
+        """
+        fixed = text in STATIC_VOICE_REPLIES  # Only fixed replies are worth a voice cache slot
+        prepared = self._prepare_speech(text, lang)
+        if not prepared: return
+        text, lang, voice = prepared
 
-            # executing async function in sync context
-            try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(generate_audio())
-                loop.close()
-            except Exception as e:
-                logger.error(f"Edge-TTS Library Error: {e}")
-                return
+        logger.info(f"Zenith TTS ({lang}): Synthesizing voice with {voice}...")
 
-            if os.path.exists(temp_audio):
-                with open(temp_audio, "rb") as f:
-                    audio_data = f.read()
-                    b64 = "data:audio/mp3;base64," + base64.b64encode(audio_data).decode()
-                    
-                    if hasattr(self, 'audio_callback'):
-                        self.audio_callback(b64, is_ide=is_ide)
-                    else:
-                        logger.warning("No audio_callback registered for Zenith Brain.")
-            else:
-                logger.error("Zenith TTS: Audio file was not created.")
+        if not hasattr(self, 'audio_callback'):
+            logger.warning("No audio_callback registered for Zenith Brain.")
+            return
+
+        # 4. Sentence pipeline: each clip is emitted in order as soon as it is ready
+        def emit(audio_data, index, total):
+            b64 = "data:audio/mp3;base64," + base64.b64encode(audio_data).decode()
+            self.audio_callback(b64, is_ide=is_ide)
 
+        try:
+            with tracer.span("tts.pipeline"):
+                chunks = self.voice_pipeline.speak(text, voice, emit, rate="+10%", store=fixed)
+            if not chunks:
+                logger.error("Zenith TTS: No audio was produced.")
         except Exception as e:
             logger.error(f"Zenith Voice Logic Fault: {e}")
-        finally:
-            if os.path.exists(temp_audio):
-                    try: os.remove(temp_audio)
-                    except: pass
+
+    def warm_voice_cache(self):
+        """Pre-renders STATIC_VOICE_REPLIES for every voice in language_voices (cache misses only)."""
+        items = []
+        for lang in self.language_voices:
+            for phrase in STATIC_VOICE_REPLIES:
+                prepared = self._prepare_speech(phrase, lang)
+                if prepared:
+                    items.append((prepared[0], prepared[2]))
+        items = list(dict.fromkeys(items))  # Script detection maps many (phrase, lang) pairs to one voice
+
+        start = time.time()
+        rendered = self.voice_pipeline.prerender(items, rate="+10%")
+        logger.info(f"🗄️ Voice cache warm-up: {rendered} new clips for {len(items)} phrase/voice pairs in {time.time() - start:.1f}s")
+        return rendered
 
     # --- MOBILE AUDIO INTERLINK ---
 
+    @tracer.traced("mobile_audio")
     def process_mobile_audio(self, raw_bytes, mode="chat", lang="python", source="mobile"):
         """
         Receives audio streams from remote mobile clients.
@@ -2562,6 +2407,7 @@ Your answer:"""
             self._init_ai()
             
             # --- HYBRID STT SENSING ---
+            stt_start = time.perf_counter()
             stt_mode = getattr(config, 'STT_MODE', 'online')
             
             if stt_mode == "offline":
@@ -2582,6 +2428,7 @@ Your answer:"""
                             response_format="text"
                         )
                         text = text_resp if isinstance(text_resp, str) else getattr(text_resp, 'text', '')
+            tracer.record_since(f"mobile_audio.stt_{stt_mode}", stt_start)
             
             if text:
                         text = text.strip()
@@ -24,6 +24,7 @@ from groq import Groq
 from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters, ContextTypes
 from skill_manager import skill_manager
+from response_cache import response_cache
 from vision_agent import VisionAgent
 from vision_kernel import VisionKernel
 # from agent_factory import AgentFactory # DEPRECATED
@@ -783,6 +784,13 @@ class MoltbotAgent:
             if injected_context:
                 final_system += f"\n\n[SYSTEM INJECTED KNOWLEDGE]:\n{injected_context}\n\n[INSTRUCTION]: Execute the request using this manual."
 
+            # Repeated questions are answered from the shared response cache (skill runs never are)
+            cache_model, cache_input = "groq/llama-3.3-70b-versatile", f"[{user}]: {text}"
+            if not injected_context:
+                cached, _ = response_cache.get(cache_model, final_system, cache_input)
+                if cached:
+                    return cached, None, None
+
             try:
                 c = self.groq_client.chat.completions.create(
                     model="llama-3.3-70b-versatile",
@@ -805,6 +813,8 @@ class MoltbotAgent:
                         else:
                             return f"❌ Skill '{skill_name}' requested but not found.", None, None
                 
+                if not injected_context:
+                    response_cache.put(cache_model, final_system, cache_input, reply)
                 return reply, None, None
             except Exception as e:
                 return f"❌ Brain Dead ({e})", None, None
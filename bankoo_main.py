@@ -1,5 +1,7 @@
 import os
 import sys
+import json
+import queue
 import threading
 import time
 import base64
@@ -12,10 +14,10 @@ def auto_install(package):
     subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
 try:
-    from flask import Flask, jsonify, request, send_from_directory
+    from flask import Flask, Response, jsonify, request, send_from_directory, g
 except ImportError:
     auto_install('flask')
-    from flask import Flask, jsonify, request, send_from_directory
+    from flask import Flask, Response, jsonify, request, send_from_directory, g
 
 try:
     from flask_cors import CORS
@@ -54,6 +56,8 @@ except Exception as e:
     SKILLS_AVAILABLE = False
     print(f"⚠️ [SKILLS] Not available: {e}")
 from brain_dashboard import BrainDashboard
+from serving import request_log, jobs, streams, wants_async, serve, QUIET_PATHS
+from telemetry import tracer
 
 # Initialize Scraper
 scraper = ScraperBrain()
@@ -100,7 +104,8 @@ def delayed_init():
         assistant.start_butler()
         
         # Sync with Document/Other Managers if needed
-        
+        from smart_notes_3 import notes_engine_v3
+        notes_engine_v3.brain.tagger.assistant = assistant  # Notes AI tagging uses the live brain
         
         brain_ready = True
         print("✅ [SYSTEM] Neural Brain ONLINE & Connected")
@@ -110,10 +115,28 @@ def delayed_init():
 threading.Thread(target=delayed_init, daemon=True).start()
 
 # Zenith Multi-Agent Bridge State
-message_queue = []
-queue_lock = threading.Lock()
+# Every UI event goes through the push bus (ring buffer + per-client cursors)
+from message_bus import bus
 native_window = None # Global reference for PyWebView bridge
 
+# Multi-user request handling: per-session FIFO on a bounded worker pool
+from session_scheduler import scheduler, SchedulerBusy
+from concurrent.futures import TimeoutError as FutureTimeout
+REQUEST_TIMEOUT = getattr(config, 'SESSION_REQUEST_TIMEOUT_SEC', 180)
+
+def _session_id(data, default="main"):
+    """Conversation key for a request: body 'session', else the X-Bankoo-Session header."""
+    return str((data or {}).get('session') or request.headers.get('X-Bankoo-Session') or default)
+
+def _busy_response(e):
+    print(f"🚦 [SCHEDULER] Rejected: {e}")
+    return (jsonify({"status": "busy", "error": str(e), "retry_after": e.retry_after}), 429,
+            {"Retry-After": str(max(1, round(e.retry_after)))})
+
+def ask_in_session(session_id, text, **kwargs):
+    """Runs ask_ai behind earlier requests of the same session and waits for the answer."""
+    return scheduler.submit(session_id, assistant.ask_ai, text, session_id=session_id, **kwargs).result(timeout=REQUEST_TIMEOUT)
+
 # --- YOUTUBE ANALYSIS STATE (Managed by YouTubeJobManager) ---
 # Legacy globals removed.
 
@@ -125,38 +148,34 @@ def on_brain_text(text, is_ide=False, source="internal"):
         print(f"DEBUG: on_brain_text called. text='{text[:20]}...', is_ide={is_ide}")
     except:
         pass
-    with queue_lock:
-        m_type = "ide_msg" if is_ide else "msg"
-        message_queue.append({
-            "type": m_type, 
-            "role": "BOT", 
-            "content": text, 
-            "source": source,
-            "timestamp": time.time()
-        })
+    m_type = "ide_msg" if is_ide else "msg"
+    bus.publish({
+        "type": m_type, 
+        "role": "BOT", 
+        "content": text, 
+        "source": source,
+        "timestamp": time.time()
+    })
 
 def on_brain_audio(b64, is_ide=False):
-    with queue_lock:
-        a_type = "ide_audio" if is_ide else "audio"
-        message_queue.append({"type": a_type, "content": b64, "timestamp": time.time()})
+    a_type = "ide_audio" if is_ide else "audio"
+    bus.publish({"type": a_type, "content": b64, "timestamp": time.time()})
 
 def on_ui_cmd(type, **kwargs):
-    with queue_lock:
-        payload = {"type": type}
-        payload.update(kwargs)
-        payload["timestamp"] = time.time()
-        message_queue.append(payload)
+    payload = {"type": type}
+    payload.update(kwargs)
+    payload["timestamp"] = time.time()
+    bus.publish(payload)
 
 def on_user_text(text, source="mic"):
-    """Helper to push user messages to the UI queue."""
-    with queue_lock:
-        message_queue.append({
-            "type": "msg", 
-            "role": "USER", 
-            "content": text, 
-            "source": source,
-            "timestamp": time.time()
-        })
+    """Helper to push user messages to the UI bus."""
+    bus.publish({
+        "type": "msg", 
+        "role": "USER", 
+        "content": text, 
+        "source": source,
+        "timestamp": time.time()
+    })
 
 # --- API ACTIVITY LOGGING ---
 @app.route('/api/bridge/telegram', methods=['POST'])
@@ -170,7 +189,13 @@ def bridge_telegram():
     print(f"🤖 [TELEGRAM BRIDGE] Received: {text[:80]}...")
     
     if assistant:
-        response = assistant.ask_ai(text)
+        # Each Telegram user continues their own conversation
+        try:
+            response = ask_in_session(f"telegram:{data.get('user', 'User')}", text)
+        except SchedulerBusy as e:
+            return _busy_response(e)
+        except FutureTimeout:
+            return jsonify({"error": "AI Brain timed out"}), 504
         if response is None: response = "⚠️ AI Brain Malfunction (No Response)"
         
         # --- MEDIA RETURN LOGIC ---
@@ -215,55 +240,51 @@ def generate_zenith_dashboard():
 @app.route('/api/zenith/mistakes', methods=['GET'])
 def get_zenith_mistakes():
     try:
-        import glob
-        import json
-        traces = []
-        files = glob.glob("logs/traces/*.jsonl")
-        for file in files:
-            with open(file, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        traces.append(json.loads(line))
-                    except: continue
-        
-        traces.sort(key=lambda x: x["timestamp"])
-        mistakes = [t for t in traces if t.get("reward", 0) < 0][-5:]
-        
-        formatted = []
-        for m in mistakes:
-            user_input = m["messages"][1]["content"] if len(m["messages"]) > 1 else "Unknown"
-            bad_ans = m["messages"][2]["content"] if len(m["messages"]) > 2 else "Empty"
-            # Try to find a fix
-            fix = next((t for t in traces if t.get("reward", 0) > 0 and t["timestamp"] > m["timestamp"] and t["messages"][1]["content"] == user_input), None)
-            
-            formatted.append({
-                "id": m["timestamp"],
-                "input": user_input,
-                "mistake": bad_ans,
-                "fix": fix["messages"][2]["content"] if fix else None,
-                "status": "Fixed" if fix else "Pending"
-            })
-            
-        return jsonify(formatted[::-1]) # Newest first
+        # Served from the incremental trace index (mistake -> fix pairs are precomputed)
+        return jsonify(dashboard_engine.index.mistakes(5)) # Newest first
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/zenith/analytics', methods=['GET'])
+def get_zenith_analytics():
+    """Success rate and TTFT percentiles overall and per (model, language)."""
+    try:
+        index = dashboard_engine.index
+        return jsonify({"summary": index.summary(), "by_model_language": index.latency_percentiles()})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Structured access log: errors and slow calls always, everything else sampled (config.ACCESS_LOG_*)
 @app.before_request
 def log_request():
-    if request.path.startswith('/api/') and request.path != '/api/get_updates':
-        print(f"📨 [API IN] {request.method} {request.path}")
-        # Only check JSON for methods that typically send JSON bodies
-        if request.method in ['POST', 'PUT', 'PATCH'] and request.is_json:
-            try:
-                print(f"   Data: {str(request.json)[:100]}...")
-            except:
-                pass  # Ignore JSON parsing errors
+    request_log.begin(request, g)
 
 @app.after_request
 def log_response(response):
-    if request.path.startswith('/api/') and request.path != '/api/get_updates':
-        print(f"📤 [API OUT] {request.path} → Status {response.status_code}")
-    return response
+    # Per-route latency histogram (time to response headers for streamed routes)
+    if request.url_rule is not None and request.path.startswith('/api/') and request.path not in QUIET_PATHS:
+        tracer.record_since(f"http {request.method} {request.url_rule.rule}", g.request_started)
+    return request_log.finish(request, g, response)
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Span latency histograms in Prometheus text format (?format=json for percentiles)."""
+    if request.args.get('format') == 'json':
+        return jsonify(tracer.snapshot())
+    return Response(tracer.prometheus(), mimetype="text/plain; version=0.0.4")
+
+def respond(kind, fn, *args, **kwargs):
+    """Runs a long handler inline, or as a background job (202 + id) if the client asked for async."""
+    if wants_async(request):
+        job_id = jobs.submit(kind, fn, *args, **kwargs)
+        return jsonify({"status": "accepted", "job_id": job_id, "poll": f"/api/jobs/{job_id}"}), 202
+    return jsonify(fn(*args, **kwargs))
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Poll target for requests started with ?async=1 / Prefer: respond-async."""
+    job = jobs.get(job_id)
+    return jsonify(job) if job else (jsonify({"error": "Unknown or expired job"}), 404)
 
 # --- FLASK ENDPOINTS ---
 @app.route('/')
@@ -293,17 +314,47 @@ def serve_ide():
     """Serves the Master IDE interface"""
     return send_from_directory('.', 'bankoo_ide.html')
 
+def _sse(payload):
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
 @app.route('/api/get_updates')
 def get_updates():
-    with queue_lock:
-        if message_queue:
-            cmds = [m for m in message_queue if m.get('type') == 'ui_cmd']
-            if cmds:
-                print(f"🚀 [DISPATCH] Sending commands: {[c['cmd'] for c in cmds]}")
-        
-        updates = list(message_queue)
-        message_queue.clear()
-        return jsonify(updates)
+    """Legacy polling endpoint. Each `?client=` id keeps its own server-side cursor."""
+    updates = bus.read_for(request.args.get('client', 'default'))
+    cmds = [m for m in updates if m.get('type') == 'ui_cmd']
+    if cmds:
+        print(f"🚀 [DISPATCH] Sending commands: {[c.get('cmd') for c in cmds]}")
+    return jsonify(updates)
+
+@app.route('/api/events')
+def event_stream():
+    """
+    Push delivery (SSE). Every connected tab/window receives every event.
+    Resumes from `Last-Event-ID` (sent automatically by EventSource on reconnect)
+    or `?cursor=`; new connections start at the live edge.
+    """
+    if not streams.acquire():
+        # At the stream cap: EventSource gives up on a 503, and the UI falls back to polling
+        return Response("retry: 30000\n\n", status=503, mimetype="text/event-stream",
+                        headers={"Retry-After": "30", "Cache-Control": "no-cache"})
+    resume = request.headers.get('Last-Event-ID') or request.args.get('cursor')
+    cursor = int(resume) if resume and resume.isdigit() else bus.last_seq
+
+    def generate():
+        nonlocal cursor
+        yield "retry: 2000\n\n"
+        while True:
+            events, cursor, dropped = bus.read(cursor, timeout=15)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            if dropped:
+                yield _sse({"type": "sys_gap", "dropped": dropped})
+            for evt in events:
+                yield f"id: {evt['seq']}\n" + _sse(evt)
+
+    return streams.attach(Response(generate(), mimetype="text/event-stream",
+                                   headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}))
 
 @app.route('/api/send_input', methods=['POST'])
 def flask_input():
@@ -313,23 +364,87 @@ def flask_input():
         print(f"💬 [USER INPUT] {text[:80]}...")
         
         if assistant:
-            print("🤖 [AI PROCESSING] Starting inference thread...")
+            session_id = _session_id(data)
+            print(f"🤖 [AI PROCESSING] Queueing inference for session '{session_id}'...")
             try:
-                threading.Thread(target=assistant.ask_ai, args=(text,), daemon=True).start()
-                print("✅ [THREAD] Thread launched.")
-            except Exception as e:
-                print(f"❌ [THREAD ERROR] Could not start thread: {e}")
+                scheduler.submit(session_id, assistant.ask_ai, text, session_id=session_id)
+            except SchedulerBusy as e:
+                return _busy_response(e)
         else:
             print("⏳ [SYSTEM] Input received while brain is still loading.")
-            with queue_lock:
-                message_queue.append({
-                    "type": "msg", 
-                    "role": "BOT", 
-                    "content": "I am just waking up! 🧠 Give me 5 more seconds to initialize my neural pathways, then ask me again.",
-                    "timestamp": time.time()
-                })
+            bus.publish({
+                "type": "msg", 
+                "role": "BOT", 
+                "content": "I am just waking up! 🧠 Give me 5 more seconds to initialize my neural pathways, then ask me again.",
+                "timestamp": time.time()
+            })
     return jsonify({"status": "received"})
 
+# --- TOKEN STREAMING (Server-Sent Events) ---
+def stream_ask(text, context="main", finalize=None, session_id=None):
+    """
+    Runs ask_ai on a session worker and relays its answer deltas as SSE frames.
+    The closing 'done' frame carries the full answer plus time-to-first-token;
+    `finalize(answer)` may add extra fields to it (e.g. IDE code extraction).
+    """
+    deltas = queue.Queue()
+    result = {}
+    started = time.time()
+
+    def _worker():
+        try:
+            result["answer"] = assistant.ask_ai(text, stream_callback=deltas.put, context=context, session_id=session_id)
+        except Exception as e:
+            result["error"] = str(e)
+        finally:
+            deltas.put(None)
+
+    session_id = session_id or context
+    if not streams.acquire():
+        # Every stream slot is taken: the UI retries through the non-streamed /api/send_input
+        return jsonify({"status": "busy", "error": "Too many open streams"}), 503, {"Retry-After": "5"}
+    try:
+        scheduler.submit(session_id, _worker)
+    except SchedulerBusy as e:
+        streams.release()
+        return _busy_response(e)
+
+    def generate():
+        ttft = None
+        while True:
+            delta = deltas.get()
+            if delta is None:
+                break
+            if ttft is None:
+                ttft = round(time.time() - started, 3)
+            yield _sse({"type": "delta", "content": delta})
+
+        answer = result.get("answer") or ""
+        done = {"type": "done", "content": answer, "ttft": ttft, "total": round(time.time() - started, 3)}
+        if "error" in result:
+            done["error"] = result["error"]
+        if finalize:
+            done.update(finalize(answer))
+        print(f"⏱️ [STREAM] TTFT {ttft}s | Total {done['total']}s")
+        yield _sse(done)
+
+    return streams.attach(Response(generate(), mimetype="text/event-stream",
+                                   headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}))
+
+@app.route('/api/stream_input', methods=['POST'])
+def flask_stream_input():
+    """Streaming twin of /api/send_input: answer tokens arrive as SSE 'delta' frames."""
+    data = request.json or {}
+    text = data.get('text', '')
+    if not text:
+        return jsonify({"error": "No text provided"}), 400
+    if not assistant:
+        return jsonify({"status": "loading"}), 503
+
+    print(f"💬 [USER INPUT/STREAM] {text[:80]}...")
+    context = data.get('context', 'main')
+    return stream_ask(text, context=context, session_id=_session_id(data, context))
+
 @app.route('/api/send_ide_input', methods=['POST'])
 def flask_ide_input():
     """IDE Studio Input - Always routes to coding context"""
@@ -340,22 +455,21 @@ def flask_ide_input():
         print(f"💻 [IDE INPUT] {text[:80]}...")
         
         if assistant:
-            print("🤖 [AI PROCESSING] Starting IDE inference thread...")
+            session_id = _session_id(data, "ide")
+            print(f"🤖 [AI PROCESSING] Queueing IDE inference for session '{session_id}'...")
             try:
                 # Force IDE context
-                threading.Thread(target=assistant.ask_ai, args=(text,), kwargs={"context": "ide"}, daemon=True).start()
-                print("✅ [THREAD] IDE Thread launched.")
-            except Exception as e:
-                print(f"❌ [THREAD ERROR] Could not start IDE thread: {e}")
+                scheduler.submit(session_id, assistant.ask_ai, text, context="ide", session_id=session_id)
+            except SchedulerBusy as e:
+                return _busy_response(e)
         else:
             print("⌛ [SYSTEM] IDE input received while brain is still loading.")
-            with queue_lock:
-                message_queue.append({
-                    "type": "ide_msg", 
-                    "role": "BOT", 
-                    "content": "IDE is initializing... Please wait.",
-                    "timestamp": time.time()
-                })
+            bus.publish({
+                "type": "ide_msg", 
+                "role": "BOT", 
+                "content": "IDE is initializing... Please wait.",
+                "timestamp": time.time()
+            })
     print(f"📤 [API OUT] /api/send_ide_input → Status 200")
     return jsonify({"status": "received"})
 
@@ -405,14 +519,32 @@ def ide_ask():
         
     print(f"✨ [AETHER COMMAND] {text[:50]}...")
     
-    # We call assistant.ask_ai synchronously here for the 'Better API' experience
-    # Since ask_ai is designed to return the text, we can use it directly.
-    # Note: This might block for a while, but for IDE tasks, it's often preferred over polling.
-    response = assistant.ask_ai(text)
-    
-    # Extract Agentic Metadata
+    # Synchronous for the 'Better API' experience: waits for this session's turn and its answer
+    try:
+        response = ask_in_session(_session_id(data), text)
+    except SchedulerBusy as e:
+        return _busy_response(e)
+    except FutureTimeout:
+        return jsonify({"answer": "Brain timed out", "code": ""}), 504
+    return jsonify(_parse_ide_response(response))
+
+@app.route('/api/ide/ask_stream', methods=['POST'])
+def ide_ask_stream():
+    """Streaming AETHER Mode: deltas as SSE, final frame matches /api/ide/ask."""
+    data = request.json or {}
+    text = data.get('text', '')
+
+    if not brain_ready or not assistant:
+        return jsonify({"answer": "Brain still loading...", "code": ""}), 503
+
+    print(f"✨ [AETHER COMMAND/STREAM] {text[:50]}...")
+    return stream_ask(text, finalize=_parse_ide_response, session_id=_session_id(data))
+
+def _parse_ide_response(response):
+    """Splits a raw IDE answer into explanation, code block and agentic metadata."""
     import re
-    
+    response = response or ""
+
     # 🔗 Target File Detection (e.g., "TARGET_FILE: index.html")
     target_file_match = re.search(r"TARGET_FILE:\s*([a-zA-Z0-9_\-\.]+)", response)
     target_file = target_file_match.group(1).strip() if target_file_match else ""
@@ -435,13 +567,13 @@ def ide_ask():
     if target_file and code:
          print(f"🧬 [AGENTIC] AI suggested target file: {target_file}")
 
-    return jsonify({
+    return {
         "answer": answer,
         "code": code,
         "target_file": target_file,
         "action": action,
         "raw": response
-    })
+    }
 
 @app.route('/api/ide/debate', methods=['POST'])
 def ide_debate():
@@ -454,20 +586,45 @@ def ide_debate():
         
     print(f"🏛️ [COUNCIL DEBATE] Starting session: {query[:50]}...")
     
-    # We use a custom response wrapper to capture the debate phases
-    # In a real streaming app, we'd use Server-Sent Events (SSE)
-    # For now, we'll return the final result and the debate phases
     from ai_council import council
-    result = council.debate(query)
-    
-    # Send result to UI history
-    on_brain_text(result, is_ide=True)
-    
-    # Return structured result for the IDE
-    return jsonify({
-        "status": "success",
-        "result": result
-    })
+    if not streams.acquire():
+        # Every stream slot is taken: run the debate without live partials
+        result = council.debate(query)
+        on_brain_text(result, is_ide=True)
+        return jsonify({"status": "success", "result": result, "timings": council.last_report})
+
+    # Each member's partial output is streamed back on this response as SSE frames
+    # while independent roles run in parallel
+    partials = queue.Queue()
+    outcome = {}
+
+    def _worker():
+        try:
+            outcome["result"] = council.debate(query, on_partial=lambda role, text, done: partials.put(
+                {"type": "council_partial", "role": role, "content": text, "done": done}))
+        except Exception as e:
+            outcome["error"] = str(e)
+        finally:
+            partials.put(None)
+
+    threading.Thread(target=_worker, name="CouncilDebate", daemon=True).start()
+
+    def generate():
+        while True:
+            evt = partials.get()
+            if evt is None:
+                break
+            yield _sse(evt)
+        if "error" in outcome:
+            yield _sse({"type": "done", "status": "error", "error": outcome["error"]})
+            return
+        # Send result to UI history
+        on_brain_text(outcome["result"], is_ide=True)
+        # Closing frame carries the structured result (per-role latency + critical path)
+        yield _sse({"type": "done", "status": "success", "result": outcome["result"], "timings": council.last_report})
+
+    return streams.attach(Response(generate(), mimetype="text/event-stream",
+                                   headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}))
 
 @app.route('/api/ide/sync_ai', methods=['POST'])
 def ide_sync_ai():
@@ -579,8 +736,7 @@ def flask_voice():
         
         try:
             if mode == "ide":
-                with queue_lock:
-                    message_queue.append({"type": "ide_msg", "role": "USER", "content": "(Voice Studio Input)", "timestamp": time.time()})
+                bus.publish({"type": "ide_msg", "role": "USER", "content": "(Voice Studio Input)", "timestamp": time.time()})
             elif source == 'telegram':
                  # Push visual indicator of Voice Note
                  on_user_text("[🎤 Voice Note Processing...]", source=f"telegram ({user})")
@@ -653,16 +809,33 @@ def flask_voice_toggle():
 
     # PATH B: Queue System (Reliability Fallback)
     cmd_type = "voice_start" if active else "voice_stop"
-    with queue_lock:
-        message_queue.append({
-            "type": "ui_cmd", 
-            "cmd": cmd_type, 
-            "content": f"External Trigger: {active}",
-            "timestamp": time.time()
-        })
+    bus.publish({
+        "type": "ui_cmd", 
+        "cmd": cmd_type, 
+        "content": f"External Trigger: {active}",
+        "timestamp": time.time()
+    })
     
     return jsonify({"status": "success", "mode": "native" if native_window else "polling"})
 
+@app.route('/api/voice/cache_stats', methods=['GET'])
+def voice_cache_stats():
+    """Hit-rate counters for the on-disk TTS cache."""
+    if not brain_ready:
+        return jsonify({"status": "error", "message": "Brain not ready"}), 503
+    return jsonify({"status": "success", "cache": assistant.voice_cache.stats()})
+
+@app.route('/api/llm/stats', methods=['GET'])
+def llm_gateway_stats():
+    """Per-provider call counts, router lanes/hedges/breakers, answer-cache hit rates and session queues."""
+    from llm_gateway import gateway
+    from provider_router import router
+    from response_cache import response_cache
+    return jsonify({"status": "success", "providers": gateway.stats(), "router": router.stats(),
+                    "response_cache": response_cache.stats(), "scheduler": scheduler.stats(),
+                    "jobs": jobs.stats(), "streams": streams.stats(),
+                    "access_log": request_log.stats()})
+
 @app.route('/api/upload_pdf', methods=['POST'])
 def upload_pdf():
     """Endpoint for Doc-Genius PDF uploads."""
@@ -682,24 +855,27 @@ def upload_pdf():
         file_path = os.path.join(upload_dir, file.filename)
         file.save(file_path)
         
-        # Process with Doc-Genius RAG Engine
+        # Process with Doc-Genius RAG Engine (as a background job if the client asked for async)
         print(f"📥 [PDF UPLOAD] Received {file.filename}. Processing...")
-        result_msg = doc_brain.load_pdf(file_path)
-        
-        if "Success" in result_msg:
-            # Notify UI of status
-            with queue_lock:
-                message_queue.append({
-                    "type": "sys", 
-                    "content": f"✅ Document Active: {file.filename}", 
-                    "timestamp": time.time()
-                })
-            return jsonify({"status": "success", "message": result_msg})
-        else:
-            return jsonify({"status": "error", "message": result_msg}), 500
+        if wants_async(request):
+            return respond("pdf_ingest", _ingest_pdf, file_path, file.filename)
+        result = _ingest_pdf(file_path, file.filename)
+        return jsonify(result), (200 if result["status"] == "success" else 500)
             
     return jsonify({"error": "Invalid file type. Only PDFs allowed."}), 400
 
+def _ingest_pdf(file_path, filename):
+    result_msg = doc_brain.load_pdf(file_path)
+    if "Success" not in result_msg:
+        return {"status": "error", "message": result_msg}
+    # Notify UI of status
+    bus.publish({
+        "type": "sys", 
+        "content": f"✅ Document Active: {filename}", 
+        "timestamp": time.time()
+    })
+    return {"status": "success", "message": result_msg}
+
 @app.route('/api/upload_dataset', methods=['POST'])
 def upload_dataset():
     """Endpoint for Zenith Analytics Hub CSV uploads."""
@@ -724,12 +900,11 @@ def upload_dataset():
         result_msg = analytics_brain.load_dataset(file_path)
         
         if "Success" in result_msg:
-            with queue_lock:
-                message_queue.append({
-                    "type": "sys", 
-                    "content": f"📊 Dataset Analyzed: {file.filename}", 
-                    "timestamp": time.time()
-                })
+            bus.publish({
+                "type": "sys", 
+                "content": f"📊 Dataset Analyzed: {file.filename}", 
+                "timestamp": time.time()
+            })
             return jsonify({"status": "success", "message": result_msg})
         else:
             return jsonify({"status": "error", "message": result_msg}), 500
@@ -905,16 +1080,12 @@ def moltbot_webhook():
         
         # Route to Bankoo Brain
         if assistant and brain_ready:
-            # Use threading to avoid blocking
-            def process_and_respond():
-                response = assistant.ask_ai(message)
-                print(f"✅ [BANKOO → MOLTBOT] Response ready ({len(response)} chars)")
-                
-                # Send back to Moltbot for delivery
-                # Moltbot will handle sending to the correct platform
-                return response
-            
-            response = process_and_respond()
+            # Each channel user gets their own conversation, queued behind their earlier messages
+            try:
+                response = ask_in_session(f"{channel}:{user}", message) or ""
+            except SchedulerBusy as e:
+                return _busy_response(e)
+            print(f"✅ [BANKOO → MOLTBOT] Response ready ({len(response)} chars)")
             
             return jsonify({
                 "response": response,
@@ -1062,7 +1233,37 @@ from smart_notes_3 import notes_engine_v3
 
 @app.route('/api/notes/v3/all', methods=['GET'])
 def notes_v3_all():
-    return jsonify(notes_engine_v3.get_all())
+    # Optional paging: ?limit=50&offset=0&folder=f_code&sort=updatedAt
+    limit = request.args.get('limit', type=int)
+    return jsonify(notes_engine_v3.get_all(
+        limit=limit,
+        offset=request.args.get('offset', 0, type=int),
+        folder_id=request.args.get('folder'),
+        sort=request.args.get('sort', 'id')
+    ))
+
+NOTES_SEARCH_BUDGET_MS = 50  # Latency target per query (see debug_tools/bench_notes_search.py)
+
+@app.route('/api/notes/v3/search', methods=['GET'])
+def notes_v3_search():
+    # ?q=hav* "exact phrase" tag:Strategy&limit=20&offset=0&folder=f_code
+    start = time.perf_counter()
+    result = notes_engine_v3.search(
+        request.args.get('q', ''),
+        limit=min(request.args.get('limit', 20, type=int), 100),
+        offset=request.args.get('offset', 0, type=int),
+        folder_id=request.args.get('folder')
+    )
+    took_ms = (time.perf_counter() - start) * 1000
+    if took_ms > NOTES_SEARCH_BUDGET_MS:
+        print(f"🐢 [NOTES V3] Search over budget: {took_ms:.1f}ms for '{request.args.get('q', '')}'")
+    result["took_ms"] = round(took_ms, 2)
+    return jsonify(result)
+
+@app.route('/api/notes/v3/note/<id>', methods=['GET'])
+def notes_v3_get(id):
+    note = notes_engine_v3.get_note(id)
+    return jsonify(note) if note else (jsonify({"error": "Note not found"}), 404)
 
 @app.route('/api/notes/v3/create', methods=['POST'])
 def notes_v3_create():
@@ -1145,12 +1346,9 @@ def notes_v3_ai_sum():
 def notes_v3_ai_tag(id):
     """Directly triggers the intelligence brain for a specific note."""
     try:
-        from smart_notes_3 import notes_engine_v3
-        from smart_notes_brain import BackgroundBrain
-        
-        # Instantiate a temporary brain for synchronous processing
-        brain = BackgroundBrain(notes_engine_v3)
-        note = next((n for n in notes_engine_v3.data["notes"] if str(n["id"]) == str(id)), None)
+        # Synchronous pass on the shared brain (bypasses the debounce queue)
+        brain = notes_engine_v3.brain
+        note = notes_engine_v3.get_note(id)
         
         if note:
             # Run all intelligence modules including Neural Tagging
@@ -1162,6 +1360,11 @@ def notes_v3_ai_tag(id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/notes/v3/ai/stats', methods=['GET'])
+def notes_v3_ai_stats():
+    """Queue depth, coalescing and latency of the background tagging scheduler."""
+    return jsonify(notes_engine_v3.brain.stats())
+
 @app.route('/api/notes/v3/ai/generate', methods=['POST'])
 def notes_v3_ai_generate():
     """Generates a detailed, professional note based on a prompt."""
@@ -1558,22 +1761,22 @@ def vision_analyze():
 @app.route('/api/scraper/extract', methods=['POST'])
 def scraper_extract():
     data = request.json
-    return jsonify(scraper.extract(data.get('url'), data.get('options')))
+    return respond("scraper.extract", scraper.extract, data.get('url'), data.get('options'))
 
 @app.route('/api/scraper/ai/universal', methods=['POST'])
 def scraper_magic():
     data = request.json
-    return jsonify(scraper.ai_universal(data.get('url'), data.get('query')))
+    return respond("scraper.ai_universal", scraper.ai_universal, data.get('url'), data.get('query'))
 
 @app.route('/api/scraper/spider', methods=['POST'])
 def scraper_spider():
     data = request.json
-    return jsonify(scraper.spider(data.get('url'), data.get('max_pages', 5), data.get('options')))
+    return respond("scraper.spider", scraper.spider, data.get('url'), data.get('max_pages', 5), data.get('options'))
 
 @app.route('/api/scraper/batch', methods=['POST'])
 def scraper_batch():
     data = request.json
-    return jsonify(scraper.batch(data.get('urls'), data.get('options')))
+    return respond("scraper.batch", scraper.batch, data.get('urls'), data.get('options'))
 
 @app.route('/api/scraper/graph', methods=['POST'])
 def scraper_graph():
@@ -1644,8 +1847,11 @@ def scraper_ai_analyze():
         if stype == "sentiment": prompt += "\nProvide sentiment analysis in 3 bullet points."
         else: prompt += "\nProvide a concise executive summary."
 
-        response = assistant.ask_ai(prompt)
+        # Kept out of the chat sessions so analyses don't pollute conversation history
+        response = ask_in_session(_session_id(data, "scraper"), prompt)
         return jsonify({"result": response})
+    except SchedulerBusy as e:
+        return _busy_response(e)
     except Exception as e:
          return jsonify({"error": str(e)})
 # --- MAIN ENTRY POINT ---
@@ -1690,7 +1896,22 @@ def run_backend_server():
     
     print("📌 [INFO] Auto-launch disabled. Manually visit: http://127.0.0.1:5001/ide")
 
-    app.run(host='0.0.0.0', port=5001, debug=False, threaded=True, use_reloader=False)
+    # config.SERVER_MODE = "production": warmed waitress pool instead of the Flask dev server
+    if getattr(config, 'SERVER_MODE', 'dev') == "production":
+        warm_up()
+    serve(app, host='0.0.0.0', port=5001)
+
+def warm_up(timeout=None):
+    """Opens the LLM provider pools and waits for the brain, so the first request is served warm."""
+    from llm_gateway import gateway
+    started = time.time()
+    gateway.warm()
+    deadline = started + (timeout or getattr(config, 'SERVER_WARMUP_TIMEOUT_SEC', 120))
+    while not brain_ready and time.time() < deadline:
+        time.sleep(0.25)
+    status = "ONLINE" if brain_ready else "still loading"
+    print(f"🔥 [SERVER] Warm-up done in {time.time() - started:.1f}s (brain {status})")
+    return brain_ready
 
 def register_native_window(window):
     """Bridge for PyWebView to register its window instance for direct JS injection."""
@@ -1,54 +1,42 @@
 
 import json
 import os
-import glob
 from datetime import datetime
 
+from trace_analytics import TraceIndex, trace_index
+
 class BrainDashboard:
-    def __init__(self, trace_dir="logs/traces", output_file="logs/brain_dashboard.html"):
+    def __init__(self, trace_dir=None, output_file="logs/brain_dashboard.html"):
         self.trace_dir = trace_dir
+        self.index = trace_index if trace_dir is None else TraceIndex(trace_dir)
         self.output_file = output_file
         if not os.path.exists(os.path.dirname(output_file)):
             os.makedirs(os.path.dirname(output_file))
 
     def generate_report(self):
-        traces = []
-        files = glob.glob(os.path.join(self.trace_dir, "*.jsonl"))
-        for file in files:
-            with open(file, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        traces.append(json.loads(line))
-                    except:
-                        continue
-        
-        if not traces:
+        # Aggregates come from the incremental trace index (no full re-read of the trace history)
+        summary = self.index.summary()
+        if not summary["total"]:
             print("No traces found. Dashboard cannot be generated.")
             return
 
-        # Sort by timestamp
-        traces.sort(key=lambda x: x["timestamp"])
-
-        # Simple aggregation
-        total = len(traces)
-        successes = sum(1 for t in traces if t.get("reward", 0) > 0)
-        avg_latency = sum(t.get("metrics", {}).get("latency_sec", 0) for t in traces) / total
+        total = summary["total"]
+        successes = summary["successes"]
+        # Headline latency is time-to-first-token (older traces only carry latency_sec)
+        avg_ttft = summary["avg_ttft_sec"]
         
-        # Prepare data for Chart.js
-        labels = [datetime.fromisoformat(t["timestamp"]).strftime("%H:%M:%S") for t in traces][-20:] # Last 20
-        rewards = [t.get("reward", 0) for t in traces][-20:]
-        latencies = [t.get("metrics", {}).get("latency_sec", 0) for t in traces][-20:]
+        # Prepare data for Chart.js (last 20 interactions)
+        recent = self.index.recent(20)
+        labels = [datetime.fromisoformat(ts).strftime("%H:%M:%S") for ts, _, _ in recent]
+        rewards = [reward for _, reward, _ in recent]
+        latencies = [ttft for _, _, ttft in recent]
 
-        # Extract Mistakes and Potential Fixes
-        mistakes = [t for t in traces if t.get("reward", 0) < 0][-5:] # Last 5 mistakes
+        # Mistakes paired with the fix learned afterwards (oldest of the last 5 first)
         correction_feed_html = ""
         
-        for m in mistakes:
-            user_input = m["messages"][1]["content"] if len(m["messages"]) > 1 else "Unknown"
-            bad_response = m["messages"][2]["content"] if len(m["messages"]) > 2 else "Empty"
-            
-            # Look for a later successful interaction with same/similar input
-            fix = next((t for t in traces if t.get("reward", 0) > 0 and t["timestamp"] > m["timestamp"] and t["messages"][1]["content"] == user_input), None)
+        for m in self.index.mistakes(5)[::-1]:
+            user_input = m["input"]
+            bad_response = m["mistake"]
             
             fix_html = f"""
             <div class="correction-card">
@@ -59,8 +47,8 @@ class BrainDashboard:
                 </div>
             """
             
-            if fix:
-                good_response = fix["messages"][2]["content"]
+            if m["fix"] is not None:
+                good_response = m["fix"]
                 fix_html += f"""
                 <div class="fix-header">✅ THE FIX (Learned)</div>
                 <div class="fix-content" style="color: #10b981;">
@@ -159,8 +147,8 @@ class BrainDashboard:
             <p>{round((successes/total)*100, 1)}%</p>
         </div>
         <div class="stat-card">
-            <h3>Synaptic Speed</h3>
-            <p>{round(avg_latency, 2)}s</p>
+            <h3>Synaptic Speed (TTFT)</h3>
+            <p>{round(avg_ttft, 2)}s</p>
         </div>
     </div>
 
@@ -169,7 +157,7 @@ class BrainDashboard:
             <h2>📉 Performance Trend</h2>
             <canvas id="rewardChart"></canvas>
             <div style="margin-top: 30px;">
-                <h2>⚡ Response Latency</h2>
+                <h2>⚡ Time To First Token</h2>
                 <canvas id="latencyChart"></canvas>
             </div>
         </div>
@@ -217,7 +205,7 @@ class BrainDashboard:
             data: {{
                 labels: labels,
                 datasets: [{{
-                    label: 'Latency (ms)',
+                    label: 'TTFT (ms)',
                     data: {json.dumps([l*1000 for l in latencies])},
                     backgroundColor: 'rgba(56, 189, 248, 0.3)',
                     borderRadius: 5
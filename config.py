@@ -56,6 +56,20 @@ COUNCIL_CONFIG = {
     "JUDGE": "cerebras/llama-3.3-70b",            # -> CEO
 }
 
+# COUNCIL DEBATE DAG (None = built-in chain: CTO -> CRO -> VP_ENGINEERING -> CEO)
+# Override with a list of stages; stages whose deps are done run in parallel.
+# Prompts may reference {query} and the output of any stage listed in "deps".
+# Example: a CISO security review running in parallel with the CRO audit (one extra LLM call):
+#   COUNCIL_DEBATE_DAG = [
+#       {"name": "CTO", "prompt": "Create a technical implementation plan for: {query}."},
+#       {"name": "CRO", "prompt": "AUDIT this plan for '{query}':\n\n{CTO}", "deps": ["CTO"]},
+#       {"name": "CISO", "prompt": "SECURITY REVIEW of this plan for '{query}':\n\n{CTO}\n\nList each vulnerability and its fix.", "deps": ["CTO"]},
+#       {"name": "VP_ENGINEERING", "prompt": "Write the code for '{query}'.\nPLAN: {CTO}\nCRITIQUE: {CRO}\nSECURITY FIXES: {CISO}", "deps": ["CTO", "CRO", "CISO"]},
+#       {"name": "CEO", "prompt": "VERIFY this code:\n\n{VP_ENGINEERING}\n\nPlan: {CTO}\nCritique: {CRO}\n{CISO}", "deps": ["CTO", "CRO", "CISO", "VP_ENGINEERING"],
+#        "system": "You are the CEO. Ensure the final output delivers maximum value and is flawless."},
+#   ]
+COUNCIL_DEBATE_DAG = None
+
 # MODEL ASSIGNMENTS (Role-Based Routing)
 PRIMARY_MODEL = "cerebras/llama-3.3-70b"   # CHAT = Llama 3.3 (Reliable & Fast - via Cerebras)
 FAST_MODEL = "groq/llama-3.1-8b-instant"            # SPEED = 8b-Instant (Required for Ghost-Pilot)
@@ -67,6 +81,97 @@ SECURITY_MODEL = "groq/llama-3.3-70b-versatile"  # SAFETY = Guard (70B)
 SAFE_MODE_MODEL = "meta-llama/Llama-3.1-8B"       # Fallback = Llama 3.1 (Active HF)
 WHISPER_MODEL = "openai/whisper-large-v3-turbo"   # Audio = Whisper V3 Turbo (Active HF)
 
+# MODEL EQUIVALENCE GROUPS (Provider Router: hedged requests & failover lanes)
+# Any model in a group may answer a request for another member of the same group.
+MODEL_EQUIVALENCE_GROUPS = {
+    "llama-70b": ["cerebras/llama-3.3-70b", "groq/llama-3.3-70b-versatile", "meta-llama/llama-3.3-70b-instruct"],
+    "llama-8b": ["groq/llama-3.1-8b-instant", "cerebras/llama3.1-8b"],
+    "deepseek-v3": ["deepseek/deepseek-chat", "fireworks/accounts/fireworks/models/deepseek-v3"],
+}
+ROUTER_HEDGE = True                 # Race the next lane when the first passes its p95
+ROUTER_HEDGE_MIN_SEC = 1.0          # Never hedge earlier than this
+ROUTER_HEDGE_DEFAULT_SEC = 4.0      # Hedge delay until a lane has enough latency samples
+ROUTER_BREAKER_FAILURES = 3         # Consecutive failures before a provider is taken out
+ROUTER_BREAKER_COOLDOWN_SEC = 30    # Time before a half-open trial request
+ROUTER_CONNECTIVITY_TTL_SEC = 30    # Cached online/offline state lifetime
+
+# LLM RESPONSE CACHE (exact + MiniLM semantic layer in front of the router)
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_MAX_ENTRIES = 2000
+RESPONSE_CACHE_SEMANTIC = True      # Reuse answers for near-identical questions
+RESPONSE_CACHE_SIMILARITY = 0.95    # Cosine threshold for a semantic hit
+RESPONSE_CACHE_TTLS = {"coding": 7 * 24 * 3600, "factual": 24 * 3600, "chat": 3600}  # Seconds per intent class
+
+# CONVERSATION HISTORY (token budget per model for the history sent with each prompt)
+# Lookup order: exact model id, then provider prefix, then the default.
+HISTORY_DEFAULT_TOKEN_BUDGET = 3000
+HISTORY_TOKEN_BUDGETS = {
+    "ollama": 1200,                     # Small local context window
+    "groq/llama-3.1-8b-instant": 2000,
+    "deepseek/deepseek-chat": 6000,
+}
+HISTORY_MAX_SESSIONS = 500              # Least recently used sessions are dropped beyond this
+
+# MULTI-USER SESSIONS (web UI, IDE, Telegram, mobile share one brain)
+# Clients pick a conversation with a "session" body field or the X-Bankoo-Session header.
+SESSION_WORKERS = 4                     # Concurrent ask_ai requests across all sessions
+SESSION_MAX_QUEUE = 5                   # Waiting requests per session before HTTP 429
+SESSION_MAX_BACKLOG = 64                # Queued + running requests across all sessions before HTTP 429
+SESSION_MAX_SESSIONS = 500              # Per-session state (language, pending intent) kept for this many
+SESSION_REQUEST_TIMEOUT_SEC = 180       # Synchronous endpoints give up waiting after this
+
+# SERVING ("dev" = Flask dev server, "production" = warmed waitress thread pool; see serving.py)
+SERVER_MODE = "dev"
+SERVER_THREADS = 16                     # Request threads (waitress / gunicorn gthread)
+SERVER_MAX_STREAMS = 12                 # Open SSE streams (/api/events tabs + streamed answers); extra
+                                        # threads are added for them, further streams get 503 and poll
+SERVER_CONNECTION_LIMIT = 200
+SERVER_CHANNEL_TIMEOUT_SEC = 300        # Long AI calls, PDF ingestion and SSE streams
+SERVER_MAX_BODY_MB = 256                # Upload limit (PDFs, datasets)
+SERVER_WARMUP_TIMEOUT_SEC = 120         # Max wait for the brain before accepting traffic
+SERVER_JOB_WORKERS = 4                  # Background pool for ?async=1 long-running routes
+SERVER_JOB_TTL_SEC = 3600               # Finished job results kept for polling
+ACCESS_LOG_SAMPLE_RATE = 0.05           # Share of successful API calls logged (errors/slow always)
+ACCESS_LOG_SLOW_MS = 1000
+
+# TELEMETRY (span histograms at /api/metrics; sampled span trees go into the JSONL traces)
+TRACE_SPAN_SAMPLE_RATE = 0.1
+
+# INTERACTION TRACES (logs/traces, buffered writer with rotation; see agent_logger.py)
+TRACE_ROTATE_MB = 32                    # Start a new segment past this size...
+TRACE_ROTATE_HOURS = 24                 # ...or this age
+TRACE_COMPRESSION = "auto"              # "zstd" (needs zstandard), "gzip", "auto" or None
+TRACE_RETENTION_DAYS = 30               # Rotated segments older than this are deleted
+TRACE_MAX_TOTAL_MB = 512                # Oldest rotated segments are deleted beyond this
+TRACE_INTERN_PROMPTS = True             # Store repeating system prompt sections once per segment
+
+# SCREEN MISSIONS (VisionKernel frame pipeline; frames stay in memory, see vision_utils.py)
+VISION_JPEG_QUALITY = 80                # Encoding of the annotated frame sent to the vision model
+VISION_DEBUG_DUMP_DIR = None            # e.g. "logs/mission_frames" to keep every annotated step (written off-thread)
+VISION_CHANGE_MIN_PCT = 0.02            # Changed-pixel share (downsampled) that counts as a real UI change
+VISION_IGNORE_REGIONS = []              # Animated areas excluded from change detection, 0-1000 boxes
+                                        # e.g. [(900, 960, 1000, 1000)] for a bottom-right taskbar clock
+VISION_COORDINATE_CACHE = "memory.json" # Landmark-confirmed app coordinates (VisionKernel fast path)
+VISION_COORDINATE_TTL_DAYS = 30         # Entries not re-confirmed for this long are forgotten
+
+# LOCAL VISION BACKENDS (shared warm pool, see vision_backends.py)
+VISION_BACKEND_ORDER = ["landmark", "ocr", "florence"]  # find_element tries these in order ("moondream" also available)
+VISION_DESCRIBE_BACKEND = "ollama"      # "ollama", "moondream", "florence" or "ocr"
+VISION_OLLAMA_MODEL = "moondream"
+VISION_IDLE_EVICT_SEC = 600             # Unused models are unloaded after this
+VISION_MAX_RESIDENT = 2                 # Heavy models kept loaded at once (least recently used evicted)
+VISION_BATCH_WINDOW_MS = 15             # Requests for the same frame arriving within this window share one call
+VISION_OCR_GPU = False
+
+# WEB SPIDER (ScraperBrain.spider / WebScraperBrain.scrape_spider, see crawl_engine.py)
+CRAWL_WORKERS = 8                       # Concurrent page fetches per crawl
+CRAWL_MAX_PER_HOST = 2                  # Concurrent requests to any single host
+CRAWL_DELAY_SEC = 0.25                  # Min gap between requests to one host (robots.txt Crawl-delay wins if larger)
+CRAWL_MAX_DEPTH = 3                     # Link hops from the start URL
+CRAWL_RESPECT_ROBOTS = True
+CRAWL_USER_AGENT = "BankooBot"          # Name matched against robots.txt rules
+CRAWL_ROBOTS_TTL_SEC = 3600
+
 # Note: CODE_REVIEWER acts like a senior developer/counselor
 # - Reviews your code and suggests improvements
 # - Explains what could be better and why
@@ -78,6 +183,10 @@ MALE_VOICE = "gu-IN-NiranjanNeural"
 FEMALE_VOICE = "gu-IN-DhwaniNeural"
 DEFAULT_VOICE = MALE_VOICE
 
+# VOICE CACHE (Repeated phrases are served from disk instead of Edge-TTS)
+TTS_CACHE_MAX_MB = 64      # Size cap for cache/tts (least recently used clips evicted first)
+TTS_CACHE_WARMUP = False   # Pre-render static replies for every language voice at startup
+
 # Multilingual Voice Characters (Auto-switching based on language)
 # When user says "speak in Spanish", Bankoo uses native Spanish voice
 MULTILINGUAL_VOICES = {
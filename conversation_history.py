@@ -0,0 +1,222 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH CONVERSATION HISTORY (TOKEN-BUDGETED SESSIONS)
+================================================================================
+Per-session chat history with a bounded footprint:
+
+  * Every message is stored once as a compact (role, content, tokens) tuple;
+    token counts come from tiktoken when installed, otherwise a script-aware
+    estimate, and are computed once per stored turn.
+  * `context()` returns the newest turns that fit the model's token budget
+    (config.HISTORY_TOKEN_BUDGETS) plus the running summary as a block for the
+    system prompt (some lanes, e.g. Gemini native, have no system role inside
+    the history). Large code blocks in older turns are elided to a one-line
+    placeholder.
+  * Turns that fall out of the budget are folded into the summary on a
+    background worker, so the request that overflowed never waits for it.
+  * Sessions ("main", "ide", "telegram:<user>", ...) are kept in an LRU with
+    an idle TTL, so many concurrent users stay within bounded memory.
+================================================================================
+"""
+
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+logger = logging.getLogger("ConversationHistory")
+
+CODE_BLOCK = re.compile(r"```(\w*)\n(.*?)```", re.DOTALL)
+
+
+def count_tokens(text):
+    """Token count for `text`. Indic scripts cost roughly one token per 2 chars."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars + 1) // 2 + 1
+
+
+def elide_code(text):
+    """Replaces fenced code blocks with a short placeholder (used for older turns)."""
+    def repl(m):
+        lines = m.group(2).rstrip("\n").count("\n") + 1
+        return f"[{m.group(1) or 'code'} block, {lines} lines omitted]"
+    return CODE_BLOCK.sub(repl, text)
+
+
+class ConversationSession:
+    """One conversation: recent turns plus a rolling summary of everything older."""
+    def __init__(self, session_id, max_turns=200):
+        self.session_id = session_id
+        self.turns = deque(maxlen=max_turns)  # (seq, role, content, tokens)
+        self.summary = ""
+        self.seq = 0
+        self.folded_upto = 0   # seq of the last turn already merged into the summary
+        self.summarizing = False
+        self.last_active = time.time()
+        self.lock = threading.Lock()
+
+    def append(self, role, content, max_chars):
+        content = content if len(content) <= max_chars else content[:max_chars] + " …[truncated]"
+        with self.lock:
+            self.seq += 1
+            self.turns.append((self.seq, role, content, count_tokens(content)))
+            self.last_active = time.time()
+
+    def total_tokens(self):
+        with self.lock:
+            return count_tokens(self.summary) + sum(t[3] for t in self.turns)
+
+
+class HistoryManager:
+    """
+    Token-budgeted history for many concurrent sessions.
+    `summarize_fn(previous_summary, [(role, content), ...]) -> str` runs on a
+    background worker; without one, older turns get an extractive summary.
+    """
+    def __init__(self, summarize_fn=None, budgets=None, default_budget=3000, max_sessions=500,
+                 idle_ttl=6 * 3600, max_message_chars=12000, keep_full_turns=2, summary_max_tokens=400):
+        self.summarize_fn = summarize_fn
+        self.budgets = budgets or {}
+        self.default_budget = default_budget
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_message_chars = max_message_chars
+        self.keep_full_turns = keep_full_turns
+        self.summary_max_tokens = summary_max_tokens
+
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # session_id -> ConversationSession, least recently used first
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="HistorySummarizer")
+        self.summaries = 0
+        self.evicted_sessions = 0
+
+    # --- SESSIONS ---
+
+    def session(self, session_id):
+        now = time.time()
+        with self._lock:
+            sess = self._sessions.get(session_id)
+            if sess is None:
+                sess = ConversationSession(session_id)
+                self._sessions[session_id] = sess
+            self._sessions.move_to_end(session_id)
+
+            # Bounded memory: drop idle sessions, then the least recently used
+            for sid in [sid for sid, s in self._sessions.items() if now - s.last_active > self.idle_ttl and sid != session_id]:
+                del self._sessions[sid]
+                self.evicted_sessions += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted_sessions += 1
+            return sess
+
+    def reset(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def append(self, session_id, role, content):
+        self.session(session_id).append(role, content or "", self.max_message_chars)
+
+    def budget_for(self, model):
+        """Exact model, then provider prefix ("ollama", "groq", ...), then the default."""
+        if model in self.budgets:
+            return self.budgets[model]
+        provider = (model or "").split("/", 1)[0]
+        return self.budgets.get(provider, self.default_budget)
+
+    # --- CONTEXT WINDOW ---
+
+    def context(self, session_id, model):
+        """
+        Returns (messages, summary_block): the newest turns that fit the budget,
+        oldest first, as OpenAI-style messages, and the running summary formatted
+        for appending to the system prompt ("" when there is none).
+        Schedules a background fold of the turns that no longer fit.
+        """
+        sess = self.session(session_id)
+        budget = self.budget_for(model)
+        with sess.lock:
+            turns = list(sess.turns)
+            summary = sess.summary
+
+        used = count_tokens(summary)
+        window = []
+        for i, (seq, role, content, tokens) in enumerate(reversed(turns)):
+            if i >= self.keep_full_turns and tokens > 200 and "```" in content:
+                content = elide_code(content)
+                tokens = count_tokens(content)
+            if used + tokens > budget and window:
+                break
+            window.append({"role": role, "content": content})
+            used += tokens
+        window.reverse()
+
+        overflow = turns[:len(turns) - len(window)]
+        if overflow:
+            self._schedule_fold(sess, overflow[-1][0])
+
+        summary_block = f"\n\n[EARLIER CONVERSATION SUMMARY]: {summary}" if summary else ""
+        return window, summary_block
+
+    def _schedule_fold(self, sess, upto_seq):
+        with sess.lock:
+            if sess.summarizing or upto_seq <= sess.folded_upto:
+                return
+            sess.summarizing = True
+        self._executor.submit(self._fold, sess, upto_seq)
+
+    def _fold(self, sess, upto_seq):
+        try:
+            with sess.lock:
+                previous = sess.summary
+                folding = [(role, content) for seq, role, content, _ in sess.turns if seq <= upto_seq]
+            if not folding:
+                return
+
+            summary = None
+            if self.summarize_fn:
+                try:
+                    summary = self.summarize_fn(previous, [(r, elide_code(c)) for r, c in folding])
+                except Exception as e:
+                    logger.warning(f"History summarization failed, using extractive fallback: {e}")
+            if not summary:
+                asked = "; ".join(c[:120] for r, c in folding if r == "user")
+                summary = f"{previous} User earlier asked about: {asked}".strip()
+
+            # Keep the summary itself within a fixed share of the budget
+            while count_tokens(summary) > self.summary_max_tokens and len(summary) > 200:
+                summary = summary[len(summary) // 4:]
+
+            with sess.lock:
+                sess.summary = summary
+                sess.folded_upto = upto_seq
+                while sess.turns and sess.turns[0][0] <= upto_seq:
+                    sess.turns.popleft()
+            self.summaries += 1
+            logger.info(f"🧾 History [{sess.session_id}]: folded {len(folding)} turns into summary ({count_tokens(summary)} tokens)")
+        finally:
+            sess.summarizing = False
+
+    def stats(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "sessions": len(sessions),
+            "max_sessions": self.max_sessions,
+            "evicted_sessions": self.evicted_sessions,
+            "summaries": self.summaries,
+            "tokens": {s.session_id: s.total_tokens() for s in sessions[-20:]},
+            "tokenizer": "tiktoken" if _ENCODING is not None else "estimate"
+        }
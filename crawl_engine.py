@@ -0,0 +1,299 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH CRAWL ENGINE (CONCURRENT, POLITE SPIDER)
+================================================================================
+Shared crawler behind ScraperBrain.spider and WebScraperBrain.scrape_spider.
+
+  * Frontier: a heap ordered by priority (shallow pages and pagination links
+    first) with a `seen` set of canonical URLs: O(log n) push/pop, O(1) dedup.
+  * Canonicalization: fragments and tracking parameters dropped, host
+    lower-cased, default ports removed, query keys sorted.
+  * Fetching: thread pool with per-host concurrency limits and a minimum
+    delay between requests to the same host (robots.txt Crawl-delay wins if
+    larger), instead of a fixed sleep after every page.
+  * robots.txt is fetched once per host and cached process-wide; disallowed
+    URLs never enter the frontier.
+
+    from crawl_engine import Crawler
+    result = Crawler(fetch=lambda url, session: ..., links=lambda page: [(url, text), ...]).crawl(start_url)
+================================================================================
+"""
+
+import re
+import time
+import heapq
+import logging
+import threading
+from urllib import robotparser
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+
+import config
+
+logger = logging.getLogger("CrawlEngine")
+
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_cid|mc_eid|ref|ref_src)$", re.I)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+PAGINATION_WORDS = ("next", "more", "page", "older posts")
+PAGINATION_URL = re.compile(r"/page/\d+|[?&](p|page|start)=\d+")
+
+
+def canonicalize(url, base=None):
+    """Canonical absolute http(s) URL, or None for mailto:, javascript:, etc."""
+    if not url:
+        return None
+    url = urljoin(base, url.strip()) if base else url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    path = urlsplit(urljoin("http://h/", parts.path or "/")).path  # Resolves "." / ".." segments
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def host_of(url):
+    return urlsplit(url).netloc
+
+
+def default_priority(url, text, depth):
+    """Higher runs first: shallow pages, then pagination-looking links."""
+    score = -10.0 * depth
+    if any(w in (text or "").lower() for w in PAGINATION_WORDS):
+        score += 5
+    if PAGINATION_URL.search(url):
+        score += 5
+    return score
+
+
+class RobotsCache:
+    """Per-host robots.txt rules, fetched once and kept for `ttl` seconds."""
+    def __init__(self, user_agent="BankooBot", ttl=3600, timeout=5):
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.timeout = timeout
+        self._rules = {}  # "scheme://host" -> (fetched_at, RobotFileParser or None = allow all)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _parser(self, url, session=None):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        cached = self._rules.get(origin)
+        if cached and time.time() - cached[0] < self.ttl:
+            return cached[1]
+        with self._lock:
+            lock = self._locks.setdefault(origin, threading.Lock())
+        with lock:  # One fetch per host even when many workers ask at once
+            cached = self._rules.get(origin)
+            if cached and time.time() - cached[0] < self.ttl:
+                return cached[1]
+            parser = None
+            try:
+                resp = (session or requests).get(f"{origin}/robots.txt", timeout=self.timeout,
+                                                 headers={"User-Agent": self.user_agent})
+                if resp.status_code == 200:
+                    parser = robotparser.RobotFileParser()
+                    parser.parse(resp.text.splitlines())
+            except requests.RequestException as e:
+                logger.debug(f"robots.txt unavailable for {origin}: {e}")
+            self._rules[origin] = (time.time(), parser)
+            return parser
+
+    def allowed(self, url, session=None):
+        parser = self._parser(url, session)
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url, session=None):
+        parser = self._parser(url, session)
+        delay = parser.crawl_delay(self.user_agent) if parser is not None else None
+        return float(delay) if delay else 0.0
+
+
+class Frontier:
+    """Priority frontier: heap of (-priority, seq, url, depth) plus a seen-set of canonical URLs."""
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+        self.seen = set()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, url, depth, priority=0.0):
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        heapq.heappush(self._heap, (-priority, self._seq, url, depth))
+        self._seq += 1
+        return True
+
+    def pop_ready(self, is_ready, limit):
+        """
+        Up to `limit` highest-priority entries. `is_ready(url)` returns True (take),
+        False (host busy: keep queued) or None (discard).
+        """
+        taken, deferred = [], []
+        while self._heap and len(taken) < limit:
+            entry = heapq.heappop(self._heap)
+            verdict = is_ready(entry[2])
+            if verdict:
+                taken.append(entry)
+            elif verdict is not None:
+                deferred.append(entry)
+            if len(deferred) > 256:  # Everything left is probably the same throttled host
+                break
+        for entry in deferred:
+            heapq.heappush(self._heap, entry)
+        return [(url, depth) for _, _, url, depth in taken]
+
+
+class _HostState:
+    __slots__ = ("active", "next_at", "requests", "delay")
+
+    def __init__(self, delay):
+        self.active = 0
+        self.next_at = 0.0
+        self.requests = 0
+        self.delay = delay
+
+
+class Crawler:
+    """
+    One crawl. `fetch(url, session)` returns a page dict (or one with an "error"
+    key); `links(page)` yields (url, anchor_text) pairs found on it.
+    """
+    def __init__(self, fetch, links, max_pages=5, max_depth=None, same_domain=True, workers=None,
+                 max_per_host=None, delay=None, host_budget=None, respect_robots=None, priority=default_priority,
+                 robots=None):
+        self.fetch = fetch
+        self.links = links
+        self.max_pages = max_pages
+        self.max_depth = max_depth if max_depth is not None else getattr(config, 'CRAWL_MAX_DEPTH', 3)
+        self.same_domain = same_domain
+        self.workers = workers or getattr(config, 'CRAWL_WORKERS', 8)
+        self.max_per_host = max_per_host or getattr(config, 'CRAWL_MAX_PER_HOST', 2)
+        self.delay = delay if delay is not None else getattr(config, 'CRAWL_DELAY_SEC', 0.25)
+        self.host_budget = host_budget  # Max requests per host for this crawl (None = no cap)
+        self.respect_robots = respect_robots if respect_robots is not None else getattr(config, 'CRAWL_RESPECT_ROBOTS', True)
+        self.priority = priority
+        self.robots = robots or robots_cache
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=self.workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.frontier = Frontier()
+        self._hosts = {}
+        self.stats = {"fetched": 0, "failed": 0, "robots_blocked": 0, "off_domain": 0, "duplicates": 0}
+
+    def _host(self, url):
+        host = host_of(url)
+        state = self._hosts.get(host)
+        if state is None:
+            delay = self.delay
+            if self.respect_robots:
+                delay = max(delay, self.robots.crawl_delay(url, self.session))
+            state = self._hosts[host] = _HostState(delay)
+        return state
+
+    def _reserve(self, url, now):
+        """Claims a request slot on the URL's host (see Frontier.pop_ready for the return values)."""
+        state = self._host(url)
+        if self.host_budget and state.requests >= self.host_budget:
+            return None
+        if state.active >= self.max_per_host or now < state.next_at:
+            return False
+        state.active += 1
+        state.requests += 1
+        state.next_at = now + state.delay
+        return True
+
+    def crawl(self, start_url):
+        start = canonicalize(start_url)
+        if not start:
+            return {"pages_crawled": 0, "results": [], "error": f"Invalid URL: {start_url}"}
+        root_host = host_of(start)
+        if self.respect_robots and not self.robots.allowed(start, self.session):
+            return {"pages_crawled": 0, "results": [], "error": f"robots.txt disallows {start}"}
+        self.frontier.push(start, 0, self.priority(start, "", 0))
+        results = []
+        inflight = {}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Crawler") as pool:
+            while len(results) < self.max_pages and (self.frontier or inflight):
+                now = time.monotonic()
+                free = min(self.workers, self.max_pages - len(results)) - len(inflight)
+                if free > 0 and self.frontier:
+                    for url, depth in self.frontier.pop_ready(lambda u: self._reserve(u, now), free):
+                        inflight[pool.submit(self.fetch, url, self.session)] = (url, depth)
+
+                if not inflight:  # Only throttled hosts left: sleep until the earliest slot opens
+                    if not self.frontier:
+                        break
+                    waits = [s.next_at - now for s in self._hosts.values()]
+                    time.sleep(max(0.005, min(waits)))
+                    continue
+
+                pending = [s.next_at - now for s in self._hosts.values() if s.next_at > now]
+                timeout = max(0.005, min(pending)) if pending and self.frontier else None
+                done, _ = wait(list(inflight), timeout=timeout, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    url, depth = inflight.pop(fut)
+                    self._hosts[host_of(url)].active -= 1
+                    try:
+                        page = fut.result()
+                    except Exception as e:
+                        page = {"error": str(e)}
+                    if "error" in page:
+                        self.stats["failed"] += 1
+                        logger.error(f"Failed to crawl {url}: {page['error']}")
+                        continue
+                    self.stats["fetched"] += 1
+                    if len(results) < self.max_pages:
+                        results.append((url, page))
+                    if depth < self.max_depth:
+                        self._enqueue(page, url, depth + 1, root_host)
+
+        elapsed = time.perf_counter() - started
+        self.session.close()
+        return {
+            "pages_crawled": len(results),
+            "results": results,
+            "stats": {**self.stats, "elapsed_sec": round(elapsed, 3),
+                      "pages_per_sec": round(len(results) / elapsed, 2) if elapsed else 0.0,
+                      "frontier_left": len(self.frontier), "hosts": len(self._hosts)},
+        }
+
+    def _enqueue(self, page, base, depth, root_host):
+        for link, text in self.links(page):
+            url = canonicalize(link, base)
+            if not url:
+                continue
+            if self.same_domain and host_of(url) != root_host:
+                self.stats["off_domain"] += 1
+                continue
+            if url in self.frontier.seen:
+                self.stats["duplicates"] += 1
+                continue
+            if self.respect_robots and not self.robots.allowed(url, self.session):
+                self.frontier.seen.add(url)
+                self.stats["robots_blocked"] += 1
+                continue
+            if not self.frontier.push(url, depth, self.priority(url, text, depth)):
+                self.stats["duplicates"] += 1
+
+
+# Global Instance (robots.txt rules are shared by every crawl in the process)
+robots_cache = RobotsCache(user_agent=getattr(config, 'CRAWL_USER_AGENT', "BankooBot"),
+                           ttl=getattr(config, 'CRAWL_ROBOTS_TTL_SEC', 3600))
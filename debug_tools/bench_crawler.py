@@ -0,0 +1,135 @@
+"""
+Crawler Benchmark
+Serves a generated website from a local HTTP fixture (robots.txt with a
+Disallow rule, duplicate URL spellings, off-site links, configurable per-page
+latency) and crawls it with the shared crawl engine.
+Reports pages/sec and checks that no URL was fetched twice and that
+robots.txt was honoured. The "serial" row mimics the old spiders (one page at
+a time plus a fixed politeness sleep).
+
+Usage: python debug_tools/bench_crawler.py [--pages 200] [--latency-ms 40] [--max-pages 100]
+       [--via engine|scraper|web] [--workers 8] [--per-host 4] [--delay 0.0] [--legacy-delay 0.5]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bs4 import BeautifulSoup
+from crawl_engine import Crawler, RobotsCache
+
+
+def build_site(n_pages, seed=3):
+    rng = random.Random(seed)
+    site = {}
+    for i in range(n_pages):
+        links = [f"/page/{rng.randrange(n_pages)}" for _ in range(5)]
+        links += [f"/page/{i + 1}#top" if i + 1 < n_pages else "/page/0",      # Fragment duplicate
+                  f"/page/{rng.randrange(n_pages)}?utm_source=bench",          # Tracking duplicate
+                  f"/private/{i}", "https://example.com/elsewhere", "mailto:x@example.com"]
+        body = "".join(f'<a href="{href}">{"Next" if "#top" in href else "link"}</a>' for href in links)
+        site[f"/page/{i}"] = f"<html><body><h1>Page {i}</h1><h2>Item {i % 17}</h2>{body}</body></html>"
+    site["/"] = site["/page/0"]
+    return site
+
+
+def start_fixture(site, latency_ms):
+    hits = Counter()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            with lock:
+                hits[self.path] += 1
+            if self.path == "/robots.txt":
+                body, status = "User-agent: *\nDisallow: /private/\n", 200
+            elif self.path in site:
+                time.sleep(latency_ms / 1000.0)
+                body, status = site[self.path], 200
+            else:
+                body, status = "not found", 404
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8" if status == 200 else "text/plain")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hits
+
+
+def engine_fetch(url, session):
+    resp = session.get(url, timeout=10)
+    if resp.status_code != 200:
+        return {"error": f"HTTP {resp.status_code}"}
+    soup = BeautifulSoup(resp.text, "html.parser")
+    return {"title": soup.h1.get_text(strip=True) if soup.h1 else "",
+            "links": [(a["href"], a.get_text(strip=True)) for a in soup.find_all("a", href=True)]}
+
+
+def run(label, args, base, hits, **crawler_kwargs):
+    hits.clear()
+    start = time.perf_counter()
+    if args.via == "engine":
+        kwargs = {"workers": args.workers, "max_per_host": args.per_host, "delay": args.delay, **crawler_kwargs}
+        result = Crawler(engine_fetch, lambda page: page["links"], max_pages=args.max_pages, max_depth=args.max_depth,
+                         robots=RobotsCache(), **kwargs).crawl(f"{base}/")
+    elif args.via == "scraper":
+        from scraper_brain import ScraperBrain
+        result = ScraperBrain().spider(f"{base}/", max_pages=args.max_pages, max_depth=args.max_depth)
+    else:
+        from web_scraper_brain import WebScraperBrain
+        result = WebScraperBrain().scrape_spider(f"{base}/", max_pages=args.max_pages, max_depth=args.max_depth)
+    elapsed = time.perf_counter() - start
+
+    pages = result["pages_crawled"]
+    dupes = sum(n - 1 for path, n in hits.items() if n > 1 and path != "/robots.txt")
+    private = sum(n for path, n in hits.items() if path.startswith("/private/"))
+    print(f"{label:10} {pages:>6} {elapsed:>8.2f} {pages / elapsed if elapsed else 0:>9.1f} {dupes:>6} {private:>8}")
+    return pages / elapsed if elapsed else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200, help="Pages in the fixture site")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Server think time per page")
+    parser.add_argument("--max-pages", type=int, default=100)
+    parser.add_argument("--max-depth", type=int, default=10)
+    parser.add_argument("--via", choices=["engine", "scraper", "web"], default="engine")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.0, help="Per-host politeness gap (local fixture)")
+    parser.add_argument("--legacy-delay", type=float, default=0.5, help="Fixed sleep of the old serial spiders")
+    args = parser.parse_args()
+
+    server, hits = start_fixture(build_site(args.pages), args.latency_ms)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"🚀 Fixture {base}: {args.pages} pages, {args.latency_ms:.0f} ms/page; crawling {args.max_pages} via {args.via}")
+    print(f"\n{'run':10} {'pages':>6} {'sec':>8} {'pages/s':>9} {'dupes':>6} {'private':>8}")
+
+    serial = None
+    if args.via == "engine":
+        # Legacy behaviour: one page at a time, fixed sleep between pages
+        serial = run("serial", args, base, hits, workers=1, max_per_host=1, delay=args.legacy_delay)
+    concurrent = run("concurrent", args, base, hits)
+    if serial:
+        print(f"\n📊 Speed-up vs serial spider: {concurrent / serial:.1f}x")
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
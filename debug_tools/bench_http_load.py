@@ -0,0 +1,129 @@
+"""
+HTTP Load Test Harness
+Drives a running Bankoo backend with concurrent clients and reports requests/sec
+and latency percentiles per endpoint group (/api/send_input, /api/notes/v3/*,
+/api/scraper/*). Compare SERVER_MODE="dev" against "production".
+
+/api/send_input queues real LLM turns (one bench session per client), so it is
+only included with --with-ai; expect HTTP 429 once the session queues fill.
+
+Usage: python debug_tools/bench_http_load.py [--base http://127.0.0.1:5001]
+       [--clients 16] [--duration 30] [--groups notes,scraper] [--with-ai]
+"""
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict
+
+import requests
+
+NOTES_QUERIES = ["meeting", "proj*", '"client report"', "tag:Strategy", "હવામાન", "मौसम", "python api"]
+SCRAPER_DATA = {
+    "titles": [f"Item {i % 40}" for i in range(200)],
+    "links": [{"href": f"/item/{i % 40}", "text": f"Item {i % 40}"} for i in range(200)],
+}
+
+
+def notes_calls(base):
+    return [
+        ("GET /api/notes/v3/all", lambda s: s.get(f"{base}/api/notes/v3/all", params={"limit": 50})),
+        ("GET /api/notes/v3/search", lambda s: s.get(f"{base}/api/notes/v3/search",
+                                                     params={"q": random.choice(NOTES_QUERIES), "limit": 20})),
+    ]
+
+
+def scraper_calls(base):
+    return [
+        ("POST /api/scraper/deduplicate", lambda s: s.post(f"{base}/api/scraper/deduplicate", json={"data": SCRAPER_DATA})),
+        # The backend scrapes its own UI page, so no external site is hit
+        ("POST /api/scraper/extract", lambda s: s.post(f"{base}/api/scraper/extract", json={"url": f"{base}/", "options": {}})),
+    ]
+
+
+def ai_calls(base, client_id):
+    session = f"bench-{client_id}"
+    return [
+        ("POST /api/send_input", lambda s: s.post(f"{base}/api/send_input",
+                                                  json={"text": "What is a hash map?", "session": session})),
+    ]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_client(client_id, args, deadline, results, lock):
+    calls = []
+    if "notes" in args.groups:
+        calls += notes_calls(args.base)
+    if "scraper" in args.groups:
+        calls += scraper_calls(args.base)
+    if args.with_ai:
+        calls += ai_calls(args.base, client_id)
+
+    session = requests.Session()  # Keep-alive per client, like a browser tab
+    local = defaultdict(lambda: {"lat": [], "status": defaultdict(int)})
+    while time.perf_counter() < deadline:
+        name, call = random.choice(calls)
+        start = time.perf_counter()
+        try:
+            status = call(session).status_code
+        except requests.RequestException:
+            status = "conn_error"
+        local[name]["lat"].append((time.perf_counter() - start) * 1000)
+        local[name]["status"][status] += 1
+
+    with lock:
+        for name, rec in local.items():
+            results[name]["lat"].extend(rec["lat"])
+            for status, n in rec["status"].items():
+                results[name]["status"][status] += n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default="http://127.0.0.1:5001")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--groups", default="notes,scraper")
+    parser.add_argument("--with-ai", action="store_true")
+    args = parser.parse_args()
+    args.groups = set(args.groups.split(","))
+
+    try:
+        requests.get(f"{args.base}/api/llm/stats", timeout=5)
+    except requests.RequestException as e:
+        print(f"❌ Backend not reachable at {args.base}: {e}")
+        return 1
+
+    print(f"🚀 {args.clients} clients for {args.duration:.0f}s against {args.base} ({', '.join(sorted(args.groups))}"
+          f"{', send_input' if args.with_ai else ''})")
+    results = defaultdict(lambda: {"lat": [], "status": defaultdict(int)})
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [threading.Thread(target=run_client, args=(i, args, deadline, results, lock)) for i in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'endpoint':34} {'req':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  status")
+    total = 0
+    for name in sorted(results):
+        lat = sorted(results[name]["lat"])
+        total += len(lat)
+        statuses = " ".join(f"{k}:{v}" for k, v in sorted(results[name]["status"].items(), key=str))
+        print(f"{name:34} {len(lat):>7} {len(lat) / elapsed:>8.1f} {percentile(lat, 50):>8.1f} "
+              f"{percentile(lat, 95):>8.1f} {percentile(lat, 99):>8.1f}  {statuses}")
+    print(f"\n📊 Total: {total} requests in {elapsed:.1f}s → {total / elapsed:.1f} req/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
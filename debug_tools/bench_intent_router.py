@@ -0,0 +1,117 @@
+"""
+Intent Router Benchmark
+Compares the compiled Aho-Corasick router against the legacy `any(w in t ...)`
+chain on a corpus of real Bankoo utterances, and checks both agree.
+
+Usage: python debug_tools/bench_intent_router.py [--rounds 2000]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from intent_router import IntentRouter, AHOCORASICK_AVAILABLE
+
+CORPUS = [
+    "lock pc", "પીસી લોક કર", "volume up please", "વોલ્યુમ વધારો", "make it quiet", "mute",
+    "automate the login on chrome", "click on the submit button", "where is the recycle bin",
+    "find the chrome icon", "what is my ip address", "system info", "cpu usage kitna hai",
+    "search latest iphone price", "ગુગલ કર સુરત હવામાન", "take a screenshot",
+    "write python code for bubble sort", "પાયથોન કોડ લખો fibonacci", "council debate on this code",
+    "open notepad", "chrome kholo", "open my note", "create note buy milk", "नोट बनाओ कल मीटिंग",
+    "tell me a joke", "રમુજ સાંભળાવ", "weather today", "આજના સમાચાર", "price of gold",
+    "calculate 25 times 4", "૨૫ વત્તા ૪", "what is in this image", "motivation please",
+    "generate a logo for my startup", "balance sheet of reliance", "buy 10 shares, analyst view",
+    "predict my grade", "change voice to female", "start vision hand tracking",
+    "push to github", "git status", "digit recognition model", "switch to hindi mode",
+    "ભાષા બદલો ગુજરાતી", "hello bankoo", "kem cho", "તમે કેમ છો", "आप कैसे हैं",
+    "Explain the Zenith Rebirth project.", "thodo vichar kar aa problem par",
+    "[IDE_MODE] [LANG:python] write a flask api with jwt auth and sqlite storage",
+]
+
+
+def legacy_route(t, doc_active=False):
+    """Verbatim copy of the pre-compiled if-chain (no active task, PDF state injectable)."""
+    t = t.lower()
+    if any(w in t for w in ["lock pc", "પીસી લોક", "કમ્પ્યુટર લોક", "sleep mode"]): return "lock_pc"
+    if any(w in t for w in ["volume up", "વોલ્યુમ વધાર", "loud", "વધારે"]): return "volume_up"
+    if any(w in t for w in ["volume down", "વોલ્યુમ ઘટાડ", "quiet", "ઓછું", "diminish"]): return "volume_down"
+    if any(w in t for w in ["mute", "મ્યૂટ", "ચૂપ", "silence"]): return "volume_mute"
+    if any(kw in t for kw in ["plan a", "create a plan", "step by step", "roadmap", "guide for", "how to start", "break down", "steps to"]): return "plan_task"
+    if any(w in t for w in ["automate", "mission", "auto", "પોતે કર", "ખુદ કર"]): return "vision_auto"
+    if any(w in t for w in ["click", "tap on", "લોગિન કર", "ક્લિક કર", "dabav", "બટન"]): return "vision_click"
+    if any(w in t for w in ["find", "where is", "nav", "શોધ", "ક્યાં છે", "બતાવ"]):
+        if any(w in t for w in ["where is", "nav", "ક્યાં છે", "બતાવ"]): return "vision_nav"
+        if "find" in t and any(u in t for u in ["icon", "button", "app", "menu", "window", "screen"]): return "vision_nav"
+    if any(w in t for w in ["ip address", "મારું આઇપી", "network info", "address card"]): return "ip_info"
+    if any(w in t for w in ["system info", "cpu", "ram", "health", "status"]): return "health_check"
+    if any(w in t for w in ["search", "shodh", "શોધ", "ગુગલ કર", "find on web"]): return "search_web"
+    if any(w in t for w in ["screenshot", "સ્ક્રીનશોટ", "capture", "પ્રેઝન્ટ"]): return "screenshot"
+    if any(w in t for w in ["code", "python", "script", "લખ", "program", "coding", "refactor", "કોડ", "પાયથોન", "પ્રોગ્રામ", "સ્ક્રિપ્ટ"]):
+        if any(w in t for w in ["council", "debate", "audit", "deep think"]): return "create_gui"
+        return "coding"
+    if any(w in t for w in ["open notepad", "open calculator", "open chrome", "kholo", "chalu karo"]): return "open_app"
+    if any(w in t for w in ["open", "chalu kar"]) and not any(n in t for n in ["note", "નોંધ"]): return "open_app"
+    if any(k in t for k in ["create note", "નોંધ બનાવો", "नोट बनाओ", "लिखो"]): return "create_note"
+    if any(w in t for w in ["joke", "રમુજ", "સાંભળાવ", "funny", "હાસ્ય"]): return "tell_joke"
+    if any(w in t for w in ["weather", "હવામાન", "તાપમાન", "rain"]): return "weather"
+    if any(w in t for w in ["news", "સમાચાર", "ન્યૂઝ", "today's update"]): return "news_query"
+    if any(w in t for w in ["stock", "બજાર", "પૈસા", "finance", "price of", "કિંમત"]): return "finance_query"
+    if any(w in t for w in ["calculate", "ગણતરી", "math", "solve", "how much is", "વત્તા", "ગુણાકાર", "ભાગાકાર"]): return "compute"
+    if any(w in t for w in ["what is in this image", "analyze image", "ફોટો", "આ શું છે", "image info"]): return "image_recognition"
+    if any(w in t for w in ["motivation", "zen", "philosophy", "પ્રેરણા", "તત્વજ્ઞાન", "કંઈક સારું બોલ"]): return "motivation"
+    if any(w in t for w in ["generate", "create image", "logo", "design", "બનાવ", "ચિત્ર"]): return "create_asset"
+    if doc_active and any(w in t for w in ["document", "pdf", "file", "paper", "આમાં શું છે", "પીડીએફ"]): return "pdf_query"
+    if any(w in t for w in ["balance sheet", "income statement", "cash flow", "recommendation", "insider", "analyst", "financials", "માર્કેટ", "સ્ટોક"]):
+        if any(w in t for w in ["buy", "sell", "trade", "order", "ખરીદ", "વેચ", "ઓર્ડર"]): return "stock_trade"
+        return "market_analysis"
+    if any(w in t for w in ["predict", "forecast", "score", "student", "performance", "grade", "માર્કસ", "નિષ્કર્ષ"]): return "predictive_analytics"
+    if any(w in t for w in ["change voice", "અવાજ બદલ", "female voice", "male voice", "set voice", "gender switch"]): return "gender_switch"
+    if any(w in t for w in ["vision", "hand tracking", "વિઝન", "હાથ", "track hands", "start vision", "camera tracking"]): return "vision_assistant"
+    if any(w in t for w in ["push to github", "github push", "upload to github", "save to git", "ગિટહબ"]): return "github_push"
+    if " git " in f" {t} ": return "github_push"
+    if any(w in t for w in ["note", "નોંધ", "નોટ", "create note", "make a note", "બનાવ"]): return "create_note"
+    if any(w in t for w in ["switch to", "mode", "set language", "ભાષા બદલો", "भाषा बदलो", "भाषा बदल", "auto language", "auto mode"]):
+        lang_keywords = ["hindi", "marathi", "gujarati", "english", "nepali", "bihari", "bhojpuri", "pahadi", "pahari", "ગુજરાતી", "हिंदी", "मराठी", "अंग्रेजी", "इंग्रजी", "नेपाली", "भोजपुरी", "पहाड़ी", "auto"]
+        if any(k in t for k in lang_keywords): return "language_switch"
+    return "small_talk"
+
+
+def bench(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for utt in CORPUS:
+            fn(utt)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(CORPUS)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bankoo Intent Router Benchmark")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Mirror the complex-task check that task_manager provides at runtime
+    complex_keywords = ["plan a", "create a plan", "step by step", "roadmap", "guide for", "how to start", "break down", "steps to"]
+    router = IntentRouter(guards={
+        "doc_active": lambda t: False,
+        "complex_task": lambda t: any(kw in t.lower() for kw in complex_keywords),
+    })
+
+    mismatches = [(u, legacy_route(u), router.route(u)) for u in CORPUS if legacy_route(u) != router.route(u)]
+    print(f"🧪 Parity: {len(CORPUS) - len(mismatches)}/{len(CORPUS)} utterances routed identically")
+    for utt, old, new in mismatches:
+        print(f"   ❌ '{utt}': legacy={old} compiled={new}")
+
+    legacy_us = bench(legacy_route, args.rounds)
+    compiled_us = bench(router.route, args.rounds)
+    backend = "native pyahocorasick" if AHOCORASICK_AVAILABLE else "pure-python"
+    print(f"⏱️ Legacy chain:    {legacy_us:8.2f} µs/message")
+    print(f"⏱️ Compiled router: {compiled_us:8.2f} µs/message ({backend})")
+    print(f"⚡ Speedup: {legacy_us / compiled_us:.2f}x over {len(CORPUS)} utterances x {args.rounds} rounds")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Smart Notes Search Benchmark
+Builds a synthetic multilingual corpus (English / Gujarati / Hindi) in a temp
+directory and measures /api/notes/v3/search query latency against the budget.
+
+Usage: python debug_tools/bench_notes_search.py [--notes 50000] [--budget-ms 50]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+VOCAB = {
+    "english": "meeting deadline project client report budget python api database design strategy roadmap "
+               "weather travel recipe gym idea startup investment stock research neural network logic".split(),
+    "gujarati": "હવામાન સુરત મીટિંગ પ્રોજેક્ટ રિપોર્ટ વિચાર મુસાફરી રસોઈ કામ પૈસા બજાર શાળા પરિવાર".split(),
+    "hindi": "मौसम बैठक परियोजना रिपोर्ट विचार यात्रा खाना काम पैसा बाजार स्कूल परिवार शहर".split(),
+}
+SYLLABLES = {
+    "english": "ka lo mi ter an sol ver dis pro ment ing tra cor bal nu rex".split(),
+    "gujarati": "ક ખ ગ મા રી સુ તે નો વા લ પ્ર કા".split(),
+    "hindi": "क ख ग मा री सु ते नो वा ल प्र का".split(),
+}
+TAGS = ["Strategy", "Research", "Finance", "Personal", "Actionable", "Travel", "DatabaseArchitecture"]
+
+QUERIES = [
+    "meeting", "proj*", '"client report"', "tag:Strategy", "હવામાન", "હવા*", "मौसम", "बैठक रिपोर्ट",
+    "python api", "tag:Finance stock", "st*", '"neural network"', "સુરત મીટિંગ", "परि*",
+]
+
+
+def build_lexicon(rng, size=4000):
+    """Real words (frequent) plus a long synthetic tail, weighted roughly like Zipf's law."""
+    lexicon = {}
+    for lang, syllables in SYLLABLES.items():
+        tail = {"".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(size)}
+        words = VOCAB[lang] + sorted(tail)
+        lexicon[lang] = (words, [1.0 / (rank + 1) for rank in range(len(words))])
+    return lexicon
+
+
+def make_note(i, rng, lexicon):
+    lang = rng.choice(list(VOCAB))
+    words, weights = lexicon[lang]
+    return {
+        "id": 1_000_000 + i,
+        "title": " ".join(rng.choices(words, weights, k=4)),
+        "content": " ".join(rng.choices(words, weights, k=rng.randint(30, 120))),
+        "folderId": rng.choice(["f_default", "f_code", "f_work", "f_personal"]),
+        "language": lang,
+        "tags": rng.sample(TAGS, 2),
+        "updatedAt": f"2025-01-01T00:00:{i % 60:02d}",
+        "type": "text"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bankoo Smart Notes Search Benchmark")
+    parser.add_argument("--notes", type=int, default=50000)
+    parser.add_argument("--budget-ms", type=float, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    # Work in a scratch dir so neither the live DB nor the legacy JSON is touched
+    os.chdir(tempfile.mkdtemp(prefix="notes_bench_"))
+    from smart_notes_3 import SmartNotesEngineV3
+
+    engine = SmartNotesEngineV3("bench_notes.db")
+    rng = random.Random(42)
+    lexicon = build_lexicon(rng)
+    start = time.perf_counter()
+    engine.bulk_import([make_note(i, rng, lexicon) for i in range(args.notes)])
+    print(f"📦 Indexed {args.notes} notes in {time.perf_counter() - start:.1f}s")
+
+    # Incremental update cost (one row + its postings)
+    start = time.perf_counter()
+    for i in range(200):
+        engine.update_note(1_000_000 + i, {"content": f"edited meeting notes {i}"})
+    print(f"✏️ update_note: {(time.perf_counter() - start) / 200 * 1000:.2f} ms/edit")
+
+    timings = []
+    for _ in range(args.rounds):
+        for q in QUERIES:
+            t0 = time.perf_counter()
+            engine.search(q, limit=20)
+            timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    p50 = timings[len(timings) // 2]
+    p95 = timings[int(len(timings) * 0.95)]
+    print(f"🔎 search: p50 {p50:.2f} ms | p95 {p95:.2f} ms | max {timings[-1]:.2f} ms over {len(timings)} queries")
+
+    for q in QUERIES[:4]:
+        r = engine.search(q, limit=1)
+        print(f"   '{q}': {r['matches']} hits ({r['total']} ranked)")
+
+    ok = p95 <= args.budget_ms
+    print(f"{'✅' if ok else '❌'} p95 {'within' if ok else 'over'} budget of {args.budget_ms:.0f} ms")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Vision Backend Benchmark
+Runs every local vision backend of the shared pool on the same fixed set of
+screenshots and reports load time, find_element accuracy (hit = within
+--tolerance of the labelled point, 0-1000 coordinates), latency percentiles,
+the batched multi-target call against one-at-a-time calls, and describe latency.
+
+Dataset: a directory with labels.json
+    [{"image": "desktop_1.png", "targets": {"Save button": [412, 88], "Search": [120, 40]}}, ...]
+Without --dataset a synthetic set of text-button screens is generated (OCR,
+Florence and Moondream can read it; landmarks need matching templates).
+
+Usage: python debug_tools/bench_vision_backends.py [--dataset DIR] [--backends ocr,florence,moondream]
+       [--tolerance 40] [--describe]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PIL import Image, ImageDraw, ImageFont
+from vision_backends import vision_pool
+
+LABELS = ["Save", "Cancel", "Search", "Settings", "Open File", "Help", "Export", "Delete"]
+
+
+def synthetic_dataset(n=6, size=(1600, 900), seed=7):
+    rng = random.Random(seed)
+    try:
+        font = ImageFont.truetype("arial.ttf", 28)
+    except OSError:
+        font = ImageFont.load_default()
+    samples = []
+    for _ in range(n):
+        img = Image.new("RGB", size, (235, 238, 242))
+        draw = ImageDraw.Draw(img)
+        draw.rectangle([0, 0, size[0], 60], fill=(40, 44, 52))  # Title bar
+        targets = {}
+        for label in rng.sample(LABELS, 5):
+            for _attempt in range(50):
+                x, y = rng.randint(40, size[0] - 260), rng.randint(100, size[1] - 80)
+                if all(abs(x - tx) > 260 or abs(y - ty) > 70 for tx, ty in targets.values()):
+                    break
+            draw.rectangle([x, y, x + 220, y + 56], fill=(255, 255, 255), outline=(90, 90, 90), width=2)
+            draw.text((x + 20, y + 14), label, fill=(20, 20, 20), font=font)
+            targets[label] = (x, y)
+        samples.append((img, {k: [int((x + 110) / size[0] * 1000), int((y + 28) / size[1] * 1000)]
+                              for k, (x, y) in targets.items()}))
+    return samples
+
+
+def load_dataset(path):
+    with open(os.path.join(path, "labels.json"), encoding="utf-8") as f:
+        labels = json.load(f)
+    samples = []
+    for entry in labels:
+        with Image.open(os.path.join(path, entry["image"])) as img:
+            img.load()
+            samples.append((img.convert("RGB"), entry["targets"]))
+    return samples
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def bench_backend(name, samples, tolerance, describe):
+    start = time.perf_counter()
+    status = vision_pool.warm([name])[name]
+    load_sec = time.perf_counter() - start
+    if status is not True:
+        return {"backend": name, "error": status}
+
+    single_ms, hits, total = [], 0, 0
+    for img, targets in samples:
+        for target, (tx, ty) in targets.items():
+            t = time.perf_counter()
+            result = vision_pool.find_element(img, target, backends=[name])
+            single_ms.append((time.perf_counter() - t) * 1000)
+            total += 1
+            if "error" not in result and abs(result["x"] - tx) <= tolerance and abs(result["y"] - ty) <= tolerance:
+                hits += 1
+
+    batch_ms = []  # All targets of a frame in one batched call
+    for img, targets in samples:
+        t = time.perf_counter()
+        vision_pool.find_elements(img, list(targets), backend=name)
+        batch_ms.append((time.perf_counter() - t) * 1000 / max(1, len(targets)))
+
+    describe_ms = []
+    if describe:
+        for img, _ in samples:
+            t = time.perf_counter()
+            result = vision_pool.describe(img, backend=name)
+            if "error" not in result:
+                describe_ms.append((time.perf_counter() - t) * 1000)
+
+    return {
+        "backend": name, "load_sec": load_sec, "accuracy": hits / total if total else 0.0, "queries": total,
+        "p50": percentile(single_ms, 50), "p95": percentile(single_ms, 95),
+        "batched_per_target": percentile(batch_ms, 50), "describe_p50": percentile(describe_ms, 50) if describe_ms else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", default=None)
+    parser.add_argument("--backends", default=",".join(b for b in vision_pool.backends if b != "ollama"))
+    parser.add_argument("--tolerance", type=int, default=40)
+    parser.add_argument("--describe", action="store_true")
+    args = parser.parse_args()
+
+    samples = load_dataset(args.dataset) if args.dataset else synthetic_dataset()
+    print(f"🚀 {len(samples)} screenshots, {sum(len(t) for _, t in samples)} targets, tolerance ±{args.tolerance}")
+
+    print(f"\n{'backend':12} {'load s':>7} {'acc':>6} {'p50 ms':>8} {'p95 ms':>8} {'batch ms/t':>11} {'describe ms':>12}")
+    for name in args.backends.split(","):
+        r = bench_backend(name, samples, args.tolerance, args.describe)
+        if "error" in r:
+            print(f"{name:12} ❌ {r['error']}")
+            continue
+        describe = f"{r['describe_p50']:.0f}" if r["describe_p50"] is not None else "-"
+        print(f"{name:12} {r['load_sec']:>7.1f} {r['accuracy']:>6.0%} {r['p50']:>8.1f} {r['p95']:>8.1f} "
+              f"{r['batched_per_target']:>11.1f} {describe:>12}")
+
+    print("\n📊 Pool:", json.dumps(vision_pool.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -42,9 +42,8 @@ class ZenithChaosAuditor:
         """Clears pending intents and histories for clean test cycles."""
         self.assistant.pending_intent = None
         self.assistant.pending_data = {}
-        self.assistant.main_history = []
-        self.assistant.ide_history = []
-        self.assistant.history = self.assistant.main_history
+        self.assistant.reset_session("main")
+        self.assistant.reset_session("ide")
         self.captured_responses = []
 
     def run_gauntlet(self):
@@ -159,8 +158,8 @@ class ZenithChaosAuditor:
         logger.info("[v19] Test 2: Semantic Memory Recall...")
         secret_fact = "The Master Key for Zenith is 'Z-99-ALPHA'."
         vector_brain.add_memory(secret_fact, source="auditor_test")
+        vector_brain.flush()  # Writes are batched in the background; make this one visible now
         logger.info("[v19] Success: Fact Injected into Vector Brain.")
-        time.sleep(2) 
         
         self.assistant.ask_ai("Tell me a short joke.")
         
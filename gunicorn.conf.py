@@ -0,0 +1,20 @@
+"""
+Gunicorn settings for `gunicorn -c gunicorn.conf.py wsgi:application` (Linux hosts).
+
+One worker process with many threads: the brain, the UI message bus and the
+session scheduler live in process memory, so extra processes would each load
+their own brain and split the event stream. Scale with SERVER_THREADS instead.
+"""
+
+import config
+
+bind = "0.0.0.0:5001"
+workers = 1
+worker_class = "gthread"
+# Open SSE streams pin a thread each; they get their own share (see serving.StreamLimiter)
+threads = getattr(config, 'SERVER_THREADS', 16) + getattr(config, 'SERVER_MAX_STREAMS', 12)
+timeout = getattr(config, 'SERVER_CHANNEL_TIMEOUT_SEC', 300)  # Long AI calls and PDF ingestion
+graceful_timeout = 30
+keepalive = 75
+preload_app = False  # Load the brain inside the worker; its loader thread would not survive a fork
+accesslog = None     # Requests are logged (sampled, structured) by serving.RequestLog
@@ -0,0 +1,254 @@
+"""
+================================================================================
+  bankoo.ai: COMPILED INTENT ROUTER (AHO-CORASICK)
+================================================================================
+Compiles every Intent keyword cluster (English, Gujarati, Hindi) into a single
+multi-pattern automaton at startup. A message is scanned once, the set of hit
+clusters is collected, and the ordered rule table below is evaluated against
+that set. Rule order mirrors the original `route_intent` if-chain, so priority
+semantics are unchanged.
+================================================================================
+"""
+
+import time
+import logging
+from collections import deque
+
+# Optional C-accelerated automaton (pip install pyahocorasick)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+logger = logging.getLogger("IntentRouter")
+
+# --- KEYWORD CLUSTERS ---
+# Cluster name -> keywords. A keyword may belong to several clusters.
+KEYWORD_CLUSTERS = {
+    # Level 1: PC Automation
+    "lock_pc": ["lock pc", "પીસી લોક", "કમ્પ્યુટર લોક", "sleep mode"],
+    "volume_up": ["volume up", "વોલ્યુમ વધાર", "loud", "વધારે"],
+    "volume_down": ["volume down", "વોલ્યુમ ઘટાડ", "quiet", "ઓછું", "diminish"],
+    "volume_mute": ["mute", "મ્યૂટ", "ચૂપ", "silence"],
+
+    # Level 1.5: Task Breakdown follow-ups
+    "task_followup": ["next step", "done", "complete", "finish", "more detail", "explain", "how to", "detail", "વિગતવાર"],
+
+    # Level 1.6: Neural Vision Control
+    "vision_auto": ["automate", "mission", "auto", "પોતે કર", "ખુદ કર"],
+    "vision_click": ["click", "tap on", "લોગિન કર", "ક્લિક કર", "dabav", "બટન"],
+    "vision_nav": ["where is", "nav", "ક્યાં છે", "બતાવ"],
+    "find_word": ["find"],
+    "ui_element": ["icon", "button", "app", "menu", "window", "screen"],
+
+    # Level 2: Productivity & Information
+    "ip_info": ["ip address", "મારું આઇપી", "network info", "address card"],
+    "health_check": ["system info", "cpu", "ram", "health", "status"],
+    "search_web": ["search", "shodh", "શોધ", "ગુગલ કર", "find on web"],
+    "screenshot": ["screenshot", "સ્ક્રીનશોટ", "capture", "પ્રેઝન્ટ"],
+
+    # Level 3: Creative & Advanced Agents
+    "coding": ["code", "python", "script", "લખ", "program", "coding", "refactor", "કોડ", "પાયથોન", "પ્રોગ્રામ", "સ્ક્રિપ્ટ"],
+    "council": ["council", "debate", "audit", "deep think"],
+    "open_app_explicit": ["open notepad", "open calculator", "open chrome", "kholo", "chalu karo"],
+    "open_word": ["open", "chalu kar"],
+    "note_word": ["note", "નોંધ"],
+    "create_note": ["create note", "નોંધ બનાવો", "नोट बनाओ", "लिखो"],
+    "tell_joke": ["joke", "રમુજ", "સાંભળાવ", "funny", "હાસ્ય"],
+    "weather": ["weather", "હવામાન", "તાપમાન", "rain"],
+    "news_query": ["news", "સમાચાર", "ન્યૂઝ", "today's update"],
+    "finance_query": ["stock", "બજાર", "પૈસા", "finance", "price of", "કિંમત"],
+    "compute": ["calculate", "ગણતરી", "math", "solve", "how much is", "વત્તા", "ગુણાકાર", "ભાગાકાર"],
+    "image_recognition": ["what is in this image", "analyze image", "ફોટો", "આ શું છે", "image info"],
+    "motivation": ["motivation", "zen", "philosophy", "પ્રેરણા", "તત્વજ્ઞાન", "કંઈક સારું બોલ"],
+    "create_asset": ["generate", "create image", "logo", "design", "બનાવ", "ચિત્ર"],
+
+    # Level 4: PDF Intelligence
+    "pdf_query": ["document", "pdf", "file", "paper", "આમાં શું છે", "પીડીએફ"],
+
+    # Level 5: Financial Context
+    "market_context": ["balance sheet", "income statement", "cash flow", "recommendation", "insider", "analyst", "financials", "માર્કેટ", "સ્ટોક"],
+    "trade_action": ["buy", "sell", "trade", "order", "ખરીદ", "વેચ", "ઓર્ડર"],
+
+    # Level 6: Predictive Analytics
+    "predictive": ["predict", "forecast", "score", "student", "performance", "grade", "માર્કસ", "નિષ્કર્ષ"],
+
+    # Level 7-8: Personalization & Vision Assistant
+    "gender_switch": ["change voice", "અવાજ બદલ", "female voice", "male voice", "set voice", "gender switch"],
+    "vision_assistant": ["vision", "hand tracking", "વિઝન", "હાથ", "track hands", "start vision", "camera tracking"],
+
+    # GitHub (" git " is matched on the space-padded text to avoid 'digit')
+    "github_push": ["push to github", "github push", "upload to github", "save to git", "ગિટહબ", " git "],
+    "note_any": ["note", "નોંધ", "નોટ", "create note", "make a note", "બનાવ"],
+
+    # Language switching
+    "switch_cmd": ["switch to", "mode", "set language", "ભાષા બદલો", "भाषा बदलो", "भाषा बदल", "auto language", "auto mode"],
+    "lang_name": ["hindi", "marathi", "gujarati", "english", "nepali", "bihari", "bhojpuri", "pahadi", "pahari", "ગુજરાતી", "हिंदी", "मराठी", "अंग्रेजी", "इंग्रजी", "नेपाली", "भोजपुरी", "पहाड़ी", "auto"],
+}
+
+# --- PRIORITY RULE TABLE ---
+# (intent value, clusters that must all hit, clusters that must not hit, guard name)
+# First matching rule wins. A rule whose guard is not registered is skipped.
+INTENT_RULES = [
+    ("lock_pc", ("lock_pc",), (), None),
+    ("volume_up", ("volume_up",), (), None),
+    ("volume_down", ("volume_down",), (), None),
+    ("volume_mute", ("volume_mute",), (), None),
+
+    ("plan_task", ("task_followup",), (), "active_task"),
+    ("plan_task", (), (), "complex_task"),
+
+    ("vision_auto", ("vision_auto",), (), None),
+    ("vision_click", ("vision_click",), (), None),
+    ("vision_nav", ("vision_nav",), (), None),
+    ("vision_nav", ("find_word", "ui_element"), (), None),
+
+    ("ip_info", ("ip_info",), (), None),
+    ("health_check", ("health_check",), (), None),
+    ("search_web", ("search_web",), (), None),
+    ("screenshot", ("screenshot",), (), None),
+
+    ("create_gui", ("coding", "council"), (), None),
+    ("coding", ("coding",), (), None),
+    ("open_app", ("open_app_explicit",), (), None),
+    ("open_app", ("open_word",), ("note_word",), None),
+
+    ("create_note", ("create_note",), (), None),
+    ("tell_joke", ("tell_joke",), (), None),
+    ("weather", ("weather",), (), None),
+    ("news_query", ("news_query",), (), None),
+    ("finance_query", ("finance_query",), (), None),
+    ("compute", ("compute",), (), None),
+    ("image_recognition", ("image_recognition",), (), None),
+    ("motivation", ("motivation",), (), None),
+    ("create_asset", ("create_asset",), (), None),
+
+    ("pdf_query", ("pdf_query",), (), "doc_active"),
+
+    ("stock_trade", ("market_context", "trade_action"), (), None),
+    ("market_analysis", ("market_context",), (), None),
+
+    ("predictive_analytics", ("predictive",), (), None),
+    ("gender_switch", ("gender_switch",), (), None),
+    ("vision_assistant", ("vision_assistant",), (), None),
+    ("github_push", ("github_push",), (), None),
+    ("create_note", ("note_any",), (), None),
+    ("language_switch", ("switch_cmd", "lang_name"), (), None),
+]
+
+DEFAULT_INTENT = "small_talk"
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick multi-pattern matcher.
+    Maps every keyword to the set of clusters it belongs to and reports all
+    clusters hit by a text in one left-to-right pass (overlaps included).
+    """
+    def __init__(self, keyword_map):
+        self.size = len(keyword_map)
+        self._native = None
+
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for keyword, clusters in keyword_map.items():
+                automaton.add_word(keyword, frozenset(clusters))
+            automaton.make_automaton()
+            self._native = automaton
+            return
+
+        # Pure-Python build: trie (goto), failure links and merged outputs
+        goto = [{}]
+        out = [set()]
+        for keyword, clusters in keyword_map.items():
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(set())
+                state = nxt
+            out[state].update(clusters)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] |= out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [frozenset(o) for o in out]
+
+    def scan(self, text):
+        """Returns the set of cluster names whose keywords occur in `text`."""
+        if self._native is not None:
+            hits = set()
+            for _, clusters in self._native.iter(text):
+                hits |= clusters
+            return hits
+
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        hits = set()
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits |= out[state]
+        return hits
+
+
+class IntentRouter:
+    """
+    Single-pass intent classifier for DesktopAssistant.route_intent.
+    Guards are callables `fn(text) -> bool` for runtime state that keywords
+    cannot express (active task, loaded PDF). They are evaluated lazily, only
+    once a rule's keyword conditions already hold.
+    """
+    def __init__(self, clusters=None, rules=None, guards=None, default=DEFAULT_INTENT):
+        self.clusters = clusters or KEYWORD_CLUSTERS
+        self.rules = rules or INTENT_RULES
+        self.guards = guards or {}
+        self.default = default
+
+        keyword_map = {}
+        for name, keywords in self.clusters.items():
+            for kw in keywords:
+                keyword_map.setdefault(kw.lower(), set()).add(name)
+
+        start = time.perf_counter()
+        self.automaton = KeywordAutomaton(keyword_map)
+        build_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"⚡ Intent Router compiled: {len(keyword_map)} keywords, {len(self.rules)} rules in {build_ms:.1f}ms "
+                    f"({'native' if AHOCORASICK_AVAILABLE else 'pure-python'} automaton)")
+
+    def clusters_hit(self, text):
+        """Returns the set of keyword clusters present in `text`."""
+        # Space padding lets word-boundary keywords like " git " match at the edges
+        return self.automaton.scan(f" {text.lower()} ")
+
+    def route(self, text):
+        """Returns the intent value of the first rule satisfied by `text`."""
+        hits = self.clusters_hit(text)
+        for intent, required, excluded, guard in self.rules:
+            if required and not hits.issuperset(required):
+                continue
+            if excluded and not hits.isdisjoint(excluded):
+                continue
+            if guard:
+                check = self.guards.get(guard)
+                if check is None or not check(text):
+                    continue
+            return intent
+        return self.default
@@ -0,0 +1,203 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH LLM GATEWAY (POOLED PROVIDER CONNECTIONS)
+================================================================================
+One process-wide entry point for OpenAI-compatible providers (Cerebras, Groq,
+Fireworks, OpenRouter, Ollama). Each provider base URL gets exactly one
+OpenAI client backed by a keep-alive httpx connection pool (HTTP/2 when the
+`h2` package is installed), so TLS handshakes and client construction happen
+once per process instead of once per call or per DesktopAssistant instance.
+
+    from llm_gateway import gateway
+    text = gateway.complete("cerebras/llama-3.3-70b", prompt="Hi", system="Be brief")
+    for delta in gateway.stream("groq/llama-3.1-8b-instant", messages=[...]):
+        ...
+================================================================================
+"""
+
+import time
+import logging
+import threading
+
+import config
+
+try:
+    import httpx
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger("LLMGateway")
+
+# provider -> (base_url or callable, config key attribute, extra default headers)
+PROVIDERS = {
+    "cerebras": ("https://api.cerebras.ai/v1", "CEREBRAS_API_KEY", None),
+    "groq": ("https://api.groq.com/openai/v1", "GROQ_API_KEY", None),
+    "fireworks": ("https://api.fireworks.ai/inference/v1", "FIREWORKS_API_KEY", None),
+    "openrouter": ("https://openrouter.ai/api/v1", "OPENROUTER_API_KEY",
+                   {"HTTP-Referer": "http://localhost:5001", "X-Title": "Bankoo AI"}),
+    "ollama": (lambda: f"{getattr(config, 'OLLAMA_BASE_URL', 'http://localhost:11434')}/v1", None, None),
+}
+
+
+class LLMGateway:
+    """
+    Lazily builds and caches one pooled client per provider.
+    Model strings follow the config convention "provider/model"; anything whose
+    prefix is not a known provider (e.g. "deepseek/deepseek-chat") goes to
+    `default_provider` with the full string as model id.
+    """
+    def __init__(self, max_connections=20, keepalive_expiry=90.0):
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._clients = {}
+        self._lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.metrics = {}  # provider -> {"calls", "errors", "total_sec"}
+
+    def _api_key(self, provider):
+        _, key_attr, _ = PROVIDERS[provider]
+        if key_attr is None:
+            return "ollama"  # Local server ignores the key
+        return getattr(config, key_attr, "") or ""
+
+    def client(self, provider):
+        """Shared OpenAI client for `provider`, or None if unavailable / no API key."""
+        if not OPENAI_AVAILABLE or provider not in PROVIDERS:
+            return None
+        cached = self._clients.get(provider)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            if provider in self._clients:
+                return self._clients[provider]
+            api_key = self._api_key(provider)
+            if not api_key:
+                return None
+
+            base_url, _, headers = PROVIDERS[provider]
+            base_url = base_url() if callable(base_url) else base_url
+            http_client = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections,
+                                    keepalive_expiry=self.keepalive_expiry),
+                timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+            client = OpenAI(base_url=base_url, api_key=api_key, default_headers=headers, http_client=http_client)
+            self._clients[provider] = client
+            logger.info(f"🔌 LLM Gateway: {provider} pool ready ({base_url}, {'HTTP/2' if HTTP2_AVAILABLE else 'HTTP/1.1'} keep-alive)")
+            return client
+
+    def resolve(self, model, default_provider="openrouter"):
+        """Returns (provider, model_id) for a config-style model string."""
+        if "/" in model:
+            prefix, rest = model.split("/", 1)
+            if prefix in PROVIDERS:
+                return prefix, rest
+        return default_provider, model
+
+    @staticmethod
+    def _messages(messages, prompt, system):
+        if messages is not None:
+            return messages
+        msgs = [{"role": "system", "content": system}] if system else []
+        msgs.append({"role": "user", "content": prompt})
+        return msgs
+
+    def _record(self, provider, elapsed, ok):
+        with self.stats_lock:
+            m = self.metrics.setdefault(provider, {"calls": 0, "errors": 0, "total_sec": 0.0})
+            m["calls"] += 1
+            m["total_sec"] += elapsed
+            if not ok:
+                m["errors"] += 1
+
+    def _target(self, model, provider, default_provider):
+        if provider:
+            return provider, model
+        return self.resolve(model, default_provider)
+
+    def complete(self, model, messages=None, prompt=None, system=None, provider=None,
+                 default_provider="openrouter", **kwargs):
+        """
+        Blocking chat completion; returns the answer text.
+        Pass either `messages` or `prompt` (+ optional `system`). Extra kwargs
+        (temperature, max_tokens, timeout, ...) go straight to the SDK.
+        Raises on transport/provider errors, like the SDK itself.
+        """
+        provider, model_id = self._target(model, provider, default_provider)
+        client = self.client(provider)
+        if client is None:
+            raise RuntimeError(f"LLM provider '{provider}' is not configured")
+
+        start = time.time()
+        ok = False
+        try:
+            resp = client.chat.completions.create(model=model_id, messages=self._messages(messages, prompt, system), **kwargs)
+            ok = True
+            return resp.choices[0].message.content
+        finally:
+            self._record(provider, time.time() - start, ok)
+
+    def stream(self, model, messages=None, prompt=None, system=None, provider=None,
+               default_provider="openrouter", **kwargs):
+        """Streaming chat completion; yields text deltas as they arrive."""
+        provider, model_id = self._target(model, provider, default_provider)
+        client = self.client(provider)
+        if client is None:
+            raise RuntimeError(f"LLM provider '{provider}' is not configured")
+
+        start = time.time()
+        ok = False
+        try:
+            for chunk in client.chat.completions.create(model=model_id, messages=self._messages(messages, prompt, system),
+                                                        stream=True, **kwargs):
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+            ok = True
+        finally:
+            self._record(provider, time.time() - start, ok)
+
+    def warm(self, connect=True):
+        """
+        Builds the pool of every configured provider up front (server start-up) so the
+        first user request does not pay for client construction or the TLS handshake.
+        Returns the providers that are ready.
+        """
+        ready = []
+        for provider in PROVIDERS:
+            client = self.client(provider)
+            if client is None:
+                continue
+            if connect:
+                try:
+                    client.with_options(timeout=5.0, max_retries=0).models.list()
+                except Exception as e:
+                    logger.debug(f"Warm-up probe for {provider} failed: {e}")
+                    continue
+            ready.append(provider)
+        logger.info(f"🔥 LLM Gateway warmed: {', '.join(ready) or 'no providers'}")
+        return ready
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                p: {**m, "avg_sec": round(m["total_sec"] / m["calls"], 3) if m["calls"] else 0.0}
+                for p, m in self.metrics.items()
+            }
+
+
+# Global Instance
+gateway = LLMGateway()
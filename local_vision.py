@@ -1,4 +1,3 @@
-import os
 import base64
 import requests
 import pyautogui
@@ -18,52 +17,71 @@ class LocalVision:
         self.model = model
         logger.info(f"👁️ [VISION] Local Vision Active (Model: {model})")
 
+    def capture(self):
+        """Screenshot resized for faster processing (Ollama models like smaller images), kept in memory."""
+        screenshot = pyautogui.screenshot()
+        screenshot.thumbnail((1280, 720))
+        return screenshot
+
     def capture_screen(self, save_path="temp_vision.png"):
-        """Captures a screenshot of the primary screen."""
+        """Captures a screenshot of the primary screen to a file (legacy callers)."""
         try:
-            screenshot = pyautogui.screenshot()
-            # Resize for faster processing (Ollama models like smaller images)
-            screenshot.thumbnail((1280, 720))
-            screenshot.save(save_path)
+            self.capture().save(save_path)
             return save_path
         except Exception as e:
             logger.error(f"👁️ [VISION] Screen capture failed: {e}")
             return None
 
-    def analyze_screen(self, prompt="What is on my screen? describe concisely."):
-        """Captures and analyzes the screen."""
-        image_path = self.capture_screen()
-        if not image_path:
-            return "Vision capture failed."
+    @staticmethod
+    def encode(image, quality=85):
+        """In-memory JPEG -> base64, the form Ollama's `images` field expects."""
+        if not isinstance(image, Image.Image):
+            image = Image.open(image)
+        buf = BytesIO()
+        image.convert("RGB").save(buf, format="JPEG", quality=quality)
+        return base64.b64encode(buf.getvalue()).decode('utf-8')
 
+    def describe(self, image, prompt="What is on my screen? describe concisely.", keep_alive=None):
+        """Asks the Ollama vision model about an in-memory image; returns {"text"} or {"error"}."""
         try:
-            # Encode image to base64
-            with open(image_path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-
             # Prepare Request for Ollama
             payload = {
                 "model": self.model,
                 "prompt": prompt,
                 "stream": False,
-                "images": [encoded_string]
+                "images": [self.encode(image)]
             }
+            if keep_alive is not None:
+                payload["keep_alive"] = keep_alive # How long Ollama keeps the model resident
 
             response = requests.post(f"{self.ollama_url}/api/generate", json=payload, timeout=60)
             
             if response.status_code == 200:
-                result = response.json().get("response", "No description generated.")
                 logger.info("👁️ [VISION] Screen analysis successful.")
-                return result
-            else:
-                return f"Vision Server Error: {response.status_code}"
+                return {"text": response.json().get("response", "No description generated.")}
+            return {"error": f"Vision Server Error: {response.status_code}"}
 
         except Exception as e:
             logger.error(f"👁️ [VISION] Analysis failed: {e}")
-            return f"Vision Error: {str(e)}"
-        finally:
-            if os.path.exists(image_path):
-                os.remove(image_path)
+            return {"error": f"Vision Error: {str(e)}"}
+
+    def unload(self):
+        """Asks Ollama to drop the model from (V)RAM right away."""
+        try:
+            requests.post(f"{self.ollama_url}/api/generate", json={"model": self.model, "keep_alive": 0}, timeout=10)
+        except Exception as e:
+            logger.debug(f"Ollama unload failed: {e}")
+
+    def analyze_screen(self, prompt="What is on my screen? describe concisely."):
+        """Captures and analyzes the screen (no temp files)."""
+        try:
+            image = self.capture()
+        except Exception as e:
+            logger.error(f"👁️ [VISION] Screen capture failed: {e}")
+            return "Vision capture failed."
+
+        result = self.describe(image, prompt)
+        return result.get("text") or result["error"]
 
 # Global Instance
 vision = LocalVision()
@@ -1,8 +1,8 @@
 import os
 import logging
-from vision_landmark import LandmarkVision
+from vision_landmark import landmarks, coordinate_cache
 from vision_accessibility import AccessibilityAgent
-from vision_florence import FlorenceVision
+from vision_backends import vision_pool, as_image
 import config
 
 logger = logging.getLogger(__name__)
@@ -11,16 +11,21 @@ class LocalVisionCoordinator:
     """Coordinates local vision strategies to minimize cloud costs"""
     
     def __init__(self):
-        self.landmarks = LandmarkVision()
+        self.landmarks = landmarks # Shared: templates are preloaded once per process
         self.accessibility = AccessibilityAgent()
-        self.neural_eye = FlorenceVision()
+        self.neural_eye = vision_pool # Warm, shared local models (loaded on first use, evicted when idle)
         
-    def find_element(self, image_path, target):
-        """Try local strategies in order of speed/cost"""
+    def find_element(self, image, target):
+        """Try local strategies in order of speed/cost (image: in-memory PIL frame or a path)"""
+        image = as_image(image)
         
         # Strategy 1: Landmark / Template Matching (Fastest)
         logger.info(f"📍 Checking Landmarks for: {target}")
-        result = self.landmarks.find_icon(target.lower().replace(" ", "_"))
+        name = target.lower().replace(" ", "_")
+        if name not in self.landmarks.templates and coordinate_cache.get(name):
+            result = coordinate_cache.get(name) # Confirmed earlier, no template to re-verify against
+        else:
+            result = self.landmarks.find_icon(name, frame=image)
         if "error" not in result:
             return {
                 "thought": f"[LANDMARK] Found exact match for '{target}' via template.",
@@ -41,12 +46,13 @@ class LocalVisionCoordinator:
                 "status": "CONTINUE"
             }
 
-        # Strategy 3: Neural Sight (Florence-2 - No Training Needed)
-        logger.info(f"🧠 Checking Neural Sight (Florence-2) for: {target}")
-        result = self.neural_eye.find_element(image_path, target)
+        # Strategy 3: Neural Sight (OCR / Florence-2 / ... per VISION_BACKEND_ORDER - No Training Needed)
+        neural = [b for b in self.neural_eye.order if b != "landmark"]
+        logger.info(f"🧠 Checking Neural Sight ({', '.join(neural)}) for: {target}")
+        result = self.neural_eye.find_element(image, target, backends=neural)
         if "error" not in result:
              return {
-                "thought": f"[NEURAL] Found '{target}' using local model.",
+                "thought": f"[NEURAL] Found '{target}' using local model ({result['backend']}).",
                 "action": "click",
                 "params": {"x": result["x"], "y": result["y"]},
                 "status": "CONTINUE"
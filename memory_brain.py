@@ -1,7 +1,12 @@
 import os
+import re
+import time
+import queue
+import hashlib
 import chromadb
 import logging
-import uuid
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from chromadb.utils import embedding_functions
 
@@ -13,10 +18,18 @@ class MemoryBrain:
     """
     Bankoo's Long-Term Vector Memory using ChromaDB.
     Stores and retrieves semantic context from conversations and documents.
+    Writes are queued and committed by a single background writer in batches
+    (one embedding call + one upsert per flush), so callers never wait on Chroma.
     """
 
-    def __init__(self, db_path="bankoo_vector_db"):
+    def __init__(self, db_path="bankoo_vector_db", batch_size=32, flush_interval=2.0, max_queue=1000):
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self._recent = OrderedDict()  # Fingerprints of recently written memories (dedupe window)
+        self.stats_lock = threading.Lock()
+        self.metrics = {"queued": 0, "written": 0, "deduped": 0, "dropped": 0, "flushes": 0, "last_flush_ms": 0.0}
         
         try:
             # Initialize Persistent Chroma Client
@@ -37,40 +50,123 @@ class MemoryBrain:
             self.client = None
             self.collection = None
 
+        if self.collection:
+            threading.Thread(target=self._writer, name="MemoryBrainWriter", daemon=True).start()
+
+    @staticmethod
+    def fingerprint(text):
+        """Near-identical texts (case, whitespace, punctuation) share one fingerprint."""
+        norm = re.sub(r"[^\w]+", " ", text.casefold()).strip()
+        return hashlib.sha1(norm.encode("utf-8")).hexdigest()
+
     def add_memory(self, text, source="chat", metadata=None):
         """
-        Stores a piece of information in the vector database.
+        Queues a piece of information for the vector database (non-blocking).
         
         Args:
             text (str): The content to remember.
             source (str): Where it came from (chat, pdf, system).
             metadata (dict): Additional info (timestamp, user, etc).
+            
+        Returns:
+            bool: True if queued, False if memory is offline or the queue is full.
         """
+        if not self.collection or not text or not text.strip():
+            return False
+
+        if metadata is None:
+            metadata = {}
+        
+        # Enrich metadata
+        metadata["source"] = source
+        metadata["timestamp"] = datetime.now().isoformat()
+        
+        try:
+            self.queue.put_nowait((text, metadata))
+        except queue.Full:
+            with self.stats_lock:
+                self.metrics["dropped"] += 1
+            logger.warning(f"⚠️ Memory queue full, dropped: {text[:30]}...")
+            return False
+
+        with self.stats_lock:
+            self.metrics["queued"] += 1
+        return True
+
+    def flush(self, timeout=10):
+        """Blocks until everything queued so far has been written."""
         if not self.collection:
             return False
+        done = threading.Event()
+        deadline = time.time() + timeout
+        try:
+            self.queue.put(done, timeout=timeout)  # Queue full: the writer is behind, don't hang the caller
+        except queue.Full:
+            return False
+        return done.wait(max(0, deadline - time.time()))
+
+    def _writer(self):
+        """Single writer: gathers up to `batch_size` items or `flush_interval` seconds, then commits."""
+        while True:
+            batch, waiters = [], []
+            item = self.queue.get()
+            deadline = time.time() + self.flush_interval
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break  # Explicit flush: commit now
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get(timeout=max(0, deadline - time.time()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._commit(batch)
+            for waiter in waiters:
+                waiter.set()
+
+    def _commit(self, batch):
+        documents, metadatas, ids = [], [], []
+        for text, metadata in batch:
+            fp = self.fingerprint(text)
+            if fp in self._recent or fp in ids:
+                with self.stats_lock:
+                    self.metrics["deduped"] += 1
+                continue
+            documents.append(text)
+            metadatas.append(metadata)
+            ids.append(fp)
+        if not documents:
+            return
 
+        start = time.time()
         try:
-            if metadata is None:
-                metadata = {}
-            
-            # Enrich metadata
-            metadata["source"] = source
-            metadata["timestamp"] = datetime.now().isoformat()
-            
-            # Generate unique ID
-            mem_id = str(uuid.uuid4())
-            
-            self.collection.add(
-                documents=[text],
-                metadatas=[metadata],
-                ids=[mem_id]
-            )
-            logger.info(f"💾 Memory stored: {text[:30]}...")
-            return True
-            
+            # One embedding pass for the whole batch; fingerprint ids make re-inserts idempotent
+            embeddings = self.embedding_fn(documents)
+            self.collection.upsert(documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids)
         except Exception as e:
-            logger.error(f"❌ Failed to add memory: {e}")
-            return False
+            logger.error(f"❌ Failed to add {len(documents)} memories: {e}")
+            return
+
+        for fp in ids:
+            self._recent[fp] = True
+        while len(self._recent) > 4096:
+            self._recent.popitem(last=False)
+
+        elapsed_ms = (time.time() - start) * 1000
+        with self.stats_lock:
+            self.metrics["written"] += len(documents)
+            self.metrics["flushes"] += 1
+            self.metrics["last_flush_ms"] = round(elapsed_ms, 1)
+        logger.info(f"💾 Memory flush: {len(documents)} stored in {elapsed_ms:.0f}ms ({documents[0][:30]}...)")
+
+    def ingest_stats(self):
+        """Counters for the write pipeline (queue depth, batches, dedupes, drops)."""
+        with self.stats_lock:
+            return {**self.metrics, "queue_depth": self.queue.qsize()}
 
     def search_memory(self, query, n_results=3):
         """
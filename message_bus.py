@@ -0,0 +1,112 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH MESSAGE BUS (PUSH DELIVERY)
+================================================================================
+Pub/sub layer between the brain callbacks and every connected UI.
+Events live in a bounded ring buffer and carry a monotonically increasing
+sequence number. Each client keeps its own cursor, so several browser tabs,
+the pywebview window and legacy pollers all receive every event without
+racing to clear one shared queue.
+================================================================================
+"""
+
+import time
+import logging
+import threading
+from collections import deque, OrderedDict
+
+logger = logging.getLogger("MessageBus")
+
+
+class MessageBus:
+    """
+    Bounded, sequence-numbered event log with blocking reads.
+    Slow clients that fall behind the ring simply skip the evicted events
+    (reported through the `dropped` count) instead of growing memory.
+    """
+    def __init__(self, capacity=512, cursor_ttl=300, max_cursors=1024):
+        self.capacity = capacity
+        self.cursor_ttl = cursor_ttl      # Idle seconds before a server-held cursor is forgotten
+        self.max_cursors = max_cursors    # Hard cap; least recently seen cursors go first
+        self._events = deque(maxlen=capacity)
+        self._seq = 0
+        self._cond = threading.Condition()
+        # Server-held cursors for clients that cannot track their own (legacy polling):
+        # client_id -> [cursor, last_seen], least recently seen first
+        self._cursors = OrderedDict()
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, event):
+        """Appends an event and wakes every waiting subscriber. Returns its sequence number."""
+        event.setdefault("timestamp", time.time())
+        with self._cond:
+            self._seq += 1
+            event["seq"] = self._seq
+            self._events.append(event)
+            self._cond.notify_all()
+            return self._seq
+
+    def read(self, cursor, timeout=None):
+        """
+        Returns (events, new_cursor, dropped) for everything published after `cursor`.
+        Blocks up to `timeout` seconds when nothing is pending (None = don't block).
+        """
+        with self._cond:
+            if timeout and self._seq <= cursor:
+                self._cond.wait_for(lambda: self._seq > cursor, timeout=timeout)
+
+            if self._seq <= cursor:
+                return [], cursor, 0
+
+            oldest = self._events[0]["seq"] if self._events else self._seq + 1
+            dropped = max(0, oldest - cursor - 1)
+            # Events are contiguous, so the first unread one sits at a fixed offset
+            start = max(0, cursor + 1 - oldest)
+            events = list(self._events)[start:]
+            return events, self._seq, dropped
+
+    def read_for(self, client_id, timeout=None):
+        """Cursor-tracked read for clients identified only by an id (e.g. /api/get_updates)."""
+        # New clients (or ones idle past the TTL) start at the live edge rather than replaying old audio/messages
+        with self._cond:
+            self._evict_idle_cursors()
+            entry = self._cursors.get(client_id)
+            cursor = entry[0] if entry else self._seq
+            self._touch(client_id, cursor)
+        events, new_cursor, dropped = self.read(cursor, timeout=timeout)
+        with self._cond:
+            entry = self._cursors.get(client_id)
+            self._touch(client_id, max(new_cursor, entry[0] if entry else 0))
+        if dropped:
+            logger.warning(f"📉 Client '{client_id}' fell behind: {dropped} events dropped")
+        return events
+
+    def _touch(self, client_id, cursor):
+        self._cursors[client_id] = [cursor, time.monotonic()]
+        self._cursors.move_to_end(client_id)
+        while len(self._cursors) > self.max_cursors:
+            self._cursors.popitem(last=False)
+
+    def _evict_idle_cursors(self):
+        cutoff = time.monotonic() - self.cursor_ttl
+        while self._cursors:
+            client_id, (_, last_seen) = next(iter(self._cursors.items()))
+            if last_seen >= cutoff:
+                break
+            del self._cursors[client_id]
+
+    def stats(self):
+        with self._cond:
+            return {
+                "last_seq": self._seq,
+                "buffered": len(self._events),
+                "capacity": self.capacity,
+                "cursor_clients": len(self._cursors)
+            }
+
+
+# Global Instance
+bus = MessageBus()
@@ -1,18 +1,19 @@
-import easyocr
-import os
+import sys
+import time
 
-print("🚀 Initializing EasyOCR Reader (English)...")
-try:
-    # This downloads the models on first run
-    reader = easyocr.Reader(['en'], gpu=False) 
-    print("✅ EasyOCR is ready with English models.")
-    
-    # Simple test check
-    print("🔬 Testing OCR on a dummy blank image...")
-    import numpy as np
-    from PIL import Image
-    dummy_img = np.zeros((100, 100, 3), dtype=np.uint8)
-    result = reader.readtext(dummy_img)
-    print("✅ Basic OCR Loop test passed.")
-except Exception as e:
-    print(f"❌ Error during initialization: {e}")
+from vision_backends import vision_pool
+
+# Usage: python preload_vision.py [backend ...]   (default: VISION_BACKEND_ORDER + describe backend)
+# Downloads weights on first run and checks that each backend loads; inside the
+# server the same pool keeps models resident and evicts them when idle.
+names = sys.argv[1:] or list(dict.fromkeys(vision_pool.order + [vision_pool.describe_backend]))
+
+print(f"🚀 Warming vision backends: {', '.join(names)}...")
+start = time.perf_counter()
+for name, status in vision_pool.warm(names).items():
+    if status is True:
+        load_sec = vision_pool.stats()[name]["load_sec"]
+        print(f"✅ {name} is ready ({load_sec:.1f}s).")
+    else:
+        print(f"❌ {name} failed: {status}")
+print(f"⏱️ Done in {time.perf_counter() - start:.1f}s")
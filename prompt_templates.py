@@ -0,0 +1,244 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH PROMPT LIBRARY (CACHED, HOT-RELOADING TEMPLATES)
+================================================================================
+Builds every system prompt ask_ai needs once, instead of re-reading the
+Prometheus protocol and re-formatting the multilingual prompt table on each
+turn. Template files under resources/prompts are watched by mtime (checked at
+most every `check_interval` seconds) and everything is rebuilt only when one
+of them changes:
+
+  bankoo_prometheus.txt   appended to the English persona
+  <language>.txt          overrides the built-in prompt for that language
+================================================================================
+"""
+
+import os
+import time
+import logging
+import threading
+
+from intent_router import KeywordAutomaton
+
+logger = logging.getLogger("PromptLibrary")
+
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "prompts")
+PROMETHEUS_FILE = "bankoo_prometheus.txt"
+
+# --- ZENITH PROMPT BUCKETS (Phase 3: Selective Optimization) ---
+# These buckets allow Agent-Lightning to optimize specific behaviors independently.
+PROMPT_BUCKETS = {
+    "persona": "Tame 'Bankoo' chho, Meet na personal professional AI assistant. Output natural, human-like reasoning.",
+    "output_rules": "1. Natural, fluent script only. 2. Respectful, friendly tone (Standard/Surti). 3. No robotic phrasing. 4. Detailed explanations.",
+    "technical_handling": "For unknown technical terms, use English in brackets or transliteration."
+}
+
+BUILTIN_PROMPTS = {
+    "english": (
+        "You are 'Bankoo', a highly professional AI assistant. "
+        "Provide clear, concise, and helpful answers in English. "
+        "Maintain a formal yet friendly tone."
+    ),
+    "hindi": (
+        "आप 'Bankoo' हैं, एक पेशेवर AI सहायक। "
+        "नियम: \n"
+        "1. केवल शुद्ध हिंदी (हिंदी लिपि) में उत्तर दें। \n"
+        "2. अंग्रेजी शब्दों का प्रयोग कम से कम करें, केवल तकनीकी शब्दों के लिए। \n"
+        "3. उत्तर सम्मानजनक और मददगार होना चाहिए।"
+    ),
+    "marathi": (
+        "तुम्ही 'Bankoo' आहात, एक व्यावसायिक AI सहाय्यक। "
+        "नियम: \n"
+        "1. फक्त शुद्ध मराठी (मराठी लिपी) मध्ये उत्तर द्या। \n"
+        "2. तांत्रिक शब्दांशिवाय इतरत्र इंग्रजी शब्दांचा वापर टाळा। \n"
+        "3. उत्तर स्पष्ट आणि नम्र असावे।"
+    ),
+    "gujarati": (
+        "{persona}\n"
+        "Output Instructions: \n"
+        "{output_rules}\n"
+        "{technical_handling}"
+    ).format(
+        persona="Tame 'Bankoo' chho, Meet na personal professional AI assistant.",
+        output_rules="1. Write ONLY in natural, fluent Gujarati Script (ગુજરાતી લિપિ). \n2. Tone: Respectful, friendly, and helpful (Standard/Surti mix). \n3. Use 'Tame' and 'Aapo' for respect. ",
+        technical_handling="4. For technical terms not in your mapping, you can use English in brackets or Gujarati transliteration. \n5. Provide detailed, human-like explanations."
+    ),
+    "nepali": (
+        "तपाईं 'Bankoo' हुनुहुन्छ, एक पेशेवर AI सहायक। "
+        "नियम: \n"
+        "1. केवल शुद्ध नेपाली (नेपाली लिपि) मा उत्तर दिनुहोस्। \n"
+        "2. अंग्रेजी शब्दहरूको प्रयोग कम से कम गर्नुहोस्, केवल प्राविधिक शब्दहरूको लागि। \n"
+        "3. उत्तर सम्मानजनक र सहयोगी हुनुपर्छ।"
+    ),
+    "bihari": (
+        "रउआ 'Bankoo' बानी। "
+        "नियम: \n"
+        "1. रउआ एकदम खाँटी भोजपुरी (Bihari Style) में बात करे के बा। \n"
+        "2. 'रउआ', 'का हाल बा', 'ठीक बा', 'बुझनी' जइसन शब्द के प्रयोग करीं। \n"
+        "3. जवाब एकदम अपनत्व वाला और आदर सम्मान से भरल होखे के चाहीं। \n"
+        "4. लिपि देवनागरी (Hindi Script) ही रही।"
+    ),
+    "pahadi": (
+        "तुसी 'Bankoo' हो, पहाड़ा दा AI साथी। "
+        "नियम: \n"
+        "1. तुसी पहाड़ी/हिमाचली/गढ़वाली अंदाज विच गल करनी है। \n"
+        "2. मीठी और सरल भाषा दा प्रयोग करो, जिवें पहाड़ा दे लोग बोलदे ने। \n"
+        "3. 'ji', 'bhaiji', 'theek cha' जइसन शब्द (Context अनुसार) use करो। \n"
+        "4. जवाब देवनागरी लिपि विच ही देना है।"
+    )
+}
+
+# Universal Studio: AI detects language automatically
+CODING_PROMPT = (
+    "You are 'Bankoo AI', a premium AI IDE assistant created for Meet Sutariya, an expert developer. "
+    "Meet is professional-grade and expects exceptional code quality. "
+    "\nCODE LANGUAGE DETECTION: "
+    "1. Automatically detect the target programming language from the user's request. "
+    "2. Write ALL code in 100% English. "
+    "\nEXPLANATION RULES: "
+    "3. Write brief explanations in {lang_title} script ONLY (2-3 sentences maximum). "
+    "4. Use native script, NOT romanized transliteration."
+)
+
+# FORCE COMPLIANCE: Explicit instruction to override model defaults
+CHAT_SUFFIX = (
+    "\nIMPORTANT INSTRUCTION: You MUST reply in {lang_upper} language only. "
+    "Do not switch to English unless asked."
+    "\nUser: {creator}"
+)
+
+CODING_KEYWORDS = [
+    # General coding terms
+    'write code', 'write script', 'write program', 'function', 'class', 'debug', 'compile', 'execute',
+    'refactor', 'algorithm', 'syntax error', 'software', 'develop',
+
+    # Programming Languages
+    'python code', 'java code', 'javascript', 'typescript', 'c++ code', 'c# code', 'csharp', 'rust code',
+    'php code', 'ruby code', 'swift code', 'kotlin', 'scala', 'perl code', 'matlab', 'julia code',
+    'dart code', 'elixir', 'haskell', 'lua code', 'bash script', 'shell script', 'powershell',
+
+    # Web Technologies
+    'html code', 'css style', 'react', 'vue', 'angular', 'nodejs', 'express', 'django', 'flask',
+    'fastapi', 'spring', 'laravel', 'rails', 'jquery', 'bootstrap', 'tailwind',
+
+    # Databases & SQL
+    'sql query', 'database query', 'create table', 'select from', 'insert into', 'update set',
+    'delete from', 'mysql', 'postgresql', 'mongodb', 'sqlite',
+
+    # Mobile Development
+    'android app', 'ios app', 'flutter app', 'react native',
+
+    # Data Science & ML
+    'pandas', 'numpy', 'tensorflow', 'pytorch', 'sklearn', 'keras',
+    'jupyter notebook', 'machine learning', 'neural network',
+
+    # DevOps
+    'docker container', 'kubernetes', 'github repo', 'gitlab',
+
+    # Gujarati coding terms
+    'કોડ લખ', 'પાયથોન કોડ', 'પ્રોગ્રામ',
+
+    # Hindi coding terms
+    'कोड लिखो', 'प्रोग्राम बनाओ',
+]
+
+
+class PromptLibrary:
+    """
+    Precompiled system prompts and keyword matchers for ask_ai.
+    `prompts` mirrors the legacy per-language dict (plus "buckets") so existing
+    readers of `assistant.prompts` keep working.
+    """
+    def __init__(self, prompts_dir=PROMPTS_DIR, check_interval=2.0):
+        self.prompts_dir = prompts_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtimes = None
+        self._last_check = 0.0
+        self._chat_cache = {}
+        self._coding_cache = {}
+        self.prompts = {}
+        self.reloads = 0
+
+        self.coding_matcher = KeywordAutomaton({kw: {"coding"} for kw in CODING_KEYWORDS})
+        self.refresh(force=True)
+
+    def _scan(self):
+        """Returns {filename: mtime} for every template file currently on disk."""
+        if not os.path.isdir(self.prompts_dir):
+            return {}
+        mtimes = {}
+        for name in os.listdir(self.prompts_dir):
+            if name.endswith(".txt"):
+                try:
+                    mtimes[name] = os.path.getmtime(os.path.join(self.prompts_dir, name))
+                except OSError:
+                    pass
+        return mtimes
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.prompts_dir, name), "r", encoding="utf-8") as f:
+                return f.read()
+        except Exception as e:
+            logger.warning(f"Failed to load prompt template {name}: {e}")
+            return None
+
+    def refresh(self, force=False):
+        """Rebuilds all prompts if a template file was added, removed or modified."""
+        now = time.time()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+
+        mtimes = self._scan()
+        if not force and mtimes == self._mtimes:
+            return False
+
+        with self._lock:
+            prompts = dict(BUILTIN_PROMPTS)
+            for lang in BUILTIN_PROMPTS:
+                if f"{lang}.txt" in mtimes:
+                    override = self._read(f"{lang}.txt")
+                    if override:
+                        prompts[lang] = override.strip()
+
+            # --- PROMETHEUS PROTOCOL INJECTION ---
+            if PROMETHEUS_FILE in mtimes:
+                prometheus = self._read(PROMETHEUS_FILE)
+                if prometheus:
+                    prompts["english"] += "\n\n" + prometheus
+
+            prompts["buckets"] = dict(PROMPT_BUCKETS)
+            self.prompts = prompts
+            self._chat_cache = {}
+            self._coding_cache = {}
+            self._mtimes = mtimes
+            if not force:
+                self.reloads += 1
+                logger.info(f"♻️ Prompt templates reloaded ({len(mtimes)} files)")
+        return True
+
+    def chat_prompt(self, lang, creator):
+        """Language-locked chat system prompt (built once per language/creator)."""
+        self.refresh()
+        key = (lang, creator)
+        prompt = self._chat_cache.get(key)
+        if prompt is None:
+            base = self.prompts.get(lang, self.prompts["gujarati"])
+            prompt = base + CHAT_SUFFIX.format(lang_upper=lang.upper(), creator=creator)
+            self._chat_cache[key] = prompt
+        return prompt
+
+    def coding_prompt(self, lang):
+        """IDE system prompt with explanations in `lang` (built once per language)."""
+        self.refresh()
+        prompt = self._coding_cache.get(lang)
+        if prompt is None:
+            prompt = CODING_PROMPT.format(lang_title=lang.title())
+            self._coding_cache[lang] = prompt
+        return prompt
+
+    def is_coding_request(self, text):
+        """Single-pass scan for any coding keyword."""
+        return bool(self.coding_matcher.scan(text.lower()))
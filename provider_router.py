@@ -0,0 +1,374 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH PROVIDER ROUTER (HEDGED, LATENCY-AWARE FAILOVER)
+================================================================================
+Picks the provider lane for every chat completion instead of a fixed
+model -> client mapping:
+
+  * Rolling p50/p95 latency (and time-to-first-token) plus error rate per
+    provider/model lane.
+  * Hedging: if the chosen lane has not answered (or streamed its first token)
+    by its own p95, the same request is raced on the next equivalent lane and
+    the first one to respond wins.
+  * Circuit breakers per provider: repeated failures take a provider out of
+    rotation for a cooldown, then a single trial request decides.
+  * Cached connectivity state, refreshed passively by real traffic and probed
+    at most once per TTL.
+
+Equivalent lanes come from config.MODEL_EQUIVALENCE_GROUPS.
+================================================================================
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import deque
+
+import requests
+
+import config
+from llm_gateway import gateway
+
+logger = logging.getLogger("ProviderRouter")
+
+NETWORK_ERRORS = ("APIConnectionError", "APITimeoutError", "ConnectError", "ConnectTimeout",
+                  "ConnectionError", "ReadTimeout", "TimeoutError")
+LOCAL_PROVIDERS = ("ollama",)  # Served on this machine: says nothing about internet reachability
+
+
+def _percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class LaneStats:
+    """Rolling latency / error window for one provider/model lane."""
+    def __init__(self, window=200):
+        self.latencies = deque(maxlen=window)  # Full response time (sec) of successful calls
+        self.ttfts = deque(maxlen=window)      # Time to first streamed token (sec)
+        self.outcomes = deque(maxlen=window)   # True = success
+
+    def record(self, ok, latency=None, ttft=None):
+        self.outcomes.append(ok)
+        if ok and latency is not None:
+            self.latencies.append(latency)
+        if ok and ttft is not None:
+            self.ttfts.append(ttft)
+
+    def error_rate(self):
+        return (self.outcomes.count(False) / len(self.outcomes)) if self.outcomes else 0.0
+
+    def snapshot(self):
+        def r(v):
+            return round(v, 3) if v is not None else None
+        return {
+            "calls": len(self.outcomes),
+            "error_rate": round(self.error_rate(), 3),
+            "p50_sec": r(_percentile(self.latencies, 0.5)),
+            "p95_sec": r(_percentile(self.latencies, 0.95)),
+            "ttft_p50_sec": r(_percentile(self.ttfts, 0.5)),
+            "ttft_p95_sec": r(_percentile(self.ttfts, 0.95)),
+        }
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures -> half-open trial after `cooldown`."""
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=3, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def available(self):
+        """Whether a request could be admitted right now (does not claim the half-open trial)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                return time.time() - self.opened_at >= self.cooldown
+            return not self._trial_in_flight
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"🔌 Circuit OPEN after {self.failures} failures (cooldown {self.cooldown:.0f}s)")
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+
+class ConnectivityMonitor:
+    """Cached internet reachability: real traffic keeps it fresh, probes run at most once per `ttl`."""
+    def __init__(self, ttl=30.0, probe_url="https://www.google.com", timeout=2):
+        self.ttl = ttl
+        self.probe_url = probe_url
+        self.timeout = timeout
+        self.online = True
+        self.checked_at = 0.0
+        self.probes = 0
+        self._lock = threading.Lock()
+
+    def mark(self, online):
+        self.online = online
+        self.checked_at = time.time()
+
+    def invalidate(self):
+        self.checked_at = 0.0
+
+    def is_online(self):
+        if time.time() - self.checked_at < self.ttl:
+            return self.online
+        if not self._lock.acquire(blocking=False):
+            return self.online  # Another thread is probing; use the last known state
+        try:
+            self.probes += 1
+            try:
+                requests.head(self.probe_url, timeout=self.timeout)
+                self.mark(True)
+            except Exception:
+                self.mark(False)
+            return self.online
+        finally:
+            self._lock.release()
+
+
+class ProviderRouter:
+    """
+    Routes chat completions across equivalent provider lanes with hedging and failover.
+    A lane is a (provider, model_id) pair as resolved by the LLM gateway.
+    """
+    def __init__(self, gateway, groups=None, hedge=True, hedge_min_sec=1.0, hedge_default_sec=4.0,
+                 min_samples=20, breaker_failures=3, breaker_cooldown=30.0, connectivity_ttl=30.0):
+        self.gateway = gateway
+        self.groups = groups or {}
+        self.hedge = hedge
+        self.hedge_min_sec = hedge_min_sec
+        self.hedge_default_sec = hedge_default_sec
+        self.min_samples = min_samples
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.connectivity = ConnectivityMonitor(ttl=connectivity_ttl)
+
+        self._lock = threading.Lock()
+        self.lane_stats = {}  # "provider/model" -> LaneStats
+        self.breakers = {}    # provider -> CircuitBreaker
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    # --- BOOKKEEPING ---
+
+    def _stats(self, lane):
+        key = f"{lane[0]}/{lane[1]}"
+        with self._lock:
+            if key not in self.lane_stats:
+                self.lane_stats[key] = LaneStats()
+            return self.lane_stats[key]
+
+    def _breaker(self, provider):
+        with self._lock:
+            if provider not in self.breakers:
+                self.breakers[provider] = CircuitBreaker(self.breaker_failures, self.breaker_cooldown)
+            return self.breakers[provider]
+
+    def _hedge_delay(self, lane, stream):
+        st = self._stats(lane)
+        samples = st.ttfts if stream else st.latencies
+        if len(samples) < self.min_samples:
+            return self.hedge_default_sec
+        return max(self.hedge_min_sec, _percentile(samples, 0.95))
+
+    # --- LANE SELECTION ---
+
+    def lanes_for(self, model):
+        """Requested model first, then healthy equivalents (fewest errors, lowest p50)."""
+        requested = self.gateway.resolve(model)
+        alternates = []
+        for members in self.groups.values():
+            if model in members:
+                alternates.extend(self.gateway.resolve(m) for m in members if m != model)
+
+        def score(lane):
+            st = self._stats(lane)
+            return (round(st.error_rate(), 1), _percentile(st.latencies, 0.5) or self.hedge_default_sec)
+
+        ordered = [requested] + sorted(dict.fromkeys(alternates), key=score)
+        lanes = []
+        for lane in dict.fromkeys(ordered):
+            if self.gateway.client(lane[0]) is None:
+                continue  # Provider not configured (no key / SDK)
+            if self._breaker(lane[0]).available():
+                lanes.append(lane)
+        if not lanes and self.gateway.client(requested[0]) is not None:
+            lanes.append(requested)  # Every breaker is open: still try what was asked for
+        return lanes
+
+    # --- EXECUTION ---
+
+    def _attempt(self, lane, messages, stream, kwargs, events, cancel):
+        provider, model_id = lane
+        breaker = self._breaker(provider)
+        if not breaker.allow():
+            events.put((lane, "error", RuntimeError(f"Circuit open for {provider}")))
+            return
+
+        start = time.time()
+        ttft = None
+        cancelled = False
+        try:
+            if stream:
+                parts = []
+                gen = self.gateway.stream(model_id, messages=messages, provider=provider, **kwargs)
+                try:
+                    for delta in gen:
+                        if cancel.is_set():
+                            cancelled = True
+                            break
+                        if ttft is None:
+                            ttft = time.time() - start
+                        parts.append(delta)
+                        events.put((lane, "delta", delta))
+                finally:
+                    gen.close()
+                text = "".join(parts)
+            else:
+                text = self.gateway.complete(model_id, messages=messages, provider=provider, **kwargs)
+        except Exception as e:
+            self._stats(lane).record(False)
+            breaker.failure()
+            if type(e).__name__ in NETWORK_ERRORS and provider not in LOCAL_PROVIDERS:
+                self.connectivity.invalidate()
+            events.put((lane, "error", e))
+            return
+
+        breaker.success()
+        if cancelled:
+            return  # Lost the race mid-stream: the provider works, but the latency sample is partial
+        self._stats(lane).record(True, time.time() - start, ttft)
+        if provider not in LOCAL_PROVIDERS:
+            self.connectivity.mark(True)
+        events.put((lane, "done", text))
+
+    def complete(self, model, messages, on_delta=None, **kwargs):
+        """
+        Runs one chat completion, hedging/failing over across equivalent lanes.
+        Streams through `on_delta` when given. Returns (answer, "provider/model").
+        Raises the last provider error if every lane fails.
+        """
+        lanes = self.lanes_for(model)
+        if not lanes:
+            raise RuntimeError(f"No provider lane available for {model}")
+
+        stream = on_delta is not None
+        events = queue.Queue()
+        pending = list(lanes)
+        active = {}  # lane -> cancel Event
+        winner = None
+        hedged = False
+        parts = []
+        last_error = None
+
+        def launch():
+            lane = pending.pop(0)
+            cancel = threading.Event()
+            active[lane] = cancel
+            threading.Thread(target=self._attempt, args=(lane, messages, stream, kwargs, events, cancel),
+                             daemon=True, name=f"Lane-{lane[0]}").start()
+            return time.time() + self._hedge_delay(lane, stream)
+
+        hedge_at = launch()
+        while active:
+            can_hedge = self.hedge and winner is None and pending and len(active) < 2
+            timeout = max(0.0, hedge_at - time.time()) if can_hedge else None
+            try:
+                lane, kind, payload = events.get(timeout=timeout)
+            except queue.Empty:
+                self.hedges += 1
+                hedged = True
+                logger.info(f"🪁 Hedging {model}: {'/'.join(next(iter(active)))} passed its p95, racing {'/'.join(pending[0])}")
+                hedge_at = launch()
+                continue
+
+            if winner is not None and lane != winner:
+                continue  # Late output from a losing lane
+
+            if kind == "error":
+                active.pop(lane, None)
+                last_error = payload
+                if lane == winner:
+                    raise payload  # Failed mid-stream; deltas were already forwarded
+                logger.warning(f"⚠️ Lane {'/'.join(lane)} failed: {type(payload).__name__}: {payload}")
+                if not active and pending:
+                    self.failovers += 1
+                    hedge_at = launch()
+                continue
+
+            if winner is None:
+                winner = lane
+                if hedged and lane != lanes[0]:
+                    self.hedge_wins += 1
+                for other, cancel in active.items():
+                    if other != lane:
+                        cancel.set()
+
+            if kind == "delta":
+                parts.append(payload)
+                on_delta(payload)
+            else:  # done
+                return ("".join(parts) if stream else payload), "/".join(lane)
+
+        raise last_error or RuntimeError(f"All provider lanes failed for {model}")
+
+    def stats(self):
+        with self._lock:
+            lanes = {k: v.snapshot() for k, v in self.lane_stats.items()}
+            breakers = {p: b.state for p, b in self.breakers.items()}
+        return {
+            "lanes": lanes,
+            "breakers": breakers,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "online": self.connectivity.online,
+            "connectivity_probes": self.connectivity.probes
+        }
+
+
+# Global Instance
+router = ProviderRouter(
+    gateway,
+    groups=getattr(config, 'MODEL_EQUIVALENCE_GROUPS', {}),
+    hedge=getattr(config, 'ROUTER_HEDGE', True),
+    hedge_min_sec=getattr(config, 'ROUTER_HEDGE_MIN_SEC', 1.0),
+    hedge_default_sec=getattr(config, 'ROUTER_HEDGE_DEFAULT_SEC', 4.0),
+    breaker_failures=getattr(config, 'ROUTER_BREAKER_FAILURES', 3),
+    breaker_cooldown=getattr(config, 'ROUTER_BREAKER_COOLDOWN_SEC', 30.0),
+    connectivity_ttl=getattr(config, 'ROUTER_CONNECTIVITY_TTL_SEC', 30.0)
+)
@@ -0,0 +1,234 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH RESPONSE CACHE (EXACT + SEMANTIC LLM ANSWERS)
+================================================================================
+Sits in front of the provider router so repeated factual and coding questions
+(from the orb, the IDE or Telegram) are answered without a cloud round-trip.
+
+  Exact layer     key = (model, system prompt hash, normalized input)
+  Semantic layer  cosine similarity of MiniLM embeddings within the same
+                  (model, system prompt) bucket, above `similarity`
+
+Entries expire by intent class (config.RESPONSE_CACHE_TTLS) and the least
+recently used ones are evicted past `max_entries`. Time-sensitive intents
+(stock, weather, news, ...) and follow-up questions that depend on the
+conversation are never cached.
+================================================================================
+"""
+
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import config
+from tts_cache import normalize_text
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger("ResponseCache")
+
+DEFAULT_TTLS = {
+    "coding": 7 * 24 * 3600,
+    "factual": 24 * 3600,
+    "chat": 3600,
+}
+
+# Intents whose answer depends on the current moment (or must be fresh every time)
+BYPASS_INTENTS = {
+    "weather", "news_query", "finance_query", "search_web", "calendar", "reminder",
+    "sensitive_info", "tell_joke", "system_info", "ip_info", "health_check",
+}
+
+TIME_SENSITIVE = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|now|right now|current(ly)?|latest|live|recent|this (week|month|year)|"
+    r"price|stock|share|weather|news|score|forecast|aaj|abhi|kal)\b|આજે|અત્યારે|હવામાન|आज|अभी|मौसम|समाचार",
+    re.IGNORECASE
+)
+
+# Short questions that only make sense against the previous turn
+FOLLOW_UP = re.compile(
+    r"^(and|also|but|so|then|what about|how about|why|more|continue|again|explain (it|that|this)|same)\b|"
+    r"\b(it|that|this|those|these|above|previous|earlier|last one)\b",
+    re.IGNORECASE
+)
+
+CHAT_INTENTS = {"small_talk"}
+
+
+def _hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_query(text):
+    """Lower-cased, whitespace-collapsed input without trailing punctuation."""
+    return normalize_text(text).lower().rstrip(" ?!.।")
+
+
+class ResponseCache:
+    """
+    Two-layer LLM answer cache. `embedding_fn` (a Chroma-style callable taking a
+    list of strings) enables the semantic layer; it can be attached later.
+    """
+    def __init__(self, max_entries=2000, ttls=None, semantic=True, similarity=0.95, embedding_fn=None):
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.semantic = semantic and NUMPY_AVAILABLE
+        self.similarity = similarity
+        self.embedding_fn = embedding_fn
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> entry, least recently used first
+        self._vectors = OrderedDict()  # normalized text -> unit embedding (small memo for get -> put)
+        self.hits_exact = 0
+        self.hits_semantic = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+
+    # --- POLICY ---
+
+    def classify(self, text, intent=None):
+        """Returns the TTL class for a request, or None if it must bypass the cache."""
+        intent = getattr(intent, "value", intent)
+        if intent in BYPASS_INTENTS or TIME_SENSITIVE.search(text):
+            return None
+        if len(text.split()) <= 6 and FOLLOW_UP.search(text):
+            return None
+        if intent == "coding":
+            return "coding"
+        if intent in CHAT_INTENTS:
+            return "chat"
+        return "factual"
+
+    # --- EMBEDDINGS ---
+
+    def _embed(self, query):
+        if not (self.semantic and self.embedding_fn):
+            return None
+        vec = self._vectors.get(query)
+        if vec is not None:
+            return vec
+        try:
+            vec = np.asarray(self.embedding_fn([query])[0], dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            if not norm:
+                return None
+            vec = vec / norm
+        except Exception as e:
+            logger.debug(f"Embedding failed, semantic layer skipped: {e}")
+            return None
+        with self._lock:
+            self._vectors[query] = vec
+            while len(self._vectors) > 64:
+                self._vectors.popitem(last=False)
+        return vec
+
+    # --- LOOKUP / STORE ---
+
+    def _bucket(self, model, system_prompt):
+        return f"{model}\x00{_hash(system_prompt or '')}"
+
+    def get(self, model, system_prompt, text, intent=None):
+        """
+        Returns (answer, outcome) where outcome is "exact", "semantic", "miss" or "bypass".
+        """
+        if self.classify(text, intent) is None:
+            with self._lock:
+                self.bypasses += 1
+            return None, "bypass"
+
+        query = normalize_query(text)
+        bucket = self._bucket(model, system_prompt)
+        key = _hash(f"{bucket}\x00{query}")
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires"] > now:
+                self._entries.move_to_end(key)
+                self.hits_exact += 1
+                return entry["answer"], "exact"
+            if entry:
+                del self._entries[key]
+
+        vec = self._embed(query)
+        if vec is not None:
+            with self._lock:
+                candidates = [(k, e) for k, e in self._entries.items()
+                              if e["bucket"] == bucket and e["vector"] is not None and e["expires"] > now]
+                if candidates:
+                    sims = np.stack([e["vector"] for _, e in candidates]) @ vec
+                    best = int(np.argmax(sims))
+                    if sims[best] >= self.similarity:
+                        k, e = candidates[best]
+                        self._entries.move_to_end(k)
+                        self.hits_semantic += 1
+                        return e["answer"], "semantic"
+
+        with self._lock:
+            self.misses += 1
+        return None, "miss"
+
+    def put(self, model, system_prompt, text, answer, intent=None):
+        ttl_class = self.classify(text, intent)
+        if ttl_class is None or not answer:
+            return
+        query = normalize_query(text)
+        bucket = self._bucket(model, system_prompt)
+        key = _hash(f"{bucket}\x00{query}")
+        vec = self._embed(query)
+        now = time.time()
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = {
+                "answer": answer,
+                "bucket": bucket,
+                "vector": vec,
+                "class": ttl_class,
+                "expires": now + self.ttls.get(ttl_class, DEFAULT_TTLS["factual"])
+            }
+            self._evict(now)
+
+    def _evict(self, now):
+        # Caller holds the lock. Expired entries first, then least recently used.
+        if len(self._entries) <= self.max_entries:
+            return
+        for k in [k for k, e in self._entries.items() if e["expires"] <= now]:
+            del self._entries[k]
+            self.evictions += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            hits = self.hits_exact + self.hits_semantic
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits_exact": self.hits_exact,
+                "hits_semantic": self.hits_semantic,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "evictions": self.evictions,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "semantic_enabled": bool(self.semantic and self.embedding_fn)
+            }
+
+
+# Global Instance
+response_cache = ResponseCache(
+    max_entries=getattr(config, 'RESPONSE_CACHE_MAX_ENTRIES', 2000),
+    ttls=getattr(config, 'RESPONSE_CACHE_TTLS', None),
+    semantic=getattr(config, 'RESPONSE_CACHE_SEMANTIC', True),
+    similarity=getattr(config, 'RESPONSE_CACHE_SIMILARITY', 0.95)
+)
@@ -7,7 +7,8 @@ import uuid
 import logging
 import pandas as pd
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
+from crawl_engine import Crawler
 
 # Configure Logger for Scraper
 logger = logging.getLogger("scraper-brain")
@@ -23,14 +24,14 @@ class ScraperBrain:
         threading.Thread(target=self._scheduler_loop, daemon=True).start()
 
     # --- CORE SCRAPER LOGIC ---
-    def extract(self, url, options=None):
-        """Extracts data from a single URL based on options."""
+    def extract(self, url, options=None, session=None):
+        """Extracts data from a single URL based on options (pass a requests session to reuse connections)."""
         if not options:
             options = {"titles": True}
 
         try:
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-            response = requests.get(url, headers=headers, timeout=10)
+            response = (session or requests).get(url, headers=headers, timeout=10)
             response.raise_for_status()
             soup = BeautifulSoup(response.text, 'html.parser')
 
@@ -150,35 +151,28 @@ class ScraperBrain:
             return {"error": str(e)}
 
     # --- SPIDER LOGIC ---
-    def spider(self, start_url, max_pages=5, options=None):
-        """Crawls a website starting from start_url."""
-        visited = set()
-        queue = [start_url]
-        results = []
-        
-        while queue and len(visited) < max_pages:
-            url = queue.pop(0)
-            if url in visited: continue
-            
+    def spider(self, start_url, max_pages=5, options=None, max_depth=None):
+        """Crawls a website starting from start_url (concurrent, same domain, robots.txt aware)."""
+        options = dict(options or {"titles": True})
+        keep_links = options.get('links')
+        options['links'] = True # Needed to discover pages; stripped again if not requested
+
+        def fetch(url, session):
             logger.info(f"🕷️ Spider Visiting: {url}")
-            res = self.extract(url, options)
-            if 'error' not in res:
-                results.append({"url": url, "data": res['data']})
-                visited.add(url)
-                
-                # Add new links to queue (same domain only)
-                domain = urlparse(start_url).netloc
-                if 'links' in res['data']:
-                    for l in res['data']['links']:
-                        l_url = l['url']
-                        if urlparse(l_url).netloc == domain and l_url not in visited:
-                            queue.append(l_url)
-            else:
-                 logger.error(f"Failed to crawl {url}: {res['error']}")
-            
-            time.sleep(0.5) # Politeness delay
+            res = self.extract(url, options, session=session)
+            return res if 'error' in res else res['data']
 
-        return {"pages_crawled": len(visited), "results": results}
+        crawl = Crawler(fetch, lambda data: [(l['url'], l['text']) for l in data.get('links', [])],
+                        max_pages=max_pages, max_depth=max_depth, same_domain=True).crawl(start_url)
+        if 'error' in crawl:
+            return {"pages_crawled": 0, "results": [], "error": crawl['error']}
+        results = []
+        for url, data in crawl['results']:
+            if not keep_links:
+                data = {k: v for k, v in data.items() if k != 'links'}
+            results.append({"url": url, "data": data})
+        logger.info(f"🕸️ Spider done: {crawl['pages_crawled']} pages ({crawl.get('stats', {}).get('pages_per_sec', 0)} pages/s)")
+        return {"pages_crawled": crawl['pages_crawled'], "results": results, "stats": crawl.get('stats', {})}
 
     # --- AI MAGIC ---
     def ai_universal(self, url, query):
@@ -192,8 +186,7 @@ class ScraperBrain:
             
             # 2. Ask AI
             import config
-            from assistant import DesktopAssistant
-            assistant = DesktopAssistant() # Lazy init to use client
+            from llm_gateway import gateway
             
             # Use JSON mode if possible or just prompting
             prompt = f"""
@@ -214,17 +207,8 @@ class ScraperBrain:
             
             # Using the fast model or reasoning model depending on complexity
             # For extraction, a smart model is better.
-            import openai # Or whatever client wrapper is used
-            
-            # We'll use the assistant's client directly if available
-            assistant._init_ai()
-             
-            response = assistant.client.chat.completions.create(
-                model=config.PRIMARY_MODEL,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            result = response.choices[0].message.content
+            # Pooled provider connection; no per-request DesktopAssistant / client construction
+            result = gateway.complete(config.PRIMARY_MODEL, prompt=prompt)
             # Cleanup markdown if present
             result = result.replace('```json', '').replace('```', '').strip()
             
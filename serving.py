@@ -0,0 +1,223 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH SERVING RUNTIME (PRODUCTION MODE)
+================================================================================
+Everything bankoo_main needs to run outside the Flask dev server:
+
+  RequestLog  structured, sampled access log (one JSON line per logged
+              request). Errors and slow requests are always logged; the
+              rest at `sample_rate`, so heartbeats and note lookups no
+              longer print a line each.
+  JobRunner   bounded background pool for long-running routes (PDF
+              ingestion, crawls). Clients opt in with `?async=1` or the
+              `Prefer: respond-async` header, get 202 + a job id, and poll
+              /api/jobs/<id>.
+  StreamLimiter  caps concurrently open streaming responses (/api/events
+              and token streams). Each holds a request thread for as long
+              as it is open, so past SERVER_MAX_STREAMS new streams get 503
+              and clients fall back to polling / non-streamed answers.
+  serve()     picks the server: "production" runs waitress (multi-threaded,
+              works on Windows); "dev" keeps app.run(). For Linux hosts,
+              wsgi.py + gunicorn.conf.py give a gunicorn entry point.
+
+The brain, message bus and session scheduler are process-local state, so
+production scales with threads inside one warmed process, not with forks.
+================================================================================
+"""
+
+import json
+import time
+import uuid
+import random
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+try:
+    from waitress import serve as waitress_serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+logger = logging.getLogger("Serving")
+access_logger = logging.getLogger("bankoo.access")
+
+# Polling / push endpoints that would otherwise dominate the log
+QUIET_PATHS = ('/api/get_updates', '/api/events')
+
+
+class RequestLog:
+    """Sampled JSON access log. Call `begin()` in before_request and `finish()` in after_request."""
+    def __init__(self, sample_rate=0.05, slow_ms=1000.0, quiet_paths=QUIET_PATHS):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.quiet_paths = set(quiet_paths)
+        self.logged = 0
+        self.skipped = 0
+
+    def begin(self, request, g):
+        g.request_started = time.perf_counter()
+
+    def finish(self, request, g, response):
+        if not request.path.startswith('/api/') or request.path in self.quiet_paths:
+            return response
+        started = getattr(g, "request_started", None)
+        ms = (time.perf_counter() - started) * 1000 if started else 0.0
+
+        status = response.status_code
+        reason = "error" if status >= 400 else "slow" if ms >= self.slow_ms else None
+        if reason is None and random.random() >= self.sample_rate:
+            self.skipped += 1
+            return response
+        self.logged += 1
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": status,
+            "ms": round(ms, 1),
+            "bytes": response.content_length,  # None for streamed bodies
+            "session": (request.headers.get('X-Bankoo-Session') or None),
+            "remote": request.remote_addr,
+            "reason": reason or "sampled",
+        }
+        level = logging.WARNING if status >= 500 or reason == "slow" else logging.INFO
+        access_logger.log(level, json.dumps(record, ensure_ascii=False))
+        return response
+
+    def stats(self):
+        return {"logged": self.logged, "skipped": self.skipped,
+                "sample_rate": self.sample_rate, "slow_ms": self.slow_ms}
+
+
+class JobRunner:
+    """Runs long route handlers off the request thread and keeps their results for polling."""
+    def __init__(self, max_workers=4, max_jobs=200, result_ttl=3600):
+        self.max_jobs = max_jobs
+        self.result_ttl = result_ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="RouteJob")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # job_id -> record, oldest first
+
+    def submit(self, kind, fn, *args, **kwargs):
+        job_id = uuid.uuid4().hex[:12]
+        job = {"id": job_id, "kind": kind, "status": "queued", "created": time.time(),
+               "started": None, "finished": None, "result": None, "error": None}
+        with self._lock:
+            self._jobs[job_id] = job
+            self._prune()
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job, fn, args, kwargs):
+        job["status"] = "running"
+        job["started"] = time.time()
+        try:
+            job["result"] = fn(*args, **kwargs)
+            job["status"] = "done"
+        except Exception as e:
+            logger.error(f"Job {job['kind']} ({job['id']}) failed: {e}")
+            job["error"] = str(e)
+            job["status"] = "failed"
+        finally:
+            job["finished"] = time.time()
+
+    def _prune(self):
+        # Caller holds the lock. Expired finished jobs first, then the oldest finished ones.
+        now = time.time()
+        for job_id in [j for j, rec in self._jobs.items() if rec["finished"] and now - rec["finished"] > self.result_ttl]:
+            del self._jobs[job_id]
+        finished = [j for j, rec in self._jobs.items() if rec["finished"]]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+
+class StreamLimiter:
+    """
+    Counting gate for long-lived streaming responses. `acquire()` before building
+    the response; `attach(response)` releases the slot when the server closes it
+    (client gone, stream finished).
+    """
+    def __init__(self, max_streams=12):
+        self.max_streams = max_streams
+        self._lock = threading.Lock()
+        self.active = 0
+        self.rejected = 0
+
+    def acquire(self):
+        with self._lock:
+            if self.active >= self.max_streams:
+                self.rejected += 1
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+    def attach(self, response):
+        response.call_on_close(self.release)
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {"active": self.active, "max": self.max_streams, "rejected": self.rejected}
+
+
+def wants_async(request):
+    """True if the client asked for a 202 + job id instead of waiting."""
+    if request.args.get('async') in ('1', 'true'):
+        return True
+    return 'respond-async' in (request.headers.get('Prefer') or '')
+
+
+def serve(app, host="0.0.0.0", port=5001, mode=None, threads=None):
+    """Runs `app` with the configured server (config.SERVER_MODE: "production" or "dev")."""
+    mode = mode or getattr(config, 'SERVER_MODE', 'dev')
+    threads = threads or getattr(config, 'SERVER_THREADS', 16)
+
+    if mode == "production":
+        if WAITRESS_AVAILABLE:
+            # Open streams each pin a thread: give them their own share on top of the request threads
+            total = threads + streams.max_streams
+            logger.info(f"🚀 Production server: waitress on {host}:{port} "
+                        f"({threads} request + {streams.max_streams} stream threads)")
+            waitress_serve(
+                app, host=host, port=port, threads=total,
+                connection_limit=getattr(config, 'SERVER_CONNECTION_LIMIT', 200),
+                channel_timeout=getattr(config, 'SERVER_CHANNEL_TIMEOUT_SEC', 300),
+                max_request_body_size=getattr(config, 'SERVER_MAX_BODY_MB', 256) * 1024 * 1024,
+                ident="bankoo"
+            )
+            return
+        logger.warning("⚠️ SERVER_MODE=production but waitress is not installed; falling back to the dev server")
+
+    app.run(host=host, port=port, debug=False, threaded=True, use_reloader=False)
+
+
+# Global Instances
+request_log = RequestLog(
+    sample_rate=getattr(config, 'ACCESS_LOG_SAMPLE_RATE', 0.05),
+    slow_ms=getattr(config, 'ACCESS_LOG_SLOW_MS', 1000.0)
+)
+jobs = JobRunner(
+    max_workers=getattr(config, 'SERVER_JOB_WORKERS', 4),
+    result_ttl=getattr(config, 'SERVER_JOB_TTL_SEC', 3600)
+)
+streams = StreamLimiter(max_streams=getattr(config, 'SERVER_MAX_STREAMS', 12))
@@ -0,0 +1,185 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH SESSION SCHEDULER (MULTI-USER REQUEST HANDLING)
+================================================================================
+Lets one DesktopAssistant serve several users/devices (web UI, IDE, Telegram,
+mobile audio) at once without their conversations clobbering each other.
+
+  SessionState      per-session conversational state (pending intent, last
+                    answer, language, busy flag) bound to the worker thread
+                    for the duration of a request
+  SessionScheduler  bounded worker pool; requests of the same session run
+                    strictly in arrival order, different sessions run in
+                    parallel; admission control rejects work once a
+                    session's queue or the global backlog is full
+================================================================================
+"""
+
+import time
+import logging
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, Future
+
+import config
+
+logger = logging.getLogger("SessionScheduler")
+
+DEFAULT_SESSION = "main"
+
+
+class SchedulerBusy(Exception):
+    """Raised when a request is refused by admission control (map to HTTP 429)."""
+    def __init__(self, message, retry_after=1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SessionState:
+    """Mutable per-conversation state that used to live on DesktopAssistant itself."""
+    def __init__(self, session_id, language="gujarati"):
+        self.session_id = session_id
+        self.pending_intent = None
+        self.pending_data = {}
+        self.last_response_text = None
+        self.current_language = language
+        self.is_busy = False
+        self.last_active = time.time()
+
+
+class SessionStore:
+    """LRU of SessionState objects plus the one bound to the current request."""
+    def __init__(self, max_sessions=500, default_language="gujarati"):
+        self.max_sessions = max_sessions
+        self.default_language = default_language
+        self._lock = threading.Lock()
+        self._states = OrderedDict()
+        self._current = contextvars.ContextVar("bankoo_session", default=None)
+
+    def get(self, session_id):
+        with self._lock:
+            state = self._states.get(session_id)
+            if state is None:
+                state = SessionState(session_id, self.default_language)
+                self._states[session_id] = state
+            self._states.move_to_end(session_id)
+            if len(self._states) > self.max_sessions:
+                # Least recently used first; the local orb session and busy ones are kept
+                idle = [sid for sid, s in self._states.items() if sid != DEFAULT_SESSION and not s.is_busy]
+                for sid in idle[:len(self._states) - self.max_sessions]:
+                    del self._states[sid]
+            state.last_active = time.time()
+            return state
+
+    def reset(self, session_id):
+        with self._lock:
+            self._states.pop(session_id, None)
+
+    def bind(self, session_id):
+        """Binds a session to the running thread; returns a token for `unbind`."""
+        return self._current.set(self.get(session_id))
+
+    def unbind(self, token):
+        self._current.reset(token)
+
+    def current(self):
+        """State of the request running on this thread (the local orb session otherwise)."""
+        return self._current.get() or self.get(DEFAULT_SESSION)
+
+    def __len__(self):
+        return len(self._states)
+
+
+def session_property(name):
+    """Class attribute that reads/writes `name` on the session bound to the running request."""
+    return property(
+        lambda self: getattr(sessions.current(), name),
+        lambda self, value: setattr(sessions.current(), name, value),
+        doc=f"Per-session `{name}` (see session_scheduler.SessionState)."
+    )
+
+
+class SessionScheduler:
+    """
+    Bounded pool with per-session FIFO ordering and queue-depth backpressure.
+    At most one request per session is running at any time.
+    """
+    def __init__(self, max_workers=4, max_queue_per_session=5, max_backlog=64):
+        self.max_workers = max_workers
+        self.max_queue_per_session = max_queue_per_session
+        self.max_backlog = max_backlog
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="SessionWorker")
+        self._lock = threading.Lock()
+        self._queues = {}       # session_id -> deque of (fn, args, kwargs, future, enqueued_at)
+        self._running = set()   # session ids with a request on a worker
+        self._backlog = 0       # queued + running requests
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+
+    def submit(self, session_id, fn, *args, **kwargs):
+        """Queues `fn(*args, **kwargs)` behind earlier requests of the same session."""
+        future = Future()
+        with self._lock:
+            queued = len(self._queues.get(session_id, ()))
+            if self._backlog >= self.max_backlog:
+                self.rejected += 1
+                raise SchedulerBusy(f"Server busy ({self._backlog} requests in flight)", retry_after=2.0)
+            if queued >= self.max_queue_per_session:
+                self.rejected += 1
+                raise SchedulerBusy(f"Session '{session_id}' already has {queued} requests waiting")
+            self._queues.setdefault(session_id, deque()).append((fn, args, kwargs, future, time.time()))
+            self._backlog += 1
+            self._dispatch(session_id)
+        return future
+
+    def _dispatch(self, session_id):
+        # Caller holds the lock
+        if session_id in self._running:
+            return
+        q = self._queues.get(session_id)
+        if not q:
+            self._queues.pop(session_id, None)
+            return
+        self._running.add(session_id)
+        self._pool.submit(self._run, session_id, *q.popleft())
+
+    def _run(self, session_id, fn, args, kwargs, future, enqueued_at):
+        wait = time.time() - enqueued_at
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    logger.error(f"Session '{session_id}' request failed: {e}")
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                self._running.discard(session_id)
+                self._backlog -= 1
+                self.completed += 1
+                self.total_wait += wait
+                self._dispatch(session_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "running": len(self._running),
+                "backlog": self._backlog,
+                "max_backlog": self.max_backlog,
+                "queued": {sid: len(q) for sid, q in self._queues.items() if q},
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait / self.completed * 1000, 1) if self.completed else 0.0
+            }
+
+
+# Global Instances
+sessions = SessionStore(max_sessions=getattr(config, 'SESSION_MAX_SESSIONS', 500))
+scheduler = SessionScheduler(
+    max_workers=getattr(config, 'SESSION_WORKERS', 4),
+    max_queue_per_session=getattr(config, 'SESSION_MAX_QUEUE', 5),
+    max_backlog=getattr(config, 'SESSION_MAX_BACKLOG', 64)
+)
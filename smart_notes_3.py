@@ -1,93 +1,361 @@
 
 import os
+import re
 import json
 import time
 import random
+import sqlite3
+import threading
 from datetime import datetime
 
-NOTES_V3_FILE = "smart_notes_v3.json"
+NOTES_V3_FILE = "smart_notes_v3.json"  # Legacy single-document store (imported once)
+NOTES_V3_DB = "smart_notes_v3.db"
+
+DEFAULT_FOLDERS = [
+    {"id": "f_default", "name": "General", "color": "#00d4ff"},
+    {"id": "f_code", "name": "Coding", "color": "#b026ff"}
+]
+
+SORT_COLUMNS = {"id": "id", "updatedAt": "updated_at"}
+
+# unicode61 splits on combining marks by default, which shreds Gujarati/Devanagari
+# words (vowel signs are Mn/Mc). Treat marks as part of the token instead.
+FTS_TOKENIZER = "unicode61 remove_diacritics 2 categories 'L* N* Co M*'"
+FTS_WEIGHTS = (10.0, 1.0, 5.0)  # bm25 weights: title, content, tags
+FTS_RANK_WINDOW = 2000  # Broad queries rank title matches, then other matches, each among its newest N
+SEARCH_QUERY_TERM = re.compile(r'(tag:)?(?:"([^"]*)"|(\S+))')
+
+def build_fts_query(query):
+    """
+    Translates user search syntax into a safe FTS5 expression (all terms ANDed):
+      word    -> term        word*   -> prefix
+      "a b"   -> phrase      tag:x   -> term restricted to tags (tag:x* / tag:"a b" work too)
+    Returns None when nothing searchable is left.
+    """
+    terms = []
+    for is_tag, phrase, word in SEARCH_QUERY_TERM.findall(query or ""):
+        text = phrase if phrase else word
+        prefix = not phrase and text.endswith("*")
+        text = text.rstrip("*").strip()
+        if not text:
+            continue
+        term = '"' + text.replace('"', '""') + '"' + (" *" if prefix else "")
+        terms.append(f"tags : {term}" if is_tag else term)
+    return " AND ".join(terms) if terms else None
 
 class SmartNotesEngineV3:
-    def __init__(self):
-        self.data = {
-            "notes": [],
-            "folders": [
-                {"id": "f_default", "name": "General", "color": "#00d4ff"},
-                {"id": "f_code", "name": "Coding", "color": "#b026ff"}
-            ]
-        }
+    """
+    SQLite (WAL) backed notes store. Each note is one row keyed by id, with
+    folder and updatedAt indexes, so an edit touches a single row instead of
+    rewriting every note.
+    """
+    def __init__(self, db_path=NOTES_V3_DB, legacy_json=None):
+        self.db_path = db_path
+        # Only the default store imports the legacy JSON; scratch/test databases start empty
+        self.legacy_json = legacy_json or (NOTES_V3_FILE if db_path == NOTES_V3_DB else None)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._last_id = 0
         self.load()
 
     def load(self):
-        if os.path.exists(NOTES_V3_FILE):
-            try:
-                with open(NOTES_V3_FILE, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
-            except: pass
-        else:
-            self.save()
-
-    def save(self):
+        with self.lock, self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS notes (
+                    id INTEGER PRIMARY KEY,
+                    folder_id TEXT,
+                    updated_at TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_notes_folder ON notes(folder_id, id);
+                CREATE INDEX IF NOT EXISTS idx_notes_updated ON notes(updated_at);
+                CREATE TABLE IF NOT EXISTS folders (
+                    id TEXT PRIMARY KEY,
+                    position INTEGER,
+                    data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+            self.conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5("
+                f"title, content, tags, tokenize=\"{FTS_TOKENIZER}\", prefix='2 3')"
+            )
+            # Persisted ranking function, so `ORDER BY rank` takes FTS5's fast path
+            self.conn.execute(
+                "INSERT INTO notes_fts (notes_fts, rank) VALUES ('rank', ?)",
+                (f"bm25({', '.join(map(str, FTS_WEIGHTS))})",)
+            )
+            migrated = self.conn.execute("SELECT value FROM meta WHERE key='json_migrated'").fetchone()
+            if not migrated:
+                self._migrate_json()
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('json_migrated', ?)", (datetime.now().isoformat(),))
+
+            # Stores created before the search index existed get backfilled once
+            if not self.conn.execute("SELECT value FROM meta WHERE key='fts_built'").fetchone():
+                for (data,) in self.conn.execute("SELECT data FROM notes").fetchall():
+                    self._index_note(json.loads(data))
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('fts_built', ?)", (datetime.now().isoformat(),))
+
+            if not self.conn.execute("SELECT 1 FROM folders LIMIT 1").fetchone():
+                for folder in DEFAULT_FOLDERS:
+                    self._insert_folder(folder)
+
+            self._last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM notes").fetchone()[0]
+
+    def _migrate_json(self):
+        # Caller holds the lock inside a transaction
+        if not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
         try:
-            with open(NOTES_V3_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=4)
+            with open(self.legacy_json, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
         except Exception as e:
-            print(f"Error saving notes v3: {e}")
+            print(f"Error reading legacy notes v3: {e}")
+            return
+
+        for note in legacy.get("notes", []):
+            self._write_note(note)
+        for folder in legacy.get("folders", []):
+            self._insert_folder(folder)
+        print(f"📦 [NOTES V3] Migrated {len(legacy.get('notes', []))} notes from {self.legacy_json}")
+
+    def _write_note(self, note):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO notes (id, folder_id, updated_at, data) VALUES (?, ?, ?, ?)",
+            (int(note["id"]), note.get("folderId"), note.get("updatedAt"), json.dumps(note, ensure_ascii=False))
+        )
+        self._index_note(note)
+
+    def _index_note(self, note):
+        # Incremental: only this note's postings are replaced
+        rowid = int(note["id"])
+        self.conn.execute("DELETE FROM notes_fts WHERE rowid = ?", (rowid,))
+        self.conn.execute(
+            "INSERT INTO notes_fts (rowid, title, content, tags) VALUES (?, ?, ?, ?)",
+            (rowid, note.get("title") or "", note.get("content") or "", " ".join(note.get("tags") or []))
+        )
+
+    def _insert_folder(self, folder):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO folders (id, position, data) VALUES (?, (SELECT COUNT(*) FROM folders), ?)",
+            (folder["id"], json.dumps(folder, ensure_ascii=False))
+        )
+
+    def _read_note(self, note_id):
+        try:
+            row = self.conn.execute("SELECT data FROM notes WHERE id = ?", (int(note_id),)).fetchone()
+        except (TypeError, ValueError):
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _next_id(self):
+        # Millisecond ids, bumped on collision so rapid creates never clash
+        self._last_id = max(int(time.time() * 1000), self._last_id + 1)
+        return self._last_id
 
     def create_note(self, title="New Note", content="", folder_id="f_default", language="english"):
-        note = {
-            "id": int(time.time() * 1000),
-            "title": title,
-            "content": content,
-            "folderId": folder_id,
-            "language": language,
-            "updatedAt": datetime.now().isoformat(),
-            "type": "text"
-        }
-        self.data["notes"].insert(0, note)
-        self.save()
-        
+        with self.lock, self.conn:
+            note = {
+                "id": self._next_id(),
+                "title": title,
+                "content": content,
+                "folderId": folder_id,
+                "language": language,
+                "updatedAt": datetime.now().isoformat(),
+                "type": "text"
+            }
+            self._write_note(note)
+
         # Trigger Background Brain
         if hasattr(self, 'brain'):
             self.brain.analyze_note(note['id'])
-            
+
         return note
 
+    def get_note(self, note_id):
+        with self.lock:
+            return self._read_note(note_id)
+
     def update_note(self, note_id, updates):
-        for n in self.data["notes"]:
-            if str(n["id"]) == str(note_id):
-                n.update(updates)
-                n["updatedAt"] = datetime.now().isoformat()
-                self.save()
-                
-                # Trigger Background Brain (Debounced by brain logic)
-                if hasattr(self, 'brain'):
-                    self.brain.analyze_note(n['id'])
-                    
-                return n
-        return None
+        with self.lock, self.conn:
+            n = self._read_note(note_id)
+            if n is None:
+                return None
+            updates = {k: v for k, v in updates.items() if k != "id"}  # Row key stays stable
+            n.update(updates)
+            n["updatedAt"] = datetime.now().isoformat()
+            self._write_note(n)
+
+        # Trigger Background Brain (Debounced by brain logic)
+        if hasattr(self, 'brain'):
+            self.brain.analyze_note(n['id'])
+
+        return n
+
+    def patch_note(self, note_id, fields):
+        """
+        Merges background-computed fields (tags, folderId) into the latest stored
+        note without bumping updatedAt, so concurrent user edits are never overwritten.
+        """
+        with self.lock, self.conn:
+            n = self._read_note(note_id)
+            if n is None:
+                return None
+            n.update(fields)
+            self._write_note(n)
+            return n
+
+    def get_folder(self, folder_id):
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM folders WHERE id = ?", (folder_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_folders(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT data FROM folders ORDER BY position").fetchall()
+        return [json.loads(r[0]) for r in rows]
 
     def create_folder(self, name, custom_id=None):
         fid = custom_id if custom_id else f"f_{int(time.time())}"
         # Check if exists
-        if any(f['id'] == fid for f in self.data['folders']): return
-        
+        if self.get_folder(fid): return
+
         folder = {
             "id": fid,
             "name": name,
             "color": "#" + "".join([random.choice('0123456789ABCDEF') for j in range(6)])
         }
-        self.data["folders"].append(folder)
-        self.save()
+        with self.lock, self.conn:
+            self._insert_folder(folder)
         return folder
 
     def delete_note(self, note_id):
-        self.data["notes"] = [n for n in self.data["notes"] if str(n["id"]) != str(note_id)]
-        self.save()
-        return True
+        try:
+            note_id = int(note_id)
+        except (TypeError, ValueError):
+            return False
+        with self.lock, self.conn:
+            cur = self.conn.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+            self.conn.execute("DELETE FROM notes_fts WHERE rowid = ?", (note_id,))
+        return cur.rowcount > 0
+
+    def bulk_import(self, notes):
+        """Writes many notes (and their index entries) in one transaction. Returns the count."""
+        with self.lock, self.conn:
+            for note in notes:
+                self._write_note(note)
+                self._last_id = max(self._last_id, int(note["id"]))
+        return len(notes)
+
+    def search(self, query, limit=20, offset=0, folder_id=None):
+        """
+        Ranked full-text search (bm25; title > tags > content) over title, content
+        and tags. Returns {"results", "total", "matches", "truncated"}; each result
+        is the note plus a snippet. Queries matching more than FTS_RANK_WINDOW notes
+        list notes with every term in the title first, then the other matches, each
+        tier ranked among its newest FTS_RANK_WINDOW notes; that keeps very common
+        terms within the latency budget. `total` counts the ranked notes, so paging
+        stays consistent; `matches` counts every hit.
+        """
+        expr = build_fts_query(query)
+        if not expr:
+            return {"results": [], "total": 0, "matches": 0, "truncated": False}
 
-    def get_all(self):
-        return self.data
+        scope, scope_args = "", []
+        if folder_id:
+            scope, scope_args = " AND rowid IN (SELECT id FROM notes WHERE folder_id = ?)", [folder_id]
+
+        try:
+            with self.lock:
+                matches = self._fts_count(expr, scope, scope_args)
+                if matches <= FTS_RANK_WINDOW:
+                    tiers = [(expr, None, matches)]
+                else:
+                    # Broad query: notes with every term in the title rank first, then the other matches;
+                    # each tier is ranked among its newest FTS_RANK_WINDOW notes
+                    title_expr = f"title : ({expr})"
+                    titled = self._fts_count(title_expr, scope, scope_args)
+                    tiers = [self._fts_window(title_expr, titled, scope, scope_args),
+                             self._fts_window(f"({expr}) NOT {title_expr}", matches - titled, scope, scope_args)]
+                total = sum(size for _, _, size in tiers)
+
+                # Rank on the index alone; note bodies and snippets are only built for the page
+                page, skip, want = [], int(offset), int(limit)
+                for match, cutoff, size in tiers:
+                    if want <= 0:
+                        break
+                    if skip >= size:
+                        skip -= size
+                        continue
+                    window = (" AND rowid >= ?", [cutoff]) if cutoff is not None else ("", [])
+                    rows = self.conn.execute(
+                        f"SELECT rowid, rank FROM notes_fts WHERE notes_fts MATCH ?{scope}{window[0]} "
+                        f"ORDER BY rank LIMIT ? OFFSET ?",
+                        [match] + scope_args + window[1] + [min(want, size - skip), skip]
+                    ).fetchall()
+                    page += rows
+                    want -= len(rows)
+                    skip = 0
+                if not page:
+                    return {"results": [], "total": total, "matches": matches, "truncated": total < matches}
+
+                ids = [rowid for rowid, _ in page]
+                marks = ",".join("?" * len(ids))
+                snippets = dict(self.conn.execute(
+                    f"SELECT rowid, snippet(notes_fts, 1, '', '', '…', 16) FROM notes_fts "
+                    f"WHERE notes_fts MATCH ? AND rowid IN ({marks})", [expr] + ids
+                ).fetchall())
+                bodies = dict(self.conn.execute(f"SELECT id, data FROM notes WHERE id IN ({marks})", ids).fetchall())
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ [NOTES V3] Search failed for '{query}': {e}")
+            return {"results": [], "total": 0, "matches": 0, "truncated": False}
+
+        results = []
+        for rowid, rank in page:
+            if rowid not in bodies:
+                continue
+            note = json.loads(bodies[rowid])
+            note["snippet"] = snippets.get(rowid, "")
+            note["score"] = round(-rank, 4)  # bm25 is lower-is-better; expose higher-is-better
+            results.append(note)
+        return {"results": results, "total": total, "matches": matches, "truncated": total < matches}
+
+    def _fts_count(self, match, scope, scope_args):
+        return self.conn.execute(f"SELECT COUNT(*) FROM notes_fts WHERE notes_fts MATCH ?{scope}",
+                                 [match] + scope_args).fetchone()[0]
+
+    def _fts_window(self, match, count, scope, scope_args):
+        """(match, lowest rowid ranked or None, ranked size) for one search tier."""
+        if count <= FTS_RANK_WINDOW:
+            return match, None, count
+        cutoff = self.conn.execute(
+            f"SELECT rowid FROM notes_fts WHERE notes_fts MATCH ?{scope} ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+            [match] + scope_args + [FTS_RANK_WINDOW - 1]
+        ).fetchone()[0]
+        return match, cutoff, FTS_RANK_WINDOW
+
+    def get_all(self, limit=None, offset=0, folder_id=None, sort="id"):
+        """
+        Returns {"notes", "folders", "total"}. Notes are newest first by `sort`
+        ("id" = creation order, "updatedAt" = last edit); `limit` pages through them.
+        """
+        column = SORT_COLUMNS.get(sort, "id")
+        where, args = ("WHERE folder_id = ?", [folder_id]) if folder_id else ("", [])
+        query = f"SELECT data FROM notes {where} ORDER BY {column} DESC"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            args += [int(limit), int(offset)]
+
+        with self.lock:
+            rows = self.conn.execute(query, args).fetchall()
+            total = self.conn.execute(f"SELECT COUNT(*) FROM notes {where}", args[:1] if folder_id else []).fetchone()[0]
+        return {
+            "notes": [json.loads(r[0]) for r in rows],
+            "folders": self.get_folders(),
+            "total": total
+        }
 
 # Link Brain
 from smart_notes_brain import BackgroundBrain
@@ -2,7 +2,9 @@
 import re
 import random
 import time
-from threading import Thread
+import hashlib
+from threading import Thread, Condition, Semaphore
+from concurrent.futures import ThreadPoolExecutor
 
 class AutoSorter:
     """Intelligently moves notes into folders based on keywords."""
@@ -22,9 +24,10 @@ class AutoSorter:
             for category, keywords in self.mapping.items():
                 if any(k in text for k in keywords):
                     target_id = f"f_{category}"
-                    if not any(f['id'] == target_id for f in self.engine.data['folders']):
+                    if not self.engine.get_folder(target_id):
                         self.engine.create_folder(category.capitalize(), target_id)
                     note['folderId'] = target_id
+                    self.engine.patch_note(note['id'], {"folderId": target_id})
                     break
 
         # 2. Neural Tagging Pass (AI-Powered)
@@ -32,57 +35,82 @@ class AutoSorter:
         pass
 
 class AITagger:
-    """Uses LLM to generate context-aware tags for a note."""
+    """Uses LLM to generate context-aware tags for notes (several notes per prompt)."""
+    LANG_INSTRUCTIONS = {
+        'hindi': 'Generate tags in Hindi (हिंदी). Use Devanagari script.',
+        'gujarati': 'Generate tags in Gujarati (ગુજરાતી). Use Gujarati script.',
+        'english': 'Generate tags in English.'
+    }
+
     def __init__(self, notes_engine):
         self.engine = notes_engine
+        self.assistant = None  # Attached by bankoo_main once the brain is online
+        self.llm_calls = 0
+        self.llm_time = 0.0
+
+    @staticmethod
+    def content_hash(note):
+        raw = f"{note.get('title', '')}\x00{note.get('content', '')}\x00{note.get('language', 'english')}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _clean(self, raw_tags):
+        if isinstance(raw_tags, str):
+            raw_tags = raw_tags.replace("#", "").split(",")
+        return [str(t).strip().capitalize() for t in raw_tags if str(t).strip() and len(str(t).strip()) > 2][:5]
 
     def process(self, note):
+        self.process_batch([note])
+
+    def process_batch(self, notes):
+        """Tags every note in one LLM call and persists tags + content hash per note."""
+        if not notes: return
         try:
-            from assistant import assistant
             import config
-            
-            content = f"Title: {note.get('title')}\nContent: {note.get('content')}"
-            language = note.get('language', 'english')
-            
-            # Language-specific instructions
-            lang_instructions = {
-                'hindi': 'Generate tags in Hindi (हिंदी). Use Devanagari script.',
-                'gujarati': 'Generate tags in Gujarati (ગુજરાતી). Use Gujarati script.',
-                'english': 'Generate tags in English.'
-            }
-            
-            lang_instruction = lang_instructions.get(language, lang_instructions['english'])
-            
+            if not self.assistant or not self.assistant.client:
+                raise RuntimeError("AI brain offline")
+
+            blocks = []
+            for i, note in enumerate(notes, 1):
+                lang_instruction = self.LANG_INSTRUCTIONS.get(note.get('language', 'english'), self.LANG_INSTRUCTIONS['english'])
+                blocks.append(f"### NOTE {i}\nLANGUAGE: {lang_instruction}\nTitle: {note.get('title')}\nContent: {note.get('content')}")
+
             prompt = f"""PERFORM DEEP SEMANTIC ANALYSIS.
-            Provide 3-5 unique, conceptual tags for this note. 
-            
-            LANGUAGE: {lang_instruction}
+            Provide 3-5 unique, conceptual tags for EACH note below, in that note's LANGUAGE.
             
             STRICT RULES:
             - AVOID generic tags like 'Code', 'Programming', 'Python' unless the note is 100% just a code snippet.
             - FOCUS on the SUBJECT MATTER (e.g. DatabaseArchitecture, NeuralNetwork, Logic, Strategy, History).
             - THINK: What is the high-level intent?
             
-            Format: comma-separated list. No hashtags.
-            Note:
-            {content}
-            """
+            Format: one line per note, exactly `N: tag1, tag2, tag3` where N is the note number. No hashtags.
             
-            res = assistant.client.chat.completions.create(
-                model=config.PRIMARY_MODEL,
+            {chr(10).join(blocks)}
+            """
+
+            client, model = self.assistant._get_brain_client(config.PRIMARY_MODEL)
+            start = time.time()
+            res = client.chat.completions.create(
+                model=model,
                 messages=[
                     {"role": "system", "content": "You are Bankoo's Neural Intelligence Engine. You analyze subject significance, not just keywords."},
                     {"role": "user", "content": prompt}
                 ]
             )
-            
-            raw_tags = res.choices[0].message.content.strip().replace("#", "").split(",")
-            clean_tags = [t.strip().capitalize() for t in raw_tags if t.strip() and len(t) > 2][:5]
-            
-            if clean_tags:
-                note["tags"] = clean_tags
-                self.engine.save()
-                print(f"🧠 [DEEP THINKING] Neural Tags Applied: {clean_tags}")
+            self.llm_calls += 1
+            self.llm_time += time.time() - start
+
+            answer = res.choices[0].message.content.strip()
+            by_index = {int(m.group(1)): m.group(2) for m in re.finditer(r'^\W*(\d+)\s*[:.)-]\s*(.+)$', answer, re.MULTILINE)}
+            if len(notes) == 1 and not by_index:
+                by_index = {1: answer}  # Single note: model may answer with a bare list
+
+            for i, note in enumerate(notes, 1):
+                clean_tags = self._clean(by_index.get(i, ""))
+                if clean_tags:
+                    note["tags"] = clean_tags
+                    note["tagHash"] = self.content_hash(note)
+                    self.engine.patch_note(note['id'], {"tags": clean_tags, "tagHash": note["tagHash"]})
+                    print(f"🧠 [DEEP THINKING] Neural Tags Applied: {clean_tags}")
         except Exception as e:
             print(f"⚠️ [AITAGGER] Deep analysis failed: {e}")
 
@@ -114,7 +142,7 @@ class ActionExtractor:
 
         if changed:
             print(f"⚡ [BRAIN] Tagged '{note['title']}' with: {note['tags']}")
-            self.engine.save()
+            self.engine.patch_note(note['id'], {"tags": note["tags"]})
 
 class NeuralLinker:
     """Connects related notes."""
@@ -123,27 +151,118 @@ class NeuralLinker:
         pass
 
 class BackgroundBrain:
-    def __init__(self, notes_engine):
+    """
+    Coalescing analysis scheduler.
+    Saves only (re)arm a per-note debounce timer; once a note has been quiet for
+    `debounce` seconds it joins the next batch. Batches run on a bounded worker
+    pool, and notes whose content hash matches their last tagging skip the LLM.
+    Notes falling due within `batch_window` of each other share one prompt.
+    """
+    def __init__(self, notes_engine, debounce=2.0, batch_size=5, max_workers=2, max_pending=500, batch_window=1.0):
         self.sorter = AutoSorter(notes_engine)
         self.extractor = ActionExtractor(notes_engine)
         self.tagger = AITagger(notes_engine)
         self.linker = NeuralLinker()
-        self.running = False
-        
+        self.debounce = debounce
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+
+        self.pending = {}  # note_id -> (due_time, first_submitted)
+        self.cond = Condition()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="NotesBrain")
+        self.slots = Semaphore(max_workers)  # Batches wait here rather than piling up in the pool
+        self.in_flight = 0
+        self.metrics = {"submitted": 0, "coalesced": 0, "dropped": 0, "analyzed": 0,
+                        "skipped_unchanged": 0, "batches": 0, "total_latency": 0.0, "last_latency": 0.0}
+        self.running = True
+        Thread(target=self._dispatch, name="NotesBrainDispatcher", daemon=True).start()
+
     def analyze_note(self, note_id):
-        """Spawns a thread to analyze the note without blocking UI."""
-        def _run():
-            time.sleep(1) # Wait for typing to settle
-            try:
+        """Schedules analysis without blocking the UI. Repeated saves of one note coalesce."""
+        key = str(note_id)
+        now = time.time()
+        with self.cond:
+            self.metrics["submitted"] += 1
+            if key in self.pending:
+                self.metrics["coalesced"] += 1
+                first = self.pending[key][1]
+            else:
+                if len(self.pending) >= self.max_pending:
+                    self.metrics["dropped"] += 1
+                    print(f"⚠️ [BRAIN] Analysis queue full ({self.max_pending}); skipping note {key}")
+                    return
+                first = now
+            self.pending[key] = (now + self.debounce, first)  # Wait for typing to settle
+            self.cond.notify()
+
+    def _dispatch(self):
+        while self.running:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                now = time.time()
+                next_due = min(due for due, _ in self.pending.values())
+                if next_due > now:
+                    self.cond.wait(timeout=next_due - now)
+                    continue
+                # Pull slightly-later notes forward so they share this prompt
+                horizon = now + self.batch_window
+                ready = sorted((item for item in self.pending.items() if item[1][0] <= horizon), key=lambda item: item[1][0])
+                batch = ready[:self.batch_size]
+                for key, _ in batch:
+                    del self.pending[key]
+
+            self.slots.acquire()
+            with self.cond:
+                self.in_flight += len(batch)
+            self.pool.submit(self._run_batch, [(key, first) for key, (_, first) in batch])
+
+    def _run_batch(self, batch):
+        try:
+            to_tag = []
+            for note_id, _ in batch:
                 # Re-fetch note to get latest content
-                note = next((n for n in self.sorter.engine.data["notes"] if str(n["id"]) == str(note_id)), None)
-                if note:
-                    self.sorter.process(note)
-                    self.extractor.process(note)
-                    self.tagger.process(note)
-            except Exception as e:
-                print(f"❌ [BRAIN ERROR] Analysis failed: {e}")
-
-        Thread(target=_run, daemon=True).start()
+                note = self.sorter.engine.get_note(note_id)
+                if not note:
+                    continue
+                self.sorter.process(note)
+                self.extractor.process(note)
+                if note.get("tagHash") == self.tagger.content_hash(note):
+                    with self.cond:
+                        self.metrics["skipped_unchanged"] += 1
+                    continue
+                to_tag.append(note)
+
+            if to_tag:
+                self.tagger.process_batch(to_tag)
+        except Exception as e:
+            print(f"❌ [BRAIN ERROR] Analysis failed: {e}")
+        finally:
+            done = time.time()
+            with self.cond:
+                self.in_flight -= len(batch)
+                self.metrics["batches"] += 1
+                self.metrics["analyzed"] += len(batch)
+                for _, first in batch:
+                    self.metrics["total_latency"] += done - first
+                    self.metrics["last_latency"] = done - first
+            self.slots.release()
+
+    def stats(self):
+        """Queue depth and latency (first save -> analysis done) for the tagging pipeline."""
+        with self.cond:
+            m = dict(self.metrics)
+            total_latency = m.pop("total_latency")
+            last_latency = m.pop("last_latency")
+            return {
+                **m,
+                "queue_depth": len(self.pending),
+                "in_flight": self.in_flight,
+                "avg_latency_sec": round(total_latency / m["analyzed"], 2) if m["analyzed"] else 0.0,
+                "last_latency_sec": round(last_latency, 2),
+                "llm_calls": self.tagger.llm_calls,
+                "avg_llm_sec": round(self.tagger.llm_time / self.tagger.llm_calls, 2) if self.tagger.llm_calls else 0.0
+            }
 
 # We will instantiate this in smart_notes_3.py
@@ -0,0 +1,247 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH TELEMETRY (SPANS + LATENCY HISTOGRAMS)
+================================================================================
+Span-style timers for the hot paths (ask_ai stages, intents, TTS, mobile audio,
+HTTP routes). Every span feeds an in-memory log-bucketed histogram
+(HDR-style: constant ~4.4% relative error from 10 µs to hours, O(1) record,
+fixed memory per span name). A sampled share of requests also keeps its span
+tree so it can be written into the JSONL traces.
+
+    from telemetry import tracer
+
+    @tracer.traced("tts.speak")
+    def speak(...): ...
+
+    with tracer.trace("ask_ai"):
+        with tracer.span("ask_ai.recall"):
+            ...
+        spans = tracer.sampled_spans()   # list for the trace file, or None
+
+`tracer.prometheus()` renders everything in Prometheus text format (/api/metrics).
+================================================================================
+"""
+
+import math
+import time
+import random
+import logging
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+
+import config
+
+logger = logging.getLogger("Telemetry")
+
+# Prometheus `le` bounds (ms) exported from the fine-grained buckets
+EXPORT_BOUNDS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+
+class Histogram:
+    """Log-bucketed latency histogram: bucket i covers (BASE * R^(i-1), BASE * R^i] ms."""
+    BASE_MS = 0.01
+    STEPS_PER_DOUBLING = 16  # R = 2^(1/16)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.buckets = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = 0.0
+
+    @classmethod
+    def bucket_index(cls, ms):
+        if ms <= cls.BASE_MS:
+            return 0
+        return math.ceil(math.log2(ms / cls.BASE_MS) * cls.STEPS_PER_DOUBLING)
+
+    @classmethod
+    def bucket_upper(cls, index):
+        return cls.BASE_MS * 2 ** (index / cls.STEPS_PER_DOUBLING)
+
+    def record(self, ms):
+        idx = self.bucket_index(ms)
+        with self._lock:
+            self.buckets[idx] = self.buckets.get(idx, 0) + 1
+            self.count += 1
+            self.sum += ms
+            self.min = ms if self.min is None else min(self.min, ms)
+            self.max = max(self.max, ms)
+
+    def percentile(self, pct):
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, math.ceil(pct / 100.0 * self.count))
+            seen = 0
+            for idx in sorted(self.buckets):
+                seen += self.buckets[idx]
+                if seen >= rank:
+                    return min(self.bucket_upper(idx), self.max)
+            return self.max
+
+    def cumulative(self, bounds):
+        """Counts of observations <= each bound (bucket upper edges, so slightly conservative)."""
+        with self._lock:
+            items = sorted(self.buckets.items())
+        out, seen, i = [], 0, 0
+        for bound in bounds:
+            while i < len(items) and self.bucket_upper(items[i][0]) <= bound * 1.0000001:
+                seen += items[i][1]
+                i += 1
+            out.append(seen)
+        return out
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum / self.count, 2) if self.count else 0.0,
+            "min_ms": round(self.min or 0.0, 2),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(self.max, 2),
+        }
+
+
+class _Trace:
+    __slots__ = ("name", "sampled", "started", "spans")
+
+    def __init__(self, name, sampled):
+        self.name = name
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.spans = []
+
+
+class Tracer:
+    """Span timers aggregated per span name; a sampled share of traces keep their spans."""
+    def __init__(self, sample_rate=0.1, max_spans_per_trace=200):
+        self.sample_rate = sample_rate
+        self.max_spans_per_trace = max_spans_per_trace
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._errors = {}
+        self._current = contextvars.ContextVar("bankoo_trace", default=None)
+
+    def histogram(self, name):
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(name, Histogram())
+        return hist
+
+    def record(self, name, ms, error=None, **attrs):
+        """Adds one measurement (also to the sampled span list of the running trace)."""
+        self.histogram(name).record(ms)
+        if error:
+            with self._lock:
+                self._errors[name] = self._errors.get(name, 0) + 1
+        trace = self._current.get()
+        if trace is not None and trace.sampled and len(trace.spans) < self.max_spans_per_trace:
+            span = {"name": name, "ms": round(ms, 2), **attrs}
+            if error:
+                span["error"] = error
+            trace.spans.append(span)
+
+    def record_since(self, name, since, **attrs):
+        """Records the time since `since` (a perf_counter value); returns it in ms."""
+        ms = (time.perf_counter() - since) * 1000
+        self.record(name, ms, **attrs)
+        return round(ms, 2)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, error=error, **attrs)
+
+    @contextmanager
+    def trace(self, name, **attrs):
+        """Root span of a request. Nested calls (e.g. ask_ai from mobile audio) become plain spans."""
+        if self._current.get() is not None:
+            with self.span(name, **attrs):
+                yield
+            return
+        token = self._current.set(_Trace(name, random.random() < self.sample_rate))
+        try:
+            with self.span(name, **attrs):
+                yield
+        finally:
+            self._current.reset(token)
+
+    def traced(self, name):
+        """Decorator form of `trace`."""
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                with self.trace(name):
+                    return fn(*args, **kwargs)
+            return inner
+        return wrap
+
+    def sampled_spans(self):
+        """Finished spans of the running trace if it was sampled, else None."""
+        trace = self._current.get()
+        if trace is None or not trace.sampled:
+            return None
+        return list(trace.spans)
+
+    # --- EXPORT ---
+
+    def snapshot(self):
+        with self._lock:
+            names = sorted(self._histograms)
+            errors = dict(self._errors)
+        return {name: {**self._histograms[name].summary(), "errors": errors.get(name, 0)} for name in names}
+
+    def prometheus(self):
+        with self._lock:
+            hists = sorted(self._histograms.items())
+            errors = dict(self._errors)
+
+        lines = [
+            "# HELP bankoo_span_duration_milliseconds Duration of instrumented stages and routes.",
+            "# TYPE bankoo_span_duration_milliseconds histogram",
+        ]
+        for name, hist in hists:
+            label = _label(name)
+            for bound, n in zip(EXPORT_BOUNDS_MS, hist.cumulative(EXPORT_BOUNDS_MS)):
+                lines.append(f'bankoo_span_duration_milliseconds_bucket{{span="{label}",le="{bound}"}} {n}')
+            lines.append(f'bankoo_span_duration_milliseconds_bucket{{span="{label}",le="+Inf"}} {hist.count}')
+            lines.append(f'bankoo_span_duration_milliseconds_sum{{span="{label}"}} {round(hist.sum, 3)}')
+            lines.append(f'bankoo_span_duration_milliseconds_count{{span="{label}"}} {hist.count}')
+
+        lines += [
+            "# HELP bankoo_span_quantile_milliseconds Latency quantiles from the in-process histograms.",
+            "# TYPE bankoo_span_quantile_milliseconds gauge",
+        ]
+        for name, hist in hists:
+            for q in (50, 95, 99):
+                lines.append(f'bankoo_span_quantile_milliseconds{{span="{_label(name)}",quantile="0.{q}"}} '
+                             f'{round(hist.percentile(q), 3)}')
+
+        lines += [
+            "# HELP bankoo_span_errors_total Spans that ended with an exception.",
+            "# TYPE bankoo_span_errors_total counter",
+        ]
+        for name, n in sorted(errors.items()):
+            lines.append(f'bankoo_span_errors_total{{span="{_label(name)}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+# Global Instance
+tracer = Tracer(sample_rate=getattr(config, 'TRACE_SPAN_SAMPLE_RATE', 0.1))
@@ -0,0 +1,243 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH TRACE ANALYTICS (INCREMENTAL SQLITE INDEX)
+================================================================================
+Precomputed aggregates over the Agent-Lightning traces, so the Brain
+Dashboard and /api/zenith/mistakes answer in milliseconds no matter how much
+trace history exists.
+
+  * `sync()` tails every segment from its last indexed byte offset (complete
+    lines only). A segment that was rotated and compressed resumes at the
+    same offset inside the decompressed stream, so nothing is read twice.
+  * Aggregates per (model, language): count, successes, TTFT sum and a
+    log-bucketed TTFT histogram for percentiles (telemetry.Histogram buckets).
+  * Mistakes (reward < 0) are stored with their input hash; the first later
+    success with the same input fills in the fix (indexed lookup, no scan).
+  * Rows survive trace retention: deleting old segments never loses stats.
+================================================================================
+"""
+
+import os
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+from agent_logger import DEFAULT_LOG_DIR, list_segments, ZSTD_AVAILABLE
+from telemetry import Histogram
+
+if ZSTD_AVAILABLE:
+    import zstandard
+
+logger = logging.getLogger("TraceAnalytics")
+
+RECENT_KEEP = 200  # Rows kept for the dashboard's trend charts
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (name TEXT PRIMARY KEY, offset INTEGER NOT NULL, done INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS stats (
+    model TEXT NOT NULL, language TEXT NOT NULL, n INTEGER NOT NULL, successes INTEGER NOT NULL,
+    failures INTEGER NOT NULL, ttft_sum REAL NOT NULL, PRIMARY KEY (model, language));
+CREATE TABLE IF NOT EXISTS ttft_buckets (
+    model TEXT NOT NULL, language TEXT NOT NULL, bucket INTEGER NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (model, language, bucket));
+CREATE TABLE IF NOT EXISTS mistakes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT NOT NULL, input_hash TEXT NOT NULL,
+    user_input TEXT, response TEXT, fix_ts TEXT, fix_response TEXT);
+CREATE INDEX IF NOT EXISTS idx_mistakes_open ON mistakes (input_hash, fix_ts);
+CREATE INDEX IF NOT EXISTS idx_mistakes_ts ON mistakes (ts);
+CREATE TABLE IF NOT EXISTS recent (id INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT, reward REAL, ttft REAL);
+"""
+
+
+def _base_name(path):
+    """Segment identity that survives compression (trace_X.jsonl.gz -> trace_X.jsonl)."""
+    name = os.path.basename(path)
+    for ext in (".gz", ".zst"):
+        if name.endswith(ext):
+            return name[:-len(ext)]
+    return name
+
+
+def _open_binary(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def _input_hash(text):
+    return hashlib.sha1((text or "").strip().encode("utf-8")).hexdigest()
+
+
+class TraceIndex:
+    """SQLite-backed, incrementally maintained analytics over a trace directory."""
+    def __init__(self, trace_dir=None, db_path=None, min_sync_interval=2.0):
+        self.trace_dir = trace_dir or DEFAULT_LOG_DIR
+        os.makedirs(self.trace_dir, exist_ok=True)
+        self.db_path = db_path or os.path.join(self.trace_dir, "analytics.db")
+        self.min_sync_interval = min_sync_interval
+        self._lock = threading.Lock()
+        self._last_sync = 0.0
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    # --- INGESTION ---
+
+    def sync(self, force=False):
+        """Indexes lines appended since the last sync. Cheap when nothing changed."""
+        if not force and time.time() - self._last_sync < self.min_sync_interval:
+            return 0
+        with self._lock:
+            ingested = 0
+            offsets = {name: (offset, done) for name, offset, done in
+                       self._conn.execute("SELECT name, offset, done FROM segments")}
+            for path in list_segments(self.trace_dir):
+                name = _base_name(path)
+                offset, done = offsets.get(name, (0, 0))
+                if done:
+                    continue
+                compressed = name != os.path.basename(path)
+                if not compressed and os.path.getsize(path) <= offset:
+                    continue
+                try:
+                    ingested += self._ingest_segment(path, name, offset, compressed)
+                except (OSError, EOFError) as e:
+                    logger.warning(f"Trace index skipped {path}: {e}")
+            self._last_sync = time.time()
+            if ingested:
+                logger.info(f"📈 Trace index: +{ingested} interactions")
+            return ingested
+
+    def _ingest_segment(self, path, name, offset, compressed):
+        count = 0
+        with _open_binary(path) as f:
+            if compressed:
+                remaining = offset
+                while remaining > 0:  # Compressed streams only skip forward by reading
+                    chunk = f.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+            else:
+                f.seek(offset)
+            data = f.read()
+
+        end = len(data) if compressed else data.rfind(b"\n") + 1  # Leave a partial last line for next time
+        cur = self._conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            for line in data[:end].splitlines():
+                try:
+                    trace = json.loads(line)
+                except ValueError:
+                    continue
+                if "prompt_section" in trace:  # Interned system-prompt section, not an interaction
+                    continue
+                self._ingest(cur, trace)
+                count += 1
+            cur.execute("INSERT INTO segments (name, offset, done) VALUES (?, ?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET offset = excluded.offset, done = excluded.done",
+                        (name, offset + end, 1 if compressed else 0))
+            if count:
+                cur.execute("DELETE FROM recent WHERE id <= (SELECT MAX(id) FROM recent) - ?", (RECENT_KEEP,))
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        return count
+
+    def _ingest(self, cur, trace):
+        ts = trace.get("timestamp", "")
+        reward = trace.get("reward", 0) or 0
+        metrics = trace.get("metrics", {})
+        messages = trace.get("messages", [])
+        model = metrics.get("model") or "unknown"
+        language = metrics.get("language") or "unknown"
+        ttft = metrics.get("ttft_sec", metrics.get("latency_sec", 0)) or 0
+        user_input = messages[1].get("content") if len(messages) > 1 else None
+        response = messages[2].get("content") if len(messages) > 2 else None
+
+        cur.execute("INSERT INTO stats VALUES (?, ?, 1, ?, ?, ?) ON CONFLICT(model, language) DO UPDATE SET "
+                    "n = n + 1, successes = successes + excluded.successes, failures = failures + excluded.failures, "
+                    "ttft_sum = ttft_sum + excluded.ttft_sum",
+                    (model, language, int(reward > 0), int(reward < 0), ttft))
+        cur.execute("INSERT INTO ttft_buckets VALUES (?, ?, ?, 1) ON CONFLICT(model, language, bucket) "
+                    "DO UPDATE SET n = n + 1", (model, language, Histogram.bucket_index(ttft * 1000)))
+        cur.execute("INSERT INTO recent (ts, reward, ttft) VALUES (?, ?, ?)", (ts, reward, ttft))
+
+        if reward < 0:
+            cur.execute("INSERT INTO mistakes (ts, input_hash, user_input, response) VALUES (?, ?, ?, ?)",
+                        (ts, _input_hash(user_input), user_input, response))
+        elif reward > 0:
+            cur.execute("UPDATE mistakes SET fix_ts = ?, fix_response = ? "
+                        "WHERE input_hash = ? AND fix_ts IS NULL AND ts < ?",
+                        (ts, response, _input_hash(user_input), ts))
+
+    # --- QUERIES ---
+
+    def _query(self, sql, args=()):
+        self.sync()
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def summary(self):
+        n, successes, ttft_sum = self._query(
+            "SELECT COALESCE(SUM(n), 0), COALESCE(SUM(successes), 0), COALESCE(SUM(ttft_sum), 0) FROM stats")[0]
+        return {
+            "total": n,
+            "successes": successes,
+            "success_rate": round(successes / n, 4) if n else 0.0,
+            "avg_ttft_sec": round(ttft_sum / n, 3) if n else 0.0,
+        }
+
+    def latency_percentiles(self, percentiles=(50, 95, 99)):
+        """TTFT percentiles (seconds) and success rate per (model, language)."""
+        buckets = {}
+        for model, language, bucket, n in self._query(
+                "SELECT model, language, bucket, n FROM ttft_buckets ORDER BY model, language, bucket"):
+            buckets.setdefault((model, language), []).append((bucket, n))
+
+        rows = []
+        for model, language, n, successes, ttft_sum in self._query(
+                "SELECT model, language, n, successes, ttft_sum FROM stats ORDER BY n DESC"):
+            row = {"model": model, "language": language, "count": n,
+                   "success_rate": round(successes / n, 4) if n else 0.0,
+                   "avg_ttft_sec": round(ttft_sum / n, 3) if n else 0.0}
+            hist = buckets.get((model, language), [])
+            total = sum(c for _, c in hist)
+            for p in percentiles:
+                rank, seen, value = max(1, -(-p * total // 100)), 0, 0.0
+                for bucket, c in hist:
+                    seen += c
+                    if seen >= rank:
+                        value = Histogram.bucket_upper(bucket) / 1000
+                        break
+                row[f"p{p}_ttft_sec"] = round(value, 3)
+            rows.append(row)
+        return rows
+
+    def recent(self, limit=20):
+        """Oldest-first (timestamp, reward, ttft) of the latest interactions."""
+        rows = self._query("SELECT ts, reward, ttft FROM recent ORDER BY id DESC LIMIT ?", (limit,))
+        return rows[::-1]
+
+    def mistakes(self, limit=5):
+        """Latest mistakes, newest first, each with the fix learned afterwards (if any)."""
+        return [
+            {"id": ts, "input": user_input or "Unknown", "mistake": response or "Empty",
+             "fix": fix_response, "fix_ts": fix_ts, "status": "Fixed" if fix_ts else "Pending"}
+            for ts, user_input, response, fix_ts, fix_response in self._query(
+                "SELECT ts, user_input, response, fix_ts, fix_response FROM mistakes ORDER BY ts DESC, id DESC LIMIT ?",
+                (limit,))
+        ]
+
+
+# Global Instance
+trace_index = TraceIndex()
@@ -0,0 +1,150 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH VOICE CACHE (CONTENT-ADDRESSED TTS AUDIO)
+================================================================================
+On-disk, size-bounded LRU cache for synthesized speech. Each clip is stored
+under the SHA-256 of (normalized text, voice, rate), so fixed phrases such as
+confirmations, busy/error notices and status lines are rendered by Edge-TTS
+once and afterwards served straight from disk.
+================================================================================
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger("TTSCache")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "tts")
+
+
+def normalize_text(text):
+    """Canonical form used for keys: NFC unicode, single spaces, trimmed."""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class TTSCache:
+    """
+    LRU audio cache persisted as `<sha256>.mp3` files.
+    Recency survives restarts through file mtimes (touched on every hit);
+    the oldest clips are evicted once the directory exceeds `max_bytes`.
+    """
+    def __init__(self, cache_dir=None, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> size, least recently used first
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".mp3"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, name[:-4], st.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+        self._evict()
+        logger.info(f"🗄️ Voice cache ready: {len(self._index)} clips, {self._bytes / 1024 / 1024:.1f} MB")
+
+    def key(self, text, voice, rate):
+        raw = f"{voice}\x00{rate}\x00{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def get(self, text, voice, rate):
+        """Returns the cached audio bytes or None (counted as a miss)."""
+        key = self.key(text, voice, rate)
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path, None)  # Persist recency for the next start-up
+        except OSError:
+            # File removed behind our back: forget it and fall through to synthesis
+            with self._lock:
+                self._bytes -= self._index.pop(key, 0)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return audio
+
+    def contains(self, text, voice, rate):
+        with self._lock:
+            return self.key(text, voice, rate) in self._index
+
+    def put(self, text, voice, rate, audio):
+        """Stores a clip atomically and evicts least recently used clips if over budget."""
+        if not audio:
+            return
+        key = self.key(text, voice, rate)
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.error(f"Voice cache write failed: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._bytes -= self._index.pop(key, 0)
+            self._index[key] = len(audio)
+            self._bytes += len(audio)
+            self._evict()
+
+    def _evict(self):
+        # Caller holds the lock (or is the constructor)
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "clips": len(self._index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -10,9 +10,13 @@ class VisionAgent:
         self.model = genai.GenerativeModel('models/gemini-2.0-flash')
         self.system_prompt = "Find UI elements. Return JSON {x, y, description}."
 
-    def analyze_screen(self, image_path, goal):
-        img = Image.open(image_path)
-        prompt = f"{self.system_prompt}\n\nGoal: {goal}"
+    def analyze_screen(self, image_path=None, goal="", system_prompt=None, image_bytes=None, mime_type="image/jpeg"):
+        """Pass encoded frame bytes (no re-encode by the SDK) or, for old callers, an image path."""
+        if image_bytes is not None:
+            img = {"mime_type": mime_type, "data": image_bytes}
+        else:
+            img = Image.open(image_path)
+        prompt = f"{system_prompt or self.system_prompt}\n\nGoal: {goal}"
         response = self.model.generate_content(
             [prompt, img],
             generation_config=genai.GenerationConfig(response_mime_type="application/json")
@@ -0,0 +1,430 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH VISION BACKEND POOL (WARM LOCAL MODELS)
+================================================================================
+One service in front of every local vision engine (template landmarks,
+EasyOCR, Florence-2, Moondream, Ollama) with a common interface:
+
+    from vision_backends import vision_pool
+    hit = vision_pool.find_element(frame, "Save button")   # {"x", "y", "backend"} or {"error"}
+    text = vision_pool.describe(frame, "What app is open?")["text"]
+
+  * Models load on first use (or `warm()`), stay resident while in use and
+    are evicted after VISION_IDLE_EVICT_SEC idle; at most VISION_MAX_RESIDENT
+    heavy models are held at once (least recently used goes first).
+  * Images are passed as in-memory PIL images; no temp files.
+  * Each backend has one worker thread. Requests that arrive together for the
+    same frame are batched into one call (one Florence generate, one Moondream
+    image encoding, one OCR pass for many targets).
+================================================================================
+"""
+
+import time
+import queue
+import logging
+import difflib
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+from PIL import Image
+
+import config
+
+logger = logging.getLogger("VisionPool")
+
+
+def as_image(image):
+    """PIL image passthrough; paths (legacy callers) are loaded once here."""
+    if isinstance(image, Image.Image):
+        return image
+    with Image.open(image) as f:
+        f.load()
+        return f.copy()
+
+
+class VisionBackend:
+    """Common interface. Coordinates are 0-1000 normalized, like the rest of the vision stack."""
+    name = "base"
+    heavy = True  # Counts against the pool's resident-model limit
+
+    def load(self):
+        pass
+
+    def unload(self):
+        pass
+
+    def find_elements(self, image, targets):
+        return [{"error": f"{self.name} cannot locate elements"} for _ in targets]
+
+    def describe(self, image, prompt=None):
+        return {"error": f"{self.name} cannot describe images"}
+
+
+class LandmarkBackend(VisionBackend):
+    """Template matching against vision_templates/ (target "Chrome icon" -> template chrome_icon.png)."""
+    name = "landmark"
+    heavy = False
+
+    def load(self):
+        from vision_landmark import landmarks
+        self.landmarks = landmarks
+
+    def find_elements(self, image, targets):
+        names = {t: t.lower().replace(" ", "_") for t in targets}
+        hits = self.landmarks.locate(list(set(names.values())), frame=image)
+        return [hits.get(names[t]) or {"error": f"No template match for '{t}'"} for t in targets]
+
+
+class OCRBackend(VisionBackend):
+    """EasyOCR text finder: one OCR pass per frame serves every target in the batch."""
+    name = "ocr"
+
+    def __init__(self, languages=("en",), min_ratio=0.8):
+        self.languages = list(languages)
+        self.min_ratio = min_ratio
+        self.reader = None
+
+    def load(self):
+        import easyocr
+        self.reader = easyocr.Reader(self.languages, gpu=getattr(config, 'VISION_OCR_GPU', False))
+
+    def unload(self):
+        self.reader = None
+
+    def _read(self, image):
+        return self.reader.readtext(np.asarray(image.convert("RGB")))
+
+    def find_elements(self, image, targets):
+        results = self._read(image)
+        w, h = image.size
+        out = []
+        for target in targets:
+            want = target.lower()
+            best, best_score = None, 0.0
+            for box, text, conf in results:
+                text = text.lower()
+                score = 1.0 if want in text or (text and text in want) else difflib.SequenceMatcher(None, want, text).ratio()
+                if score > best_score:
+                    best, best_score = (box, conf), score
+            if best is None or best_score < self.min_ratio:
+                out.append({"error": f"Text '{target}' not found"})
+                continue
+            box, conf = best
+            cx = sum(p[0] for p in box) / 4
+            cy = sum(p[1] for p in box) / 4
+            out.append({"x": int(cx / w * 1000), "y": int(cy / h * 1000), "confidence": round(float(conf), 4)})
+        return out
+
+    def describe(self, image, prompt=None):
+        return {"text": " ".join(text for _, text, _ in self._read(image))}
+
+
+class FlorenceBackend(VisionBackend):
+    name = "florence"
+
+    def __init__(self):
+        self.engine = None
+
+    def load(self):
+        from vision_florence import FlorenceVision
+        self.engine = FlorenceVision()
+        if self.engine.model is None:
+            raise RuntimeError("Florence-2 failed to load")
+
+    def unload(self):
+        if self.engine:
+            self.engine.close()
+        self.engine = None
+
+    def find_elements(self, image, targets):
+        return self.engine.find_elements(image, targets)
+
+    def describe(self, image, prompt=None):
+        return self.engine.describe(image, prompt)
+
+
+class MoondreamBackend(VisionBackend):
+    name = "moondream"
+
+    def __init__(self):
+        self.engine = None
+
+    def load(self):
+        from vision_moondream import MoondreamVision
+        self.engine = MoondreamVision()
+        if self.engine.model is None:
+            raise RuntimeError("Moondream failed to load")
+
+    def unload(self):
+        if self.engine:
+            self.engine.close()
+        self.engine = None
+
+    def find_elements(self, image, targets):
+        return self.engine.find_elements(image, targets)
+
+    def describe(self, image, prompt=None):
+        return self.engine.describe(image, prompt)
+
+
+class OllamaBackend(VisionBackend):
+    """Ollama-served vision model; residency is delegated to Ollama via keep_alive."""
+    name = "ollama"
+
+    def __init__(self, model=None, keep_alive_sec=600):
+        self.model = model or getattr(config, 'VISION_OLLAMA_MODEL', "moondream")
+        self.keep_alive = f"{int(keep_alive_sec)}s"
+        self.engine = None
+
+    def load(self):
+        from local_vision import LocalVision
+        self.engine = LocalVision(ollama_url=getattr(config, 'OLLAMA_BASE_URL', "http://localhost:11434"), model=self.model)
+
+    def unload(self):
+        if self.engine:
+            self.engine.unload()
+
+    def describe(self, image, prompt=None):
+        return self.engine.describe(image, prompt or "What is on my screen? describe concisely.", keep_alive=self.keep_alive)
+
+
+class _Slot:
+    """One backend + its worker thread and residency bookkeeping."""
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()   # Held while loading, running or unloading
+        self.queue = queue.Queue()
+        self.worker = None
+        self.loaded = False
+        self.last_used = 0.0
+        self.stats = {"loads": 0, "load_sec": 0.0, "evictions": 0, "requests": 0, "batches": 0,
+                      "errors": 0, "busy_sec": 0.0}
+
+
+class VisionPool:
+    """Warm, batched access to the local vision backends."""
+    def __init__(self, order=("landmark", "ocr", "florence"), describe_backend="ollama", idle_evict_sec=600,
+                 max_resident=2, batch_window_ms=15, max_batch=16):
+        self.order = list(order)
+        self.describe_backend = describe_backend
+        self.idle_evict_sec = idle_evict_sec
+        self.max_resident = max_resident
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+        self._factories = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def register(self, name, factory):
+        """`factory()` builds an unloaded VisionBackend; nothing is imported until first use."""
+        self._factories[name] = factory
+
+    @property
+    def backends(self):
+        return list(self._factories)
+
+    def _slot(self, name):
+        slot = self._slots.get(name)
+        if slot is not None:
+            return slot
+        if name not in self._factories:
+            raise KeyError(f"Unknown vision backend '{name}'")
+        with self._lock:
+            slot = self._slots.get(name)
+            if slot is None:
+                slot = self._slots[name] = _Slot(self._factories[name]())
+                slot.worker = threading.Thread(target=self._work, args=(slot,), name=f"Vision-{name}", daemon=True)
+                slot.worker.start()
+                self._start_reaper()
+        return slot
+
+    # --- RESIDENCY ---
+
+    def _load(self, slot):
+        """Called with slot.lock held (worker thread)."""
+        if slot.loaded:
+            return
+        if slot.backend.heavy:
+            self._make_room(slot)
+        start = time.perf_counter()
+        slot.backend.load()
+        elapsed = time.perf_counter() - start
+        slot.loaded = True
+        slot.stats["loads"] += 1
+        slot.stats["load_sec"] = round(slot.stats["load_sec"] + elapsed, 3)
+        logger.info(f"🔥 Vision backend '{slot.backend.name}' resident ({elapsed:.1f}s load)")
+
+    def _make_room(self, incoming):
+        resident = sorted((s for s in list(self._slots.values())
+                           if s is not incoming and s.loaded and s.backend.heavy), key=lambda s: s.last_used)
+        while len(resident) >= self.max_resident:
+            victim = resident.pop(0)
+            self._unload(victim, "making room")
+
+    def _unload(self, slot, reason):
+        if not slot.lock.acquire(blocking=False):
+            return False  # Busy: it is clearly not idle
+        try:
+            if not slot.loaded:
+                return False
+            try:
+                slot.backend.unload()
+            except Exception as e:
+                logger.warning(f"Vision backend '{slot.backend.name}' unload failed: {e}")
+            slot.loaded = False
+            slot.stats["evictions"] += 1
+            logger.info(f"💤 Vision backend '{slot.backend.name}' evicted ({reason})")
+            return True
+        finally:
+            slot.lock.release()
+
+    def evict_idle(self):
+        now = time.time()
+        return [name for name, slot in list(self._slots.items())
+                if slot.loaded and slot.backend.heavy and now - slot.last_used > self.idle_evict_sec
+                and self._unload(slot, f"idle {int(now - slot.last_used)}s")]
+
+    def _start_reaper(self):
+        if self._reaper is not None or not self.idle_evict_sec:
+            return
+        def reap():
+            while True:
+                time.sleep(max(5.0, min(60.0, self.idle_evict_sec / 4)))
+                self.evict_idle()
+        self._reaper = threading.Thread(target=reap, name="VisionReaper", daemon=True)
+        self._reaper.start()
+
+    def warm(self, names=None):
+        """Loads backends ahead of the first request; returns {name: True/error string}."""
+        futures, out = {}, {}
+        for name in names or self.order:
+            try:
+                futures[name] = self._submit(name, "load", None, None)
+            except KeyError as e:
+                out[name] = str(e)
+        for name, fut in futures.items():
+            try:
+                fut.result()
+                out[name] = True
+            except Exception as e:
+                out[name] = str(e)
+        return out
+
+    # --- BATCHING WORKER ---
+
+    def _submit(self, name, kind, image, query):
+        fut = Future()
+        self._slot(name).queue.put((kind, image, query, fut))
+        return fut
+
+    def _work(self, slot):
+        while True:
+            batch = [slot.queue.get()]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(slot.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with slot.lock:
+                self._run_batch(slot, batch)
+                slot.last_used = time.time()
+
+    def _run_batch(self, slot, batch):
+        try:
+            self._load(slot)
+        except Exception as e:
+            logger.error(f"❌ Vision backend '{slot.backend.name}' failed to load: {e}")
+            for *_, fut in batch:
+                fut.set_exception(e)
+            return
+
+        groups = {}  # Same frame + same kind -> one backend call
+        for kind, image, query, fut in batch:
+            if kind == "load":
+                fut.set_result(True)
+                continue
+            groups.setdefault((kind, id(image)), (image, []))[1].append((query, fut))
+
+        slot.stats["requests"] += len(batch)
+        start = time.perf_counter()
+        for (kind, _), (image, items) in groups.items():
+            slot.stats["batches"] += 1
+            try:
+                if kind == "find":
+                    results = slot.backend.find_elements(image, [q for q, _ in items])
+                else:
+                    results = [slot.backend.describe(image, q) for q, _ in items]
+                for (_, fut), result in zip(items, results):
+                    fut.set_result(result)
+            except Exception as e:
+                slot.stats["errors"] += 1
+                logger.error(f"Vision backend '{slot.backend.name}' {kind} failed: {e}")
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+        slot.stats["busy_sec"] = round(slot.stats["busy_sec"] + time.perf_counter() - start, 3)
+
+    # --- PUBLIC API ---
+
+    def find_elements(self, image, targets, backend, timeout=120):
+        """Locates several targets on one frame with a single backend (batched)."""
+        image = as_image(image)
+        futures = [self._submit(backend, "find", image, t) for t in targets]
+        return [self._result(f, timeout) for f in futures]
+
+    def find_element(self, image, target, backends=None, timeout=120):
+        """Tries backends in order; the first hit is returned with its backend name."""
+        image = as_image(image)
+        errors = {}
+        for name in backends or self.order:
+            result = self._result(self._submit(name, "find", image, target), timeout)
+            if "error" not in result:
+                return {**result, "backend": name}
+            errors[name] = result["error"]
+        return {"error": f"'{target}' not found", "backends": errors}
+
+    def describe(self, image, prompt=None, backend=None, timeout=120):
+        result = self._result(self._submit(backend or self.describe_backend, "describe", as_image(image), prompt), timeout)
+        return {**result, "backend": backend or self.describe_backend}
+
+    @staticmethod
+    def _result(fut, timeout):
+        try:
+            return fut.result(timeout=timeout)
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    def stats(self):
+        now = time.time()
+        return {
+            name: {**slot.stats, "resident": slot.loaded, "queued": slot.queue.qsize(),
+                   "idle_sec": round(now - slot.last_used, 1) if slot.last_used else None}
+            for name, slot in list(self._slots.items())
+        }
+
+
+def _build_pool():
+    idle = getattr(config, 'VISION_IDLE_EVICT_SEC', 600)
+    pool = VisionPool(
+        order=getattr(config, 'VISION_BACKEND_ORDER', ("landmark", "ocr", "florence")),
+        describe_backend=getattr(config, 'VISION_DESCRIBE_BACKEND', "ollama"),
+        idle_evict_sec=idle,
+        max_resident=getattr(config, 'VISION_MAX_RESIDENT', 2),
+        batch_window_ms=getattr(config, 'VISION_BATCH_WINDOW_MS', 15),
+    )
+    pool.register("landmark", LandmarkBackend)
+    pool.register("ocr", OCRBackend)
+    pool.register("florence", FlorenceBackend)
+    pool.register("moondream", MoondreamBackend)
+    pool.register("ollama", lambda: OllamaBackend(keep_alive_sec=idle))
+    return pool
+
+
+# Global Instance
+vision_pool = _build_pool()
@@ -47,43 +47,74 @@ class FlorenceVision:
             logger.error(f"❌ Florence-2 Init Failed: {e}")
             self.model = None
 
-    def find_element(self, image_path, target):
-        if not self.model: return {"error": "Model not ready"}
+    @staticmethod
+    def _image(image):
+        """Accepts an in-memory PIL image (preferred) or a file path"""
+        if isinstance(image, Image.Image):
+            return image.convert("RGB") if image.mode != "RGB" else image
+        return Image.open(image).convert("RGB")
+
+    def _run(self, task_prompt, image, texts):
+        """One batched generate() call: the same image with several prompts"""
+        inputs = self.processor(text=texts, images=[image] * len(texts), return_tensors="pt", padding=True).to(self.device)
+        with torch.no_grad():
+            generated_ids = self.model.generate(
+                input_ids=inputs["input_ids"],
+                pixel_values=inputs["pixel_values"],
+                max_new_tokens=1024,
+                num_beams=3
+            )
+        return [
+            self.processor.post_process_generation(text, task=task_prompt, image_size=(image.width, image.height))
+            for text in self.processor.batch_decode(generated_ids, skip_special_tokens=False)
+        ]
+
+    def find_element(self, image, target):
+        return self.find_elements(image, [target])[0]
+
+    def find_elements(self, image, targets):
+        """Grounds several targets on one screenshot in a single batch"""
+        if not self.model: return [{"error": "Model not ready"} for _ in targets]
         try:
-            image = Image.open(image_path).convert("RGB")
+            image = self._image(image)
             # Florence-2 specific grounding task
             task_prompt = "<CAPTION_TO_PHRASE_GROUNDING>"
-            prompt = f"{task_prompt} {target}"
-            
-            inputs = self.processor(text=prompt, images=image, return_tensors="pt").to(self.device)
-            
-            with torch.no_grad():
-                generated_ids = self.model.generate(
-                    input_ids=inputs["input_ids"],
-                    pixel_values=inputs["pixel_values"],
-                    max_new_tokens=1024,
-                    num_beams=3
-                )
-            
-            generated_text = self.processor.batch_decode(generated_ids, skip_special_tokens=False)[0]
-            parsed_answer = self.processor.post_process_generation(generated_text, task=task_prompt, image_size=(image.width, image.height))
-            
-            logger.info(f"🧠 Florence Raw Parsed: {parsed_answer}")
-            
-            # The key in the results dict is the TASK prompt, not the full prompt
-            results = parsed_answer.get(task_prompt, {})
-            bboxes = results.get("bboxes", [])
-            
-            if bboxes:
-                box = bboxes[0] # [x1, y1, x2, y2]
-                cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
-                nx, ny = int((cx / image.width) * 1000), int((cy / image.height) * 1000)
-                logger.info(f"🎯 Local Neural Grounding: {target} -> ({nx}, {ny})")
-                return {"x": nx, "y": ny}
-            
-            return {"error": "Not found locally"}
+            parsed = self._run(task_prompt, image, [f"{task_prompt} {t}" for t in targets])
+
+            out = []
+            for target, parsed_answer in zip(targets, parsed):
+                logger.info(f"🧠 Florence Raw Parsed: {parsed_answer}")
+                # The key in the results dict is the TASK prompt, not the full prompt
+                bboxes = parsed_answer.get(task_prompt, {}).get("bboxes", [])
+                if bboxes:
+                    box = bboxes[0] # [x1, y1, x2, y2]
+                    cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+                    nx, ny = int((cx / image.width) * 1000), int((cy / image.height) * 1000)
+                    logger.info(f"🎯 Local Neural Grounding: {target} -> ({nx}, {ny})")
+                    out.append({"x": nx, "y": ny})
+                else:
+                    out.append({"error": "Not found locally"})
+            return out
         except Exception as e:
             logger.error(f"Florence Grounding Error: {e}")
             import traceback
             logger.error(traceback.format_exc())
+            return [{"error": str(e)} for _ in targets]
+
+    def describe(self, image, prompt=None):
+        """Detailed caption of the screenshot (Florence-2 ignores free-form prompts)"""
+        if not self.model: return {"error": "Model not ready"}
+        try:
+            task_prompt = "<MORE_DETAILED_CAPTION>"
+            parsed = self._run(task_prompt, self._image(image), [task_prompt])[0]
+            return {"text": parsed.get(task_prompt, "")}
+        except Exception as e:
+            logger.error(f"Florence Caption Error: {e}")
             return {"error": str(e)}
+
+    def close(self):
+        """Releases the model weights (and GPU memory)"""
+        self.model = None
+        self.processor = None
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
@@ -1,11 +1,9 @@
-import os
-import time
-import json
 import logging
 import pyautogui
 import pyperclip
 from vision_agent import VisionAgent
-from vision_utils import VisionUtils
+from vision_utils import VisionUtils, change_detector, frame_dumper
+from vision_landmark import landmarks, coordinate_cache
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +15,7 @@ class VisionKernel:
         self.max_steps = 20
         self.history = []
         self.stop_requested = False
-        self.memory_path = "memory.json"
-        self.memory = self._load_memory()
+        self.memory = coordinate_cache # Hippocampus: landmark-verified app coordinates (memory.json)
         
         # New System Prompt for Autonomous Loop (Zenith v4 - Surgical Precision & Shortcuts)
         self.kernel_prompt = (
@@ -53,17 +50,12 @@ class VisionKernel:
             "   }\n"
         )
 
-    def _load_memory(self):
-        try:
-            if os.path.exists(self.memory_path):
-                with open(self.memory_path, 'r') as f: return json.load(f)
-        except: pass
-        return {}
-
-    def _save_memory(self):
-        try:
-            with open(self.memory_path, 'w') as f: json.dump(self.memory, f)
-        except: pass
+    def _await_reaction(self, before, timeout=1.0):
+        """Stability pause: returns once the UI reacted and settled (10 Hz polling), at most `timeout`"""
+        reacted = change_detector.wait_for_reaction(pyautogui.screenshot, before, timeout=timeout)
+        if not reacted:
+            logger.info("⏱️ No visual reaction within the stability window")
+        return reacted
 
     def stop_mission(self):
         """Emergency Stop Signal"""
@@ -76,42 +68,56 @@ class VisionKernel:
         self.stop_requested = False # Reset flag
         steps_taken = 0
         mission_status = "CONTINUE"
-        last_success_path = None
+        last_frame = None # Raw capture of the previous step (kept in memory for diffing)
         
         # Zenith v6: Hippocampus Check (Fast Path)
         # Check if the ENTIRE goal is just a known app launch (e.g., "open chrome")
-        for app_name, coords in self.memory.items():
-            if f"open {app_name}" in goal.lower():
-                logger.info(f"🧠 Hippocampus Recall: Found {app_name} at {coords}")
-                # Inject a fake "brain response" to skip the API call
-                self.history.append({"step": 0, "thought": "Memory Retrieval", "action": "click", "params": coords})
-                # Execute immediately
-                nx, ny = coords['x'], coords['y']
-                screen_w, screen_h = pyautogui.size()
-                pyautogui.click(int((nx/1000)*screen_w), int((ny/1000)*screen_h))
-                steps_taken += 1
-                time.sleep(2) # Allow app to open
+        for app_name, coords in self.memory.recall(goal):
+            frame = pyautogui.screenshot()
+            if app_name in landmarks.templates:
+                # Verify against the live screen; a miss invalidates the cached entry
+                coords = landmarks.locate([app_name], frame=frame).get(app_name)
+                if not coords:
+                    continue
+            logger.info(f"🧠 Hippocampus Recall: Found {app_name} at {coords}")
+            # Inject a fake "brain response" to skip the API call
+            self.history.append({"step": 0, "thought": "Memory Retrieval", "action": "click", "params": coords})
+            # Execute immediately
+            nx, ny = coords['x'], coords['y']
+            screen_w, screen_h = pyautogui.size()
+            pyautogui.click(int((nx/1000)*screen_w), int((ny/1000)*screen_h))
+            steps_taken += 1
+            if not self._await_reaction(change_detector.prepare(frame), timeout=2.0): # Allow app to open
+                self.memory.invalidate(app_name, "click had no visible effect")
         
         while steps_taken < self.max_steps and mission_status == "CONTINUE":
             if self.stop_requested:
                 return "🛑 Mission Aborted by User."
             steps_taken += 1
-            temp_path = f"mission_step_{steps_taken}.jpg"
+            screen_changed = True
             
             try:
-                # 1. Capture State & Draw Grid
+                # 1. Capture State & Draw Grid (in memory; the grid layer is cached per resolution)
                 screen_w, screen_h = pyautogui.size()
-                pyautogui.screenshot().save(temp_path)
-                VisionUtils.draw_grid(temp_path, temp_path) # Overwrite with grid
+                frame = pyautogui.screenshot()
+                annotated = VisionUtils.apply_grid(frame)
+                frame_bytes = VisionUtils.encode(annotated)
+                frame_dumper.dump(annotated, f"mission_step_{steps_taken}.jpg")
                 
                 # 2. Consult Agent
                 # Zenith v6: Self-Reflector (Did last action fail?)
                 reflection_context = ""
-                if last_success_path and steps_taken > 1:
-                    diff = VisionUtils.calculate_diff(last_success_path, temp_path)
-                    logger.info(f"🔍 Visual Delta: {diff}%")
-                    if diff < 1.0 and self.history[-1]['action'] in ['click', 'type']:
+                if last_frame is not None and steps_taken > 1:
+                    delta = change_detector.compare(last_frame, frame)
+                    screen_changed = delta.changed
+                    logger.info(f"🔍 Visual Delta: {delta.percent:.3f}% (cells {delta.changed_cells()})")
+                    if not screen_changed and self.history[-1]['action'] in ['click', 'type']:
                         reflection_context = "\n[WARNING]: The screen DID NOT CHANGE after your last action. It might have failed. ANALYZE WHY. Do not repeat the exact same coordinate."
+                    elif screen_changed:
+                        reflection_context = f"\n[DELTA]: Grid cells that changed since your last action: {delta.changed_cells()}"
+
+                # Zero-cost landmarks (template matches, only re-searched where the screen changed)
+                known = landmarks.locate(frame=frame) if landmarks.templates else {}
 
                 # User Context (State)
                 state_info = (
@@ -119,12 +125,13 @@ class VisionKernel:
                     f"SCREEN RESOLUTION: {screen_w}x{screen_h}\n"
                     f"STEP: {steps_taken}/{self.max_steps}\n"
                     f"HISTORY: {self.history[-3:] if self.history else 'None'}\n"
+                    f"KNOWN ELEMENTS: {known or 'None'}\n"
                     f"{reflection_context}\n"
                 )
                 
                 # We pass 'kernel_prompt' as the system override
                 result = self.agent.analyze_screen(
-                    image_path=temp_path, 
+                    image_bytes=frame_bytes, 
                     goal=state_info, 
                     system_prompt=self.kernel_prompt
                 )
@@ -154,6 +161,7 @@ class VisionKernel:
                         update_callback(msg)
 
                 # 4. Execute Action
+                before = change_detector.prepare(pyautogui.screenshot()) # Baseline for the reaction wait
                 if action == "click":
                     nx, ny = params.get("x"), params.get("y")
                     # Scale normalized coordinates (0-1000) to actual screen resolution
@@ -163,12 +171,13 @@ class VisionKernel:
                     
                     # Zenith v6: Repeat Detection
                     last_action = self.history[-2] if len(self.history) > 1 else {}
-                    if last_action.get("action") == "click" and last_action.get("params") == params and diff < 1.0:
+                    if last_action.get("action") == "click" and last_action.get("params") == params and not screen_changed:
                          logger.warning(f"🚫 BLOCKING repetitive click at ({nx}, {ny}) on frozen screen.")
                          # Force a small movement to jiggle it loose instead
                          pyautogui.moveTo(x + 10, y + 10, duration=0.5)
                          pyautogui.click()
-                         time.sleep(1.0)
+                         self._await_reaction(before)
+                         last_frame = frame
                          continue
 
                     logger.info(f"🖱️ Clicking: ({nx}, {ny}) -> Real: ({x}, {y}) on {screen_w}x{screen_h}")
@@ -177,20 +186,20 @@ class VisionKernel:
                     pyautogui.moveRel(5, 5, duration=0.1)
                     pyautogui.moveRel(-5, -5, duration=0.1)
                     pyautogui.click()
-                    time.sleep(1.0) # Stability pause
+                    self._await_reaction(before)
                 elif action == "type":
                     text = params.get("text")
                     pyautogui.typewrite(text, interval=0.1)
-                    time.sleep(1.0) # Stability pause
+                    self._await_reaction(before)
                 elif action == "press":
                     key = params.get("key")
                     pyautogui.press(key)
-                    time.sleep(1.0) # Stability pause
+                    self._await_reaction(before)
                 elif action == "hotkey":
                     keys = params.get("keys", [])
                     if isinstance(keys, list):
                         pyautogui.hotkey(*keys)
-                        time.sleep(1.0) # Stability pause
+                        self._await_reaction(before)
                     else:
                         logger.warning(f"Invalid hotkey params: {keys}")
                 elif action == "wait":
@@ -210,15 +219,12 @@ class VisionKernel:
                     pyautogui.scroll(-500 if direction == "down" else 500)
                 
                 # Short pause for UI update - replaced by Smart Wait in next loop implicitly
-                # Time to settle is handled, but we need to track 'last_success_path' for diffing next time
-                last_success_path = temp_path # Keep reference to THIS step's image for next comparison
+                # Keep THIS step's raw frame for the next comparison
+                last_frame = frame
 
             except Exception as e:
                 logger.error(f"Mission Execution Error: {e}")
                 return f"Mission Error: {str(e)}"
-            finally:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
 
         if mission_status == "DONE":
             return f"Mission Accomplished! ✅\nGoal: `{goal}`"
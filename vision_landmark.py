@@ -1,50 +1,227 @@
-import cv2
-import numpy as np
-import pyautogui
+"""
+================================================================================
+  bankoo.ai: ZENITH LANDMARK LOCATOR (CACHED TEMPLATE MATCHING)
+================================================================================
+Zero-cost element finding for screen missions, before any vision LLM call.
+
+  * Templates in vision_templates/*.png are loaded once (grayscale + a
+    downscaled pyramid level) and reloaded only when a file changes.
+  * `locate()` matches many icons against ONE frame: coarse match on the
+    half-resolution level, then a full-resolution refine in a small window.
+  * Between calls only the area that changed on screen is searched again;
+    hits outside it are reused as-is, misses stay misses.
+  * Confirmed hits feed the CoordinateCache (memory.json), which VisionKernel
+    uses to launch known apps without asking the LLM. Entries are invalidated
+    when a template no longer matches or a click on them does nothing.
+================================================================================
+"""
+
 import os
+import re
+import json
+import time
 import logging
+import threading
+import numpy as np
+import pyautogui
+
+import config
+from vision_utils import change_detector
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+
+class _Template:
+    __slots__ = ("name", "mtime", "full", "coarse")
+
+    def __init__(self, name, mtime, full, scale):
+        self.name = name
+        self.mtime = mtime
+        self.full = full
+        h, w = full.shape
+        # Too small to survive downscaling: match it at full resolution only
+        self.coarse = (cv2.resize(full, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+                       if min(w, h) * scale >= 8 else None)
+
+    @property
+    def size(self):
+        h, w = self.full.shape
+        return w, h
+
+
 class LandmarkVision:
     """Zero-Cost Vision using Template Matching (OpenCV)"""
-    
-    def __init__(self, templates_dir="vision_templates"):
+
+    def __init__(self, templates_dir="vision_templates", scale=0.5, threshold=0.8, coarse_slack=0.15):
         self.templates_dir = templates_dir
+        self.scale = scale
+        self.threshold = threshold
+        self.coarse_slack = coarse_slack  # Coarse scores run lower than full-resolution ones
+        self.templates = {}
+        self._lock = threading.Lock()
+        self._hits = {}       # name -> (x, y, w, h, confidence) in pixels, searched on the last frame
+        self._misses = set()  # names searched on the last frame and not found
+        self._last = None     # Downsampled luminance of the last frame (change detection)
         if not os.path.exists(templates_dir):
             os.makedirs(templates_dir)
-            
-    def find_icon(self, icon_name, threshold=0.8):
+        self.reload()
+
+    # --- TEMPLATES ---
+
+    def reload(self):
+        """(Re)loads templates whose file is new or changed; drops deleted ones."""
+        if not CV2_AVAILABLE:
+            return self.templates
+        seen = set()
+        for fname in os.listdir(self.templates_dir):
+            if not fname.lower().endswith(".png"):
+                continue
+            name = fname[:-4]
+            path = os.path.join(self.templates_dir, fname)
+            mtime = os.path.getmtime(path)
+            seen.add(name)
+            cached = self.templates.get(name)
+            if cached is not None and cached.mtime == mtime:
+                continue
+            gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                logger.warning(f"⚠️ Unreadable template: {path}")
+                continue
+            self.templates[name] = _Template(name, mtime, gray, self.scale)
+            self._forget(name)
+        for name in set(self.templates) - seen:
+            del self.templates[name]
+            self._forget(name)
+        return self.templates
+
+    def _forget(self, name):
+        self._hits.pop(name, None)
+        self._misses.discard(name)
+
+    # --- MATCHING ---
+
+    @staticmethod
+    def _best(image, template):
+        th, tw = template.shape
+        if image.shape[0] < th or image.shape[1] < tw:
+            return -1.0, (0, 0)
+        res = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        return max_val, max_loc
+
+    def _search(self, gray, coarse, tpl, region, threshold):
+        """Best full-resolution match of `tpl` inside region (x1, y1, x2, y2 px), or None."""
+        x1, y1, x2, y2 = region
+        tw, th = tpl.size
+        if tpl.coarse is not None:
+            s = self.scale
+            cx1, cy1, cx2, cy2 = int(x1 * s), int(y1 * s), int(np.ceil(x2 * s)), int(np.ceil(y2 * s))
+            score, (mx, my) = self._best(coarse[cy1:cy2, cx1:cx2], tpl.coarse)
+            if score < threshold - self.coarse_slack:
+                return None
+            # Refine around the coarse candidate at full resolution
+            pad = int(np.ceil(2 / s)) + 2
+            fx, fy = int((cx1 + mx) / s), int((cy1 + my) / s)
+            x1, y1 = max(0, fx - pad), max(0, fy - pad)
+            x2, y2 = min(gray.shape[1], fx + tw + pad), min(gray.shape[0], fy + th + pad)
+        score, (mx, my) = self._best(gray[y1:y2, x1:x2], tpl.full)
+        if score < threshold:
+            return None
+        return (x1 + mx, y1 + my, tw, th, float(score))
+
+    def locate(self, names=None, frame=None, threshold=None):
+        """
+        Finds several templates in one frame (default: a fresh screenshot, all templates).
+        Returns {name: {"x", "y", "confidence"}} in 0-1000 coordinates for the hits.
+        """
+        if not CV2_AVAILABLE:
+            return {}
+        threshold = threshold or self.threshold
+        frame = frame if frame is not None else pyautogui.screenshot()
+        prepared = change_detector.prepare(frame)
+
+        with self._lock:
+            names = list(self.templates) if names is None else [n for n in names if n in self.templates]
+            if not names:
+                return {}
+            gray = cv2.cvtColor(np.asarray(frame.convert("RGB")), cv2.COLOR_RGB2GRAY)
+            sh, sw = gray.shape
+
+            changed = None  # Pixel box that changed since the last frame; None = search everything
+            if self._last is not None and self._last.shape == prepared.shape:
+                bbox = change_detector.compare(self._last, prepared).bbox
+                changed = () if bbox is None else (bbox[0] * sw // 1000, bbox[1] * sh // 1000,
+                                                   -(-bbox[2] * sw // 1000), -(-bbox[3] * sh // 1000))
+            else:
+                self._hits.clear()
+                self._misses.clear()
+            self._last = prepared
+            # Cached state is only valid for the frame it was checked on: names not
+            # searched now would otherwise be compared against a newer frame later
+            wanted = set(names)
+            self._hits = {n: hit for n, hit in self._hits.items() if n in wanted}
+            self._misses &= wanted
+
+            coarse = None
+            results = {}
+            for name in names:
+                tpl = self.templates[name]
+                tw, th = tpl.size
+                hit = self._hits.get(name)
+                if changed is not None and (hit or name in self._misses):
+                    if not changed or (hit and not _overlaps(hit, changed)):
+                        if hit:  # Nothing moved under the cached hit
+                            results[name] = hit
+                        continue
+
+                if coarse is None:
+                    coarse = cv2.resize(gray, (max(1, int(sw * self.scale)), max(1, int(sh * self.scale))),
+                                        interpolation=cv2.INTER_AREA)
+                found = None
+                if hit:  # Re-verify the old spot first (cheap), then wherever the screen changed
+                    x, y, w, h, _ = hit
+                    found = self._search(gray, coarse, tpl, _expand((x, y, x + w, y + h), tw, th, sw, sh), threshold)
+                if found is None:
+                    searched_before = hit or name in self._misses
+                    region = _expand(changed, tw, th, sw, sh) if changed and searched_before else (0, 0, sw, sh)
+                    found = self._search(gray, coarse, tpl, region, threshold)
+
+                if found is None:
+                    self._hits.pop(name, None)
+                    self._misses.add(name)
+                    if hit:
+                        coordinate_cache.invalidate(name, "template no longer on screen")
+                    continue
+                self._hits[name] = found
+                self._misses.discard(name)
+                results[name] = found
+
+        out = {}
+        for name, (x, y, w, h, score) in results.items():
+            nx, ny = int((x + w // 2) * 1000 / sw), int((y + h // 2) * 1000 / sh)
+            out[name] = {"x": nx, "y": ny, "confidence": round(score, 4)}
+            coordinate_cache.confirm(name, nx, ny, source="landmark")
+        return out
+
+    def find_icon(self, icon_name, threshold=0.8, frame=None):
         """Find an icon on screen based on a saved template image"""
-        template_path = os.path.join(self.templates_dir, f"{icon_name}.png")
-        if not os.path.exists(template_path):
-            return {"error": f"Template for '{icon_name}' not found."}
-            
-        # Capture screen
-        screen = np.array(pyautogui.screenshot())
-        screen_gray = cv2.cvtColor(screen, cv2.COLOR_RGB2GRAY)
-        
-        # Load template
-        template = cv2.imread(template_path, 0)
-        w, h = template.shape[::-1]
-        
-        # Match
-        res = cv2.matchTemplate(screen_gray, template, cv2.TM_CCOEFF_NORMED)
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
-        
-        if max_val >= threshold:
-            # Calculate center
-            cx = max_loc[0] + w // 2
-            cy = max_loc[1] + h // 2
-            
-            # Normalize to 0-1000
-            sw, sh = pyautogui.size()
-            nx = int((cx / sw) * 1000)
-            ny = int((cy / sh) * 1000)
-            
-            logger.info(f"🎯 Match found! Raw: ({cx}, {cy}) | Screen: {sw}x{sh} | Norm: ({nx}, {ny}) | MaxVal: {max_val:.4f}")
-            return {"x": nx, "y": ny, "confidence": max_val}
-            
+        if not CV2_AVAILABLE:
+            return {"error": "OpenCV (cv2) is not installed."}
+        if icon_name not in self.templates:
+            self.reload()
+            if icon_name not in self.templates:
+                return {"error": f"Template for '{icon_name}' not found."}
+
+        hit = self.locate([icon_name], frame=frame, threshold=threshold).get(icon_name)
+        if hit:
+            logger.info(f"🎯 Match found! '{icon_name}' Norm: ({hit['x']}, {hit['y']}) | MaxVal: {hit['confidence']:.4f}")
+            return hit
         return {"error": f"'{icon_name}' not detected on screen."}
 
     def save_template(self, icon_name, x, y, w, h):
@@ -52,4 +229,100 @@ class LandmarkVision:
         screen = np.array(pyautogui.screenshot())
         crop = screen[y:y+h, x:x+w]
         cv2.imwrite(os.path.join(self.templates_dir, f"{icon_name}.png"), cv2.cvtColor(crop, cv2.COLOR_RGB2BGR))
+        self.reload()
         return True
+
+
+def _overlaps(hit, box):
+    x, y, w, h = hit[:4]
+    return x < box[2] and box[0] < x + w and y < box[3] and box[1] < y + h
+
+
+def _expand(box, tw, th, sw, sh):
+    """Grows a pixel box by one template size so partially covered matches are found."""
+    x1, y1, x2, y2 = box
+    return max(0, x1 - tw), max(0, y1 - th), min(sw, x2 + tw), min(sh, y2 + th)
+
+
+class CoordinateCache:
+    """
+    Named click targets in 0-1000 screen coordinates, persisted to memory.json
+    (same {"name": {"x", "y"}} format VisionKernel always used). Entries come
+    from landmark hits; stale ones are dropped on failed verification or after
+    `ttl_days` without confirmation.
+    """
+    def __init__(self, path="memory.json", ttl_days=None, move_tolerance=5):
+        self.path = path
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.move_tolerance = move_tolerance
+        self._lock = threading.Lock()
+        self._pattern = None
+        self._names = {}
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                return {k: v for k, v in data.items() if isinstance(v, dict) and "x" in v and "y" in v}
+        except Exception as e:
+            logger.warning(f"⚠️ Coordinate cache unreadable ({self.path}): {e}")
+        return {}
+
+    def _save(self):
+        self._pattern = None
+        try:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"⚠️ Coordinate cache not saved: {e}")
+
+    def _expired(self, entry, ttl):
+        # Hand-written / legacy entries without a timestamp never expire
+        return bool(ttl) and "ts" in entry and time.time() - entry["ts"] > ttl
+
+    def get(self, name):
+        entry = self.entries.get(name)
+        if entry and self._expired(entry, self.ttl):
+            self.invalidate(name, "expired")
+            return None
+        return entry
+
+    def confirm(self, name, x, y, source="landmark"):
+        """Records a verified position; only writes to disk when it is new or moved."""
+        with self._lock:
+            entry = self.entries.get(name)
+            moved = entry is None or abs(entry["x"] - x) > self.move_tolerance or abs(entry["y"] - y) > self.move_tolerance
+            stale = entry is not None and self._expired(entry, self.ttl and self.ttl / 2)
+            if not moved and not stale:
+                return
+            self.entries[name] = {"x": x, "y": y, "source": source, "ts": int(time.time())}
+            self._save()
+
+    def invalidate(self, name, reason=""):
+        with self._lock:
+            if self.entries.pop(name, None) is None:
+                return
+            self._save()
+        logger.info(f"🧹 Forgot cached coordinates for '{name}'{f' ({reason})' if reason else ''}")
+
+    def recall(self, goal):
+        """Known apps the goal asks to open ("open chrome"), as (name, entry) pairs."""
+        with self._lock:
+            if not self.entries:
+                return []
+            if self._pattern is None:
+                self._names = {n.lower(): n for n in self.entries}
+                alternation = "|".join(re.escape(n) for n in sorted(self._names, key=len, reverse=True))
+                self._pattern = re.compile(r"open (" + alternation + r")\b")
+            found = [self._names[m] for m in dict.fromkeys(self._pattern.findall(goal.lower()))]
+        return [(name, entry) for name in found for entry in [self.get(name)] if entry]
+
+
+# Global Instances
+coordinate_cache = CoordinateCache(getattr(config, 'VISION_COORDINATE_CACHE', "memory.json"),
+                                   ttl_days=getattr(config, 'VISION_COORDINATE_TTL_DAYS', 30))
+landmarks = LandmarkVision()
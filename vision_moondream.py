@@ -18,38 +18,72 @@ class MoondreamVision:
             logger.error(f"❌ Moondream Init Failed: {e}")
             self.model = None
 
-    def find_element(self, image_path, target):
+    def _encode(self, image):
+        """Loads a path if needed and runs the vision encoder once (reused across queries)"""
+        if not isinstance(image, Image.Image):
+            image = Image.open(image)
+        if hasattr(self.model, "encode_image"):
+            return self.model.encode_image(image)
+        return image
+
+    def find_element(self, image, target):
         """Find an element on screen using semantic logic"""
+        return self.find_elements(image, [target])[0]
+
+    def find_elements(self, image, targets):
+        """Several targets on one screenshot: the image is encoded only once"""
         if not self.model:
-            return {"error": "Moondream model not initialized."}
+            return [{"error": "Moondream model not initialized."} for _ in targets]
             
         try:
-            image = Image.open(image_path)
-            
-            # Use the detect action to find coordinates
-            # Target should be a natural description like "the Chrome icon" or "the search bar"
-            logger.info(f"🧠 Moondream is looking for: '{target}'...")
-            
-            # Moondream's detect returns a list of objects with bounding boxes
-            objs = self.model.detect(image, target)["objects"]
-            
-            if objs:
-                # Take the first/best match
-                best_match = objs[0]
-                bbox = best_match["bbox"] # [ymin, xmin, ymax, xmax] normalized 0-1
-                
-                # Calculate center
-                cy = (bbox[0] + bbox[2]) / 2
-                cx = (bbox[1] + bbox[3]) / 2
+            encoded = self._encode(image)
+        except Exception as e:
+            logger.error(f"🧠 Moondream Error: {e}")
+            return [{"error": str(e)} for _ in targets]
+
+        out = []
+        for target in targets:
+            try:
+                # Target should be a natural description like "the Chrome icon" or "the search bar"
+                logger.info(f"🧠 Moondream is looking for: '{target}'...")
                 
-                # Scaled to 0-1000 for Bankoo Kernel
-                nx = int(cx * 1000)
-                ny = int(cy * 1000)
+                # Moondream's detect returns a list of objects with bounding boxes
+                objs = self.model.detect(encoded, target)["objects"]
                 
-                logger.info(f"🎯 Moondream matched '{target}' at ({nx}, {ny})")
-                return {"x": nx, "y": ny, "description": f"Neural match for '{target}'"}
-            
-            return {"error": "Neural match not found."}
+                if objs:
+                    # Take the first/best match
+                    best_match = objs[0]
+                    bbox = best_match["bbox"] # [ymin, xmin, ymax, xmax] normalized 0-1
+                    
+                    # Calculate center
+                    cy = (bbox[0] + bbox[2]) / 2
+                    cx = (bbox[1] + bbox[3]) / 2
+                    
+                    # Scaled to 0-1000 for Bankoo Kernel
+                    nx = int(cx * 1000)
+                    ny = int(cy * 1000)
+                    
+                    logger.info(f"🎯 Moondream matched '{target}' at ({nx}, {ny})")
+                    out.append({"x": nx, "y": ny, "description": f"Neural match for '{target}'"})
+                else:
+                    out.append({"error": "Neural match not found."})
+            except Exception as e:
+                logger.error(f"🧠 Moondream Error: {e}")
+                out.append({"error": str(e)})
+        return out
+
+    def describe(self, image, prompt=None):
+        """Caption (no prompt) or answer a question about the screenshot"""
+        if not self.model:
+            return {"error": "Moondream model not initialized."}
+        try:
+            encoded = self._encode(image)
+            if prompt:
+                return {"text": self.model.query(encoded, prompt)["answer"]}
+            return {"text": self.model.caption(encoded)["caption"]}
         except Exception as e:
             logger.error(f"🧠 Moondream Error: {e}")
             return {"error": str(e)}
+
+    def close(self):
+        self.model = None
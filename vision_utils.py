@@ -1,108 +1,273 @@
-import time
-import math
+import io
 import os
-from PIL import Image, ImageDraw, ImageChops
+import time
+import queue
+import logging
+import threading
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw
+
+import config
+
+logger = logging.getLogger(__name__)
+
 
 class VisionUtils:
-    """Optical Support Tools for Zenith v6"""
+    """Optical Support Tools for Zenith v6 (frames stay in memory as PIL images)"""
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def grid_layer(size, rows=5, cols=5):
+        """Transparent RGBA layer with the numbered red grid, rendered once per screen size"""
+        width, height = size
+        layer = Image.new("RGBA", size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+        col_step = width / cols
+        row_step = height / rows
+
+        # Draw Lines
+        for x in range(1, cols):
+            draw.line([(x * col_step, 0), (x * col_step, height)], fill="red", width=2)
+        for y in range(1, rows):
+            draw.line([(0, y * row_step), (width, y * row_step)], fill="red", width=2)
+
+        # Draw Numbers
+        for r in range(rows):
+            for c in range(cols):
+                cell_id = r * cols + c + 1
+                # Calculate center of cell
+                cx = (c * col_step) + (col_step / 2)
+                cy = (r * row_step) + (row_step / 2)
+                draw.text((cx-5, cy-5), str(cell_id), fill="red")
+        return layer
+
+    @staticmethod
+    def apply_grid(img, rows=5, cols=5):
+        """Returns an RGB copy of `img` with the cached grid layer composited on top"""
+        out = img.convert("RGB") if img.mode != "RGB" else img.copy()
+        layer = VisionUtils.grid_layer(out.size, rows, cols)
+        out.paste(layer, (0, 0), layer)
+        return out
 
     @staticmethod
     def draw_grid(image_path, output_path, rows=5, cols=5):
-        """Overlay a numbered red grid on the screenshot"""
+        """Overlay a numbered red grid on the screenshot (file-based wrapper around apply_grid)"""
         try:
             with Image.open(image_path) as img:
-                draw = ImageDraw.Draw(img)
-                width, height = img.size
-                col_step = width / cols
-                row_step = height / rows
-
-                # Draw Lines
-                for x in range(1, cols):
-                    draw.line([(x * col_step, 0), (x * col_step, height)], fill="red", width=2)
-                for y in range(1, rows):
-                    draw.line([(0, y * row_step), (width, y * row_step)], fill="red", width=2)
-
-                # Draw Numbers
-                for r in range(rows):
-                    for c in range(cols):
-                        cell_id = r * cols + c + 1
-                        # Calculate center of cell
-                        cx = (c * col_step) + (col_step / 2)
-                        cy = (r * row_step) + (row_step / 2)
-                        
-                        # Draw Text (Simple fallback if font fails)
-                        draw.text((cx-5, cy-5), str(cell_id), fill="red")
-                
-                img.save(output_path)
+                VisionUtils.apply_grid(img, rows, cols).save(output_path)
                 return True
         except Exception as e:
             print(f"Grid Error: {e}")
             return False
 
     @staticmethod
-    def calculate_diff(img1_path, img2_path):
-        """Calculate percentage difference between two images"""
+    def encode(img, fmt="JPEG", quality=None):
+        """Encodes a frame straight to the bytes sent to the vision model"""
+        buf = io.BytesIO()
+        if fmt.upper() in ("JPEG", "JPG"):
+            quality = quality or getattr(config, 'VISION_JPEG_QUALITY', 80)
+            img.save(buf, format="JPEG", quality=quality, optimize=False)
+        else:
+            img.save(buf, format=fmt)
+        return buf.getvalue()
+
+    @staticmethod
+    def _as_image(img):
+        if isinstance(img, (Image.Image, np.ndarray)):
+            return img
+        with Image.open(img) as f:
+            f.load()
+            return f.copy()
+
+    @staticmethod
+    def calculate_diff(img1, img2):
+        """Percentage of the screen that changed between two frames (PIL images, arrays or paths)"""
         try:
-            with Image.open(img1_path) as img1, Image.open(img2_path) as img2:
-                diff = ImageChops.difference(img1, img2)
-                bbox = diff.getbbox()
-                if not bbox: return 0.0 # Identical
-                
-                # Simple heuristic: sum of pixel differences
-                # For speed in pure python, we might just rely on bbox existence for now
-                return 1.0 # Changed
-        except:
+            return change_detector.compare(VisionUtils._as_image(img1), VisionUtils._as_image(img2)).percent
+        except Exception:
             return 0.0
 
     @staticmethod
-    def wait_for_settle(capture_func, timeout=5):
-        """Smart Wait: Blocks until screen stops moving (pixels settle)"""
-        import uuid
-        session_id = str(uuid.uuid4())[:8]
-        last_snap = f"v_settle_{session_id}_1.jpg"
-        curr_snap = f"v_settle_{session_id}_2.jpg"
-        
+    def wait_for_settle(capture_func, timeout=5, interval=0.1):
+        """Smart Wait: Blocks until screen stops moving (pixels settle). capture_func() returns a PIL image."""
+        return change_detector.wait_for_settle(capture_func, timeout=timeout, interval=interval)
+
+
+class ChangeReport:
+    """Result of one frame comparison: overall and per-grid-cell changed-pixel percentages."""
+    __slots__ = ("percent", "cells", "changed", "min_percent", "bbox")
+
+    def __init__(self, percent, cells, min_percent, bbox=None):
+        self.percent = percent
+        self.cells = cells  # rows x cols array of percentages, cell 1 = cells[0, 0]
+        self.bbox = bbox  # (x1, y1, x2, y2) 0-1000 box around every changed pixel, None if nothing moved
+        self.min_percent = min_percent
+        self.changed = percent >= min_percent
+
+    def changed_cells(self):
+        """Grid cell ids (1-based, same numbering as the drawn grid) that changed."""
+        return [int(i) + 1 for i in np.flatnonzero(self.cells.ravel() >= self.min_percent)]
+
+    def __repr__(self):
+        return f"ChangeReport({self.percent:.3f}%, cells={self.changed_cells()})"
+
+
+class ChangeDetector:
+    """
+    Vectorized screen change detection on downsampled grayscale frames.
+    Box-downsampling (~4x on a 1080p screen) plus a luminance threshold makes
+    the diff perceptual: JPEG noise and sub-pixel anti-aliasing do not count,
+    a blinking caret stays far below `min_percent`, and one comparison takes a
+    few milliseconds so the settle/reaction loops can poll at 10+ Hz.
+    Ignore regions are (x1, y1, x2, y2) boxes in the kernel's 0-1000
+    normalized coordinates (e.g. the taskbar clock).
+    """
+    def __init__(self, target_width=480, pixel_threshold=24, min_percent=0.02,
+                 rows=5, cols=5, ignore_regions=()):
+        self.target_width = target_width
+        self.pixel_threshold = pixel_threshold
+        self.min_percent = min_percent
+        self.rows = rows
+        self.cols = cols
+        self.ignore_regions = tuple(tuple(r) for r in ignore_regions)
+        self._masks = {}
+
+    def prepare(self, frame):
+        """Downsampled int16 luminance array; already-prepared arrays pass through."""
+        if isinstance(frame, np.ndarray):
+            return frame
+        factor = max(1, round(frame.width / self.target_width))
+        if factor > 1:
+            frame = frame.reduce(factor)
+        return np.asarray(frame.convert("L"), dtype=np.int16)
+
+    def _keep_mask(self, shape, ignore_regions):
+        """Boolean mask of pixels that count (False inside ignore regions), cached per shape."""
+        key = (shape, ignore_regions)
+        mask = self._masks.get(key)
+        if mask is None:
+            h, w = shape
+            mask = np.ones(shape, dtype=bool)
+            for x1, y1, x2, y2 in ignore_regions:
+                mask[int(y1 * h / 1000):int(np.ceil(y2 * h / 1000)),
+                     int(x1 * w / 1000):int(np.ceil(x2 * w / 1000))] = False
+            self._masks[key] = mask
+        return mask
+
+    def compare(self, before, after, ignore_regions=None):
+        a, b = self.prepare(before), self.prepare(after)
+        if a.shape != b.shape:  # Resolution change: everything moved
+            return ChangeReport(100.0, np.full((self.rows, self.cols), 100.0), self.min_percent, (0, 0, 1000, 1000))
+
+        regions = self.ignore_regions + tuple(tuple(r) for r in (ignore_regions or ()))
+        changed = np.abs(a - b) > self.pixel_threshold
+        keep = None
+        if regions:
+            keep = self._keep_mask(a.shape, regions)
+            changed &= keep
+
+        h, w = a.shape
+        row_edges = (np.arange(self.rows) * h) // self.rows
+        col_edges = (np.arange(self.cols) * w) // self.cols
+        counts = np.add.reduceat(np.add.reduceat(changed.astype(np.int32), row_edges, axis=0), col_edges, axis=1)
+        if keep is None:
+            totals = np.outer(np.diff(np.append(row_edges, h)), np.diff(np.append(col_edges, w)))
+        else:
+            totals = np.add.reduceat(np.add.reduceat(keep.astype(np.int32), row_edges, axis=0), col_edges, axis=1)
+        cells = np.divide(counts * 100.0, totals, out=np.zeros(counts.shape), where=totals > 0)
+        total = totals.sum()
+        percent = float(counts.sum() * 100.0 / total) if total else 0.0
+        bbox = None
+        if counts.any():
+            ys, xs = np.any(changed, axis=1), np.any(changed, axis=0)
+            y1, y2 = np.argmax(ys), h - np.argmax(ys[::-1])
+            x1, x2 = np.argmax(xs), w - np.argmax(xs[::-1])
+            bbox = (int(x1 * 1000 // w), int(y1 * 1000 // h), int(-(-x2 * 1000 // w)), int(-(-y2 * 1000 // h)))
+        return ChangeReport(percent, cells, self.min_percent, bbox)
+
+    def wait_for_settle(self, capture_func, timeout=5, interval=0.1, quiet_frames=2):
+        """True once `quiet_frames` consecutive polls show no meaningful change."""
         start = time.time()
-        
+        last = self.prepare(capture_func())
+        quiet = 0
+        while time.time() - start < timeout:
+            time.sleep(interval)
+            curr = self.prepare(capture_func())
+            quiet = quiet + 1 if not self.compare(last, curr).changed else 0
+            if quiet >= quiet_frames:
+                return True
+            last = curr
+        return False
+
+    def wait_for_reaction(self, capture_func, before, timeout=1.0, interval=0.1):
+        """
+        Replaces the fixed pause after a UI action: returns True as soon as the
+        screen has changed relative to `before` and then held still for one poll,
+        False if nothing changed within `timeout`.
+        """
+        start = time.time()
+        ref = self.prepare(before)
+        last = None
+        while time.time() - start < timeout:
+            time.sleep(interval)
+            curr = self.prepare(capture_func())
+            if last is None:
+                if self.compare(ref, curr).changed:
+                    last = curr
+                continue
+            if not self.compare(last, curr).changed:
+                return True
+            last = curr
+        return last is not None
+
+
+class FrameDumper:
+    """
+    Optional debug dumps of mission frames. Encoding and disk writes happen on a
+    background thread; when the queue is full frames are dropped, never waited on.
+    """
+    def __init__(self, dump_dir=None, max_queue=16):
+        self.dump_dir = dump_dir
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.dump_dir)
+
+    def dump(self, img, name):
+        if not self.enabled:
+            return
+        self._ensure_thread()
         try:
-            # Initial Snap
-            capture_func(last_snap)
-            time.sleep(0.5) 
-            
-            settled = False
-            while time.time() - start < timeout:
-                capture_func(curr_snap)
-                
-                # Compare
-                is_same = False
-                try:
-                    with Image.open(last_snap) as i1, Image.open(curr_snap) as i2:
-                        i1.load() # Force load into memory
-                        i2.load()
-                        diff = ImageChops.difference(i1, i2)
-                        if not diff.getbbox():
-                            is_same = True
-                except Exception as e:
-                    print(f"Settle Compare Error: {e}")
-                
-                if is_same:
-                    settled = True
-                    break
-                
-                # Swap files safely
-                try:
-                    if os.path.exists(last_snap): os.remove(last_snap)
-                    time.sleep(0.1) # Windows grace period
-                    os.rename(curr_snap, last_snap)
-                except: pass
-                
-                time.sleep(0.4)
-
-            return settled
-        finally:
-            # Cleanup
-            for f in [last_snap, curr_snap]:
-                try:
-                    if os.path.exists(f): os.remove(f)
-                except: pass
+            self._queue.put_nowait((img, name))
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                os.makedirs(self.dump_dir, exist_ok=True)
+                self._thread = threading.Thread(target=self._run, name="FrameDumper", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            img, name = self._queue.get()
+            try:
+                img.save(os.path.join(self.dump_dir, name))
+            except Exception as e:
+                logger.warning(f"Frame dump failed ({name}): {e}")
+
 
+# Global Instances
+change_detector = ChangeDetector(
+    min_percent=getattr(config, 'VISION_CHANGE_MIN_PCT', 0.02),
+    ignore_regions=getattr(config, 'VISION_IGNORE_REGIONS', ()),
+)
+frame_dumper = FrameDumper(getattr(config, 'VISION_DEBUG_DUMP_DIR', None))
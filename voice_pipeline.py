@@ -0,0 +1,172 @@
+"""
+================================================================================
+  bankoo.ai: ZENITH VOICE PIPELINE (SENTENCE-PIPELINED TTS)
+================================================================================
+Splits an answer into sentences and synthesizes them concurrently with
+Edge-TTS on one long-lived asyncio loop. Audio is read straight from
+`Communicate.stream()` (no temp files) and every sentence is emitted as a
+playable clip, strictly in order, as soon as it and all earlier ones are
+ready. The first sentence therefore starts playing while later ones are
+still being generated. Sentences found in the optional TTSCache skip
+Edge-TTS entirely and are read straight from disk. Only fixed replies are
+written back (`prerender`, or `speak(..., store=True)`): free-form LLM
+sentences rarely repeat and would only evict the warmed clips.
+================================================================================
+"""
+
+import re
+import time
+import asyncio
+import logging
+import threading
+
+try:
+    import edge_tts
+    EDGE_TTS_AVAILABLE = True
+except ImportError:
+    EDGE_TTS_AVAILABLE = False
+
+logger = logging.getLogger("VoicePipeline")
+
+# Sentence terminators: Latin punctuation, Devanagari danda/double danda, newlines
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?।॥])\s+|\n+')
+
+
+class VoicePipeline:
+    """
+    Sentence-level TTS pipeline shared by every speak request.
+    `max_parallel` bounds concurrent Edge-TTS connections per utterance;
+    `cache` (a TTSCache) is consulted per sentence before synthesizing and
+    filled only with fixed replies.
+    """
+    def __init__(self, max_parallel=3, min_chars=40, max_chars=240, cache=None):
+        self.max_parallel = max_parallel
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.cache = cache
+
+        # One event loop for the lifetime of the process (no per-utterance loop setup)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="ZenithVoiceLoop", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def split_sentences(self, text):
+        """
+        Splits on sentence boundaries, merging fragments shorter than `min_chars`
+        (avoids choppy one-word clips) and hard-wrapping runs longer than `max_chars`.
+        """
+        parts = [p.strip() for p in SENTENCE_BOUNDARY.split(text) if p and p.strip()]
+        sentences = []
+        buf = ""
+        for part in parts:
+            buf = f"{buf} {part}".strip() if buf else part
+            if len(buf) >= self.min_chars:
+                sentences.extend(self._wrap(buf))
+                buf = ""
+        if buf:
+            if sentences and len(buf) < self.min_chars // 2:
+                sentences[-1] = f"{sentences[-1]} {buf}"
+            else:
+                sentences.extend(self._wrap(buf))
+        return sentences
+
+    def _wrap(self, text):
+        if len(text) <= self.max_chars:
+            return [text]
+        chunks, line = [], ""
+        for word in text.split():
+            if line and len(line) + len(word) + 1 > self.max_chars:
+                chunks.append(line)
+                line = word
+            else:
+                line = f"{line} {word}".strip()
+        if line:
+            chunks.append(line)
+        return chunks
+
+    async def _synthesize(self, sentence, voice, rate, limiter, store):
+        """Returns the audio of one sentence, from the cache when possible."""
+        if self.cache:
+            cached = self.cache.get(sentence, voice, rate)
+            if cached:
+                return cached
+        return await self._render(sentence, voice, rate, limiter, store)
+
+    async def _render(self, sentence, voice, rate, limiter, store=False):
+        """Collects the audio frames of one sentence directly from the Edge-TTS stream."""
+        async with limiter:
+            try:
+                communicate = edge_tts.Communicate(sentence, voice, rate=rate)
+                audio = bytearray()
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        audio.extend(chunk["data"])
+                audio = bytes(audio)
+            except Exception as e:
+                logger.error(f"Edge-TTS sentence failed ({sentence[:30]}...): {e}")
+                return b""
+
+        if store and self.cache and audio:
+            self.cache.put(sentence, voice, rate, audio)
+        return audio
+
+    async def _speak(self, sentences, voice, rate, on_chunk, store):
+        limiter = asyncio.Semaphore(self.max_parallel)
+        start = time.time()
+        # Every sentence starts immediately (bounded by the limiter); emission stays in order
+        tasks = [asyncio.ensure_future(self._synthesize(s, voice, rate, limiter, store)) for s in sentences]
+        emitted = 0
+        try:
+            for index, task in enumerate(tasks):
+                audio = await task
+                if not audio:
+                    continue
+                if emitted == 0:
+                    logger.info(f"🔊 First audio chunk ready in {time.time() - start:.2f}s ({len(sentences)} sentences)")
+                on_chunk(audio, index, len(tasks))
+                emitted += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+        return emitted
+
+    def speak(self, text, voice, on_chunk, rate="+10%", store=False):
+        """
+        Synthesizes `text` and calls `on_chunk(audio_bytes, index, total)` per sentence
+        in order. Blocks the calling thread until the last chunk is emitted.
+        `store=True` (fixed replies only) caches newly rendered sentences.
+        Returns the number of chunks emitted.
+        """
+        if not EDGE_TTS_AVAILABLE:
+            logger.error("Edge-TTS not installed. Voice output disabled.")
+            return 0
+
+        sentences = self.split_sentences(text)
+        if not sentences:
+            return 0
+        future = asyncio.run_coroutine_threadsafe(self._speak(sentences, voice, rate, on_chunk, store), self.loop)
+        return future.result()
+
+    async def _prerender(self, items, rate):
+        limiter = asyncio.Semaphore(self.max_parallel)
+        pending = []
+        for text, voice in items:
+            for sentence in self.split_sentences(text):
+                if not self.cache.contains(sentence, voice, rate):
+                    pending.append(self._render(sentence, voice, rate, limiter, store=True))
+        results = await asyncio.gather(*pending)
+        return sum(1 for audio in results if audio)
+
+    def prerender(self, items, rate="+10%"):
+        """
+        Warms the cache for an iterable of (text, voice) pairs, split exactly as
+        `speak` would split them. Returns the number of newly rendered sentences.
+        """
+        if not EDGE_TTS_AVAILABLE or not self.cache:
+            return 0
+        future = asyncio.run_coroutine_threadsafe(self._prerender(list(items), rate), self.loop)
+        return future.result()
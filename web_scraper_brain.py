@@ -6,8 +6,9 @@ Intelligent web scraping with AI-powered features
 from bs4 import BeautifulSoup
 import requests
 import re
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
 import time
+from crawl_engine import Crawler
 
 class WebScraperBrain:
     """Main scraping engine with AI capabilities"""
@@ -17,13 +18,14 @@ class WebScraperBrain:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
     
-    def scrape_url(self, url, options=None):
+    def scrape_url(self, url, options=None, session=None):
         """
         Scrape a URL and extract data based on options
         
         Args:
             url: Website URL to scrape
             options: dict with extraction preferences
+            session: optional requests.Session (keep-alive reuse, e.g. by the spider)
         
         Returns:
             dict with scraped data
@@ -42,7 +44,7 @@ class WebScraperBrain:
         for i in range(tries):
             try:
                 print(f"🕷️ [SCRAPER] Fetching ({i+1}/{tries}): {url}")
-                response = requests.get(url, headers=self.headers, timeout=25)
+                response = (session or requests).get(url, headers=self.headers, timeout=25)
                 response.raise_for_status()
                 break # Success
             except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
@@ -333,115 +335,48 @@ class WebScraperBrain:
     
     # === SPIDER MODE (CRAWLER) ===
     
-    def scrape_spider(self, start_url, max_pages=5, same_domain=True, options=None):
+    def scrape_spider(self, start_url, max_pages=5, same_domain=True, options=None, max_depth=None):
         """
-        Recursively scrape pages starting from a URL
+        Crawl pages starting from a URL (concurrent fetches, polite per host)
         
         Args:
             start_url: URL to start crawling
             max_pages: Maximum number of pages to crawl
             same_domain: Restrict to same domain
             options: Extraction options
+            max_depth: Link hops from start_url (default CRAWL_MAX_DEPTH)
         """
-        results = []
-        queue = [start_url]
-        visited = set()
-        base_domain = urlparse(start_url).netloc
+        if options is None:
+            options = {'titles': True, 'prices': True, 'images': True, 'links': True, 'tables': False}
+        options = dict(options)
+        keep_links = options.get('links')
+        options['links'] = True # Needed to discover pages; stripped again if not requested
         
         print(f"🕷️ [SPIDER] Starting crawl from: {start_url} (Max: {max_pages})")
-        
-        while queue and len(visited) < max_pages:
-            current_url = queue.pop(0)
-            
-            if current_url in visited:
-                continue
-                
-            # Domain check
-            if same_domain and urlparse(current_url).netloc != base_domain:
-                continue
-                
-            # Scrape content
-            print(f"🕸️ [SPIDER] Crawling ({len(visited)+1}/{max_pages}): {current_url}")
-            data = self.scrape_url(current_url, options)
-            
-            if data.get('status') == 'success':
-                results.append(data)
-                visited.add(current_url)
-                
-                # Find next pages
-                # 1. Look for 'next' info in links
-                # 2. Add to queue
-                if 'links' in data['data']:
-                    new_links = self._find_next_links(data['data']['links'], visited, base_domain if same_domain else None)
-                    for link in new_links:
-                        if link not in visited and link not in queue:
-                            queue.append(link)
-                            
-            time.sleep(1)  # Polite delay
-            
+
+        def fetch(url, session):
+            print(f"🕸️ [SPIDER] Crawling: {url}")
+            data = self.scrape_url(url, options, session=session)
+            return data if data.get('status') == 'success' else {'error': data.get('error', 'scrape failed')}
+
+        crawl = Crawler(fetch, lambda page: [(l['url'], l.get('text', '')) for l in page['data'].get('links', [])],
+                        max_pages=max_pages, max_depth=max_depth, same_domain=same_domain).crawl(start_url)
+        if 'error' in crawl:
+            return {'status': 'error', 'error': crawl['error'], 'pages_crawled': 0, 'results': []}
+
+        results = []
+        for _, data in crawl['results']:
+            if not keep_links:
+                data['data'].pop('links', None)
+            results.append(data)
+        print(f"✅ [SPIDER] {crawl['pages_crawled']} pages at {crawl['stats']['pages_per_sec']} pages/s")
         return {
             'status': 'success',
-            'pages_crawled': len(visited),
-            'results': results
+            'pages_crawled': crawl['pages_crawled'],
+            'results': results,
+            'stats': crawl['stats']
         }
     
-    def _find_next_links(self, links, visited, restrict_domain=None):
-        """Heuristic to find 'next' or valid content links"""
-        candidates = []
-        
-        keywords = ['next', 'more', 'page', 'Older posts']
-        
-        for link in links:
-            if not isinstance(link, dict) or 'url' not in link:
-                continue
-                
-            url = link['url']
-            text = link.get('text', '').lower()
-            
-            # Skip visited
-            if url in visited:
-                continue
-                
-            # Domain check
-            if restrict_domain and urlparse(url).netloc != restrict_domain:
-                continue
-            
-            # Heuristic: If text contains 'next' or it looks like a pagination link
-            is_candidate = False
-            
-            # 1. Keyword match
-            if any(k in text for k in keywords):
-                is_candidate = True
-            
-            # 2. Numbered pagination (e.g., /page/2)
-            if re.search(r'/page/\d+', url):
-                is_candidate = True
-                
-            # 3. Query param pagination (e.g., ?p=2)
-            if re.search(r'[?&](p|page|start)=\d+', url):
-                is_candidate = True
-                
-            if is_candidate:
-                candidates.append(url)
-                
-        # If no obvious pagination found, maybe return all valid internal links?
-        # For safety/speed, let's only return high-confidence pagination candidates for now
-        # OR return first 5 unvisited links to simulate "crawling"
-        
-        if not candidates:
-            # Fallback: BFS behavior - add up to 3 unvisited internal links
-            count = 0
-            for link in links:
-                if isinstance(link, dict) and 'url' in link:
-                    url = link['url']
-                    if url not in visited and (not restrict_domain or urlparse(url).netloc == restrict_domain):
-                        candidates.append(url)
-                        count += 1
-                        if count >= 3:
-                            break
-                            
-        return candidates
-
     def universal_extract(self, url, query, ai_client, model_id):
         """
         AI-Powered Universal Extraction.
@@ -0,0 +1,23 @@
+"""
+================================================================================
+  bankoo.ai: WSGI ENTRY POINT
+================================================================================
+Production entry for WSGI servers (the desktop launcher keeps using
+bankoo_main.run_backend_server, which picks waitress via config.SERVER_MODE).
+
+    waitress-serve --threads 16 --port 5001 wsgi:application
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Importing this module starts the brain loader and opens the LLM provider
+pools before the first request arrives.
+================================================================================
+"""
+
+import threading
+
+from bankoo_main import app, warm_up
+
+application = app
+
+# Pools open immediately; the brain keeps loading in the background thread bankoo_main started
+threading.Thread(target=warm_up, name="ServerWarmup", daemon=True).start()